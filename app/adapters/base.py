@@ -1,7 +1,10 @@
 import asyncio
 import logging
+import random
 import time
 from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from typing import List, Dict, Any, Optional
 
 import httpx
@@ -10,6 +13,42 @@ from ..models import ProductResult
 
 logger = logging.getLogger(__name__)
 
+# Longest server-requested Retry-After delay we will wait out (seconds)
+MAX_RETRY_AFTER = 60.0
+
+# Fraction of random extra delay added to backoff waits, so concurrent
+# workers that failed together don't all retry at the same instant
+BACKOFF_JITTER = 0.1
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """
+    Read the Retry-After header of a response.
+    
+    Args:
+        response: Response to inspect, usually a 429 or 503
+        
+    Returns:
+        Seconds to wait (never negative), or None if the header is absent or malformed
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    
+    try:
+        seconds = float(value)
+    except ValueError:
+        # HTTP-date form, e.g. "Wed, 21 Oct 2015 07:28:00 GMT"
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        seconds = (retry_at - datetime.now(timezone.utc)).total_seconds()
+    
+    return max(0.0, seconds)
+
 
 class BaseAdapter(ABC):
     """Base class for retailer adapters."""
@@ -107,11 +146,21 @@ class BaseAdapter(ABC):
                 elif response.status_code in [429, 500, 502, 503, 504]:
                     if attempt < max_retries - 1:
                         wait_time = (2 ** attempt) * backoff_factor
+                        
+                        # A throttling server tells us how long to back off; the
+                        # jitter still applies so throttled workers don't retry together
+                        retry_after = retry_after_seconds(response)
+                        if retry_after is not None:
+                            wait_time = min(max(wait_time, retry_after) * (1 + random.random() * BACKOFF_JITTER), MAX_RETRY_AFTER)
+                        else:
+                            wait_time *= 1 + random.random() * BACKOFF_JITTER
+                        
                         logger.warning(
-                            f"Request failed with retryable status {response.status_code}, retrying in {wait_time}s",
+                            f"Request failed with retryable status {response.status_code}, retrying in {wait_time:.1f}s",
                             extra={
                                 **log_extra,
                                 "retry_delay": wait_time,
+                                "retry_after": retry_after,
                                 "retryable": True
                             }
                         )
@@ -141,9 +190,9 @@ class BaseAdapter(ABC):
                 last_exception = e
                 
                 if attempt < max_retries - 1:
-                    wait_time = (2 ** attempt) * backoff_factor
+                    wait_time = (2 ** attempt) * backoff_factor * (1 + random.random() * BACKOFF_JITTER)
                     logger.warning(
-                        f"Request timed out after {timeout}s, retrying in {wait_time}s",
+                        f"Request timed out after {timeout}s, retrying in {wait_time:.1f}s",
                         extra={
                             "query": query,
                             "postcode": postcode,
@@ -176,9 +225,9 @@ class BaseAdapter(ABC):
                 last_exception = e
                 
                 if attempt < max_retries - 1:
-                    wait_time = (2 ** attempt) * backoff_factor
+                    wait_time = (2 ** attempt) * backoff_factor * (1 + random.random() * BACKOFF_JITTER)
                     logger.warning(
-                        f"Network error occurred, retrying in {wait_time}s: {e}",
+                        f"Network error occurred, retrying in {wait_time:.1f}s: {e}",
                         extra={
                             "query": query,
                             "postcode": postcode,
@@ -2,11 +2,12 @@ import httpx
 import asyncio
 import logging
 import time
-from typing import List, Dict, Any, Optional
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Dict, Any, Optional
 from .base import BaseAdapter
 from ..models import ProductResult
 from ..settings import settings
-from ..utils.cache import get_cache
+from ..utils.cache import get_cache, NEGATIVE_RESULT
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +23,14 @@ except ImportError:
 class WoolworthsAdapter(BaseAdapter):
     """Adapter for Woolworths product search."""
     
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        """
+        Args:
+            client: Optional shared HTTP client. When given, connections (and
+                    their TLS sessions) are reused across searches; otherwise
+                    a short-lived client is created per request.
+        """
+        self._client = client
         self.base_url = "https://www.woolworths.com.au"
         self.api_base = "https://www.woolworths.com.au/apis/ui"
         self.retailer_name = "woolworths"
@@ -35,6 +43,15 @@ class WoolworthsAdapter(BaseAdapter):
             "Origin": "https://www.woolworths.com.au"
         }
     
+    @asynccontextmanager
+    async def _client_context(self) -> AsyncIterator[httpx.AsyncClient]:
+        """Yield the shared client if one was injected, else a temporary one."""
+        if self._client is not None:
+            yield self._client
+        else:
+            async with httpx.AsyncClient() as client:
+                yield client
+    
     async def _retry_request(self, client: httpx.AsyncClient, url: str, params: Dict[str, Any], query: str, postcode: str, max_retries: int = 3) -> Optional[Dict[str, Any]]:
         """Make HTTP request with exponential backoff retry and structured logging."""
         return await self._retry_request_with_backoff(
@@ -138,6 +155,8 @@ class WoolworthsAdapter(BaseAdapter):
         
         # Check cache first
         cached_result = self.cache.get(self.retailer_name, query, postcode)
+        if cached_result is NEGATIVE_RESULT:
+            cached_result = []
         if cached_result is not None:
             total_time = time.time() - start_time
             logger.info(
@@ -180,7 +199,7 @@ class WoolworthsAdapter(BaseAdapter):
         results = []
         api_succeeded = False
         
-        async with httpx.AsyncClient() as client:
+        async with self._client_context() as client:
             for endpoint in endpoints_to_try:
                 logger.debug(f"Trying endpoint: {endpoint}")
                 data = await self._retry_request(client, endpoint, params, query, postcode)
@@ -263,8 +282,11 @@ class WoolworthsAdapter(BaseAdapter):
                     }
                 )
         
-        # Cache the results (even if empty)
-        self.cache.put(self.retailer_name, query, postcode, results)
+        # Cache the results; empty searches get a short-lived negative entry
+        if results:
+            self.cache.put(self.retailer_name, query, postcode, results)
+        else:
+            self.cache.put_negative(self.retailer_name, query, postcode)
         
         total_time = time.time() - start_time
         logger.info(
@@ -304,7 +326,7 @@ class WoolworthsAdapter(BaseAdapter):
                 {"query": postcode, "maxItems": 1}
             ]
             
-            async with httpx.AsyncClient() as client:
+            async with self._client_context() as client:
                 for store_url in endpoints_to_try:
                     for params in param_variations:
                         try:
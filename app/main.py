@@ -1,5 +1,5 @@
 from fastapi import FastAPI, HTTPException, status, Request
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, Response
 from fastapi.staticfiles import StaticFiles
 from starlette.middleware.base import BaseHTTPMiddleware
 import logging
@@ -17,6 +17,7 @@ from .utils.metrics import get_metrics_collector, get_metrics_middleware, metric
 from .utils.graceful_degradation import get_degradation_status
 from .utils.db_config import get_alternative_products, get_database_stats, clear_all_price_history
 from .utils.auth import authenticate_admin, is_admin_authenticated, logout_admin, cleanup_expired_sessions
+import orjson
 
 def extract_session_token(request: Request) -> Optional[str]:
     """Extract session token from Authorization header."""
@@ -27,6 +28,10 @@ def extract_session_token(request: Request) -> Optional[str]:
 
 logger = logging.getLogger(__name__)
 
+def _to_response(data: dict) -> Response:
+    """Encode a plain result dict (e.g. update stats) with orjson, skipping FastAPI's encoder."""
+    return Response(orjson.dumps(data), media_type="application/json")
+
 app = FastAPI(
     title="Australian Supermarket Sale Checker",
     version="0.1.0",
@@ -116,6 +121,13 @@ async def startup_event():
     asyncio.create_task(admin_session_cleanup())
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release shared resources on application shutdown."""
+    from .utils.daily_updates import close_daily_updater
+    await close_daily_updater()
+
+
 @app.get("/")
 async def serve_frontend():
     """Serve the main web interface."""
@@ -591,9 +603,8 @@ async def admin_batch_price_update(
         
         if result['success']:
             logger.info(f"Admin initiated comprehensive batch update: {result['stats']}")
-            return result
-        else:
-            return result
+        
+        return _to_response(result)
             
     except Exception as e:
         logger.error(f"Admin batch price update error: {e}")
@@ -655,9 +666,8 @@ async def daily_price_update(
         
         if result['success']:
             logger.info(f"Admin initiated batched daily price update: {result['stats']}")
-            return result
-        else:
-            return result
+        
+        return _to_response(result)
             
     except Exception as e:
         logger.error(f"Admin daily price update error: {e}")
@@ -825,7 +835,7 @@ async def admin_bulk_import_data(request: Request, data: dict):
         )
     
     try:
-        from .utils.db_config import log_price_data, log_alternative_products
+        from .utils.db_config import log_price_data_bulk, log_alternative_products
         from datetime import datetime, date
         
         price_records = data.get('price_history', [])
@@ -837,6 +847,7 @@ async def admin_bulk_import_data(request: Request, data: dict):
         failed_alt = 0
         
         # Import price history records with original dates
+        price_rows = []
         for record in price_records:
             try:
                 # Parse date
@@ -847,25 +858,26 @@ async def admin_bulk_import_data(request: Request, data: dict):
                     else:
                         date_recorded = record['date_recorded']
                 
-                success = log_price_data(
-                    product_name=record['product_name'],
-                    retailer=record['retailer'],
-                    price=record.get('price'),
-                    was_price=record.get('was_price'),
-                    on_sale=record.get('on_sale', False),
-                    url=record.get('url'),
-                    date_recorded=date_recorded
-                )
-                
-                if success:
-                    successful_price += 1
-                else:
-                    failed_price += 1
+                price_rows.append({
+                    'product_name': record.get('product_name'),
+                    'retailer': record.get('retailer'),
+                    'price': record.get('price'),
+                    'was_price': record.get('was_price'),
+                    'on_sale': record.get('on_sale', False),
+                    'url': record.get('url'),
+                    'date_recorded': date_recorded
+                })
                     
             except Exception as e:
                 logger.error(f"Failed to import price record: {e}")
                 failed_price += 1
         
+        # All parsed records go in one transaction; rows missing a name or
+        # retailer are skipped and counted as failed
+        if price_rows:
+            successful_price = log_price_data_bulk(price_rows)
+            failed_price += len(price_rows) - successful_price
+        
         # Import alternative records (smaller batch)
         current_batch = []
         batch_size = 50
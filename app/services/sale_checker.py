@@ -8,7 +8,7 @@ from ..models import ProductResult
 from ..adapters.woolworths import WoolworthsAdapter
 from ..utils.matching import get_product_matcher, MatchScore
 from ..utils.graceful_degradation import execute_multi_retailer_search_with_degradation
-from ..utils.db_config import log_price_data, log_alternative_products, get_all_tracked_products
+from ..utils.db_config import log_price_data_bulk, log_alternative_products, get_all_tracked_products
 
 logger = logging.getLogger(__name__)
 
@@ -266,30 +266,33 @@ class SaleChecker:
                 
                 # Log price data and alternatives for tracking (non-blocking)
                 try:
-                    # Log the best match to price_history
+                    # The best match and its alternatives (stored in price_history too,
+                    # to keep everything in one place) go in one transaction
+                    price_rows = []
                     if result.get('bestMatch') and result.get('price') is not None:
-                        log_price_data(
-                            product_name=result['bestMatch'],
-                            retailer=result['retailer'],
-                            price=result['price'],
-                            was_price=result.get('was'),
-                            on_sale=result.get('onSale', False),
-                            url=result.get('url')
-                        )
+                        price_rows.append({
+                            'product_name': result['bestMatch'],
+                            'retailer': result['retailer'],
+                            'price': result['price'],
+                            'was_price': result.get('was'),
+                            'on_sale': result.get('onSale', False),
+                            'url': result.get('url')
+                        })
                     
-                    # Log alternatives to price_history table as well (store everything in one place)
-                    if result.get('alternatives'):
-                        for alternative in result['alternatives']:
-                            if alternative.get('name') and alternative.get('price') is not None:
-                                log_price_data(
-                                    product_name=alternative['name'],
-                                    retailer=result['retailer'],
-                                    price=alternative['price'],
-                                    was_price=alternative.get('was'),
-                                    on_sale=alternative.get('onSale', False),
-                                    url=alternative.get('url')
-                                )
-                        logger.debug(f"Logged {len(result['alternatives'])} alternatives to price_history table")
+                    for alternative in result.get('alternatives') or []:
+                        if alternative.get('name') and alternative.get('price') is not None:
+                            price_rows.append({
+                                'product_name': alternative['name'],
+                                'retailer': result['retailer'],
+                                'price': alternative['price'],
+                                'was_price': alternative.get('was'),
+                                'on_sale': alternative.get('onSale', False),
+                                'url': alternative.get('url')
+                            })
+                    
+                    if price_rows:
+                        log_price_data_bulk(price_rows)
+                        logger.debug(f"Logged {len(price_rows)} prices to price_history table")
                 except Exception as e:
                     # Don't let database errors break the main functionality
                     logger.warning(f"Failed to log data to database: {e}")
@@ -4,6 +4,8 @@ Simple admin authentication system.
 
 import hashlib
 import secrets
+import threading
+import time
 from typing import Optional
 from datetime import datetime, timedelta
 import logging
@@ -13,6 +15,17 @@ logger = logging.getLogger(__name__)
 # Session store - use database in production, memory for local development
 import os
 _active_sessions = {}  # Fallback for local development
+_sessions_lock = threading.Lock()  # Writer lock guarding all mutations of _active_sessions
+
+# Read-only snapshot of _active_sessions, republished after every mutation.
+# validate_admin_session reads it without taking the lock.
+_sessions_view = {}
+
+
+def _publish_sessions():
+    """Swap in a fresh read snapshot (called with _sessions_lock held)."""
+    global _sessions_view
+    _sessions_view = dict(_active_sessions)
 
 def get_session_storage():
     """Get session storage - database in production, memory locally."""
@@ -54,9 +67,12 @@ def store_session_db(session_token: str, session_data: dict):
             ))
             conn.commit()
     except Exception as e:
-        logger.error(f"Failed to store session in database: {e}")
+        logger.error("Failed to store session in database: %s", e)
         # Fallback to memory
-        _active_sessions[session_token] = session_data
+        session_data.setdefault('expires_at', time.monotonic() + SESSION_TIMEOUT_SECONDS)
+        with _sessions_lock:
+            _active_sessions[session_token] = session_data
+            _publish_sessions()
 
 def get_session_db(session_token: str):
     """Get session from database."""
@@ -78,9 +94,9 @@ def get_session_db(session_token: str):
                     'last_accessed': row[2]
                 }
     except Exception as e:
-        logger.error(f"Failed to get session from database: {e}")
+        logger.error("Failed to get session from database: %s", e)
         # Fallback to memory
-        return _active_sessions.get(session_token)
+        return _sessions_view.get(session_token)
     
     return None
 
@@ -93,9 +109,11 @@ def delete_session_db(session_token: str):
             cursor.execute("DELETE FROM admin_sessions WHERE session_token = %s", (session_token,))
             conn.commit()
     except Exception as e:
-        logger.error(f"Failed to delete session from database: {e}")
+        logger.error("Failed to delete session from database: %s", e)
         # Fallback to memory
-        _active_sessions.pop(session_token, None)
+        with _sessions_lock:
+            _active_sessions.pop(session_token, None)
+            _publish_sessions()
 
 def cleanup_expired_sessions_db():
     """Clean up expired sessions from database."""
@@ -107,15 +125,17 @@ def cleanup_expired_sessions_db():
             cursor.execute("DELETE FROM admin_sessions WHERE last_accessed < %s", (cutoff_time,))
             conn.commit()
     except Exception as e:
-        logger.error(f"Failed to cleanup expired sessions: {e}")
+        logger.error("Failed to cleanup expired sessions: %s", e)
         # Fallback to memory cleanup
-        cutoff_time = datetime.now() - SESSION_TIMEOUT
-        expired_tokens = [
-            token for token, data in _active_sessions.items()
-            if data['last_accessed'] < cutoff_time
-        ]
-        for token in expired_tokens:
-            _active_sessions.pop(token, None)
+        now = time.monotonic()
+        with _sessions_lock:
+            expired_tokens = [
+                token for token, data in _active_sessions.items()
+                if now > data['expires_at']
+            ]
+            for token in expired_tokens:
+                _active_sessions.pop(token, None)
+            _publish_sessions()
 
 # Admin credentials (in production, use environment variables and proper hashing)
 ADMIN_USERNAME = "admin"
@@ -123,6 +143,11 @@ ADMIN_PASSWORD = "password"
 
 # Session timeout (30 minutes)
 SESSION_TIMEOUT = timedelta(minutes=30)
+SESSION_TIMEOUT_SECONDS = SESSION_TIMEOUT.total_seconds()
+
+# Only slide an in-memory session's expiry once it is this many seconds old,
+# so most validations stay read-only
+SESSION_REFRESH_INTERVAL = 60.0
 
 
 def authenticate_admin(username: str, password: str) -> Optional[str]:
@@ -140,23 +165,28 @@ def authenticate_admin(username: str, password: str) -> Optional[str]:
         # Generate session token
         session_token = secrets.token_urlsafe(32)
         
-        # Store session with expiration
+        # Store session with expiration. In-memory sessions are checked against
+        # an absolute monotonic deadline; the database keeps last_accessed.
+        now = datetime.now()
         session_data = {
             'username': username,
-            'created_at': datetime.now(),
-            'last_accessed': datetime.now()
+            'created_at': now,
+            'last_accessed': now,
+            'expires_at': time.monotonic() + SESSION_TIMEOUT_SECONDS
         }
         
         # Use database storage in production, memory locally
         if get_session_storage() == "database":
             store_session_db(session_token, session_data)
         else:
-            _active_sessions[session_token] = session_data
+            with _sessions_lock:
+                _active_sessions[session_token] = session_data
+                _publish_sessions()
         
-        logger.info(f"Admin user authenticated successfully, session: {session_token[:8]}...")
+        logger.info("Admin user authenticated successfully, session: %.8s...", session_token)
         return session_token
     
-    logger.warning(f"Failed admin authentication attempt for username: {username}")
+    logger.warning("Failed admin authentication attempt for username: %s", username)
     return None
 
 
@@ -176,30 +206,45 @@ def validate_admin_session(session_token: str) -> bool:
     # Get session from database or memory
     if get_session_storage() == "database":
         session = get_session_db(session_token)
-    else:
-        session = _active_sessions.get(session_token)
+        
+        if not session:
+            return False
+        
+        now = datetime.now()
+        
+        # Check if session has expired
+        if now - session['last_accessed'] > SESSION_TIMEOUT:
+            logger.info("Admin session expired: %.8s...", session_token)
+            delete_session_db(session_token)
+            return False
+        
+        # Update last accessed time
+        session['last_accessed'] = now
+        store_session_db(session_token, session)
+        return True
+    
+    # Lock-free read from the published snapshot
+    session = _sessions_view.get(session_token)
     
     if not session:
         return False
     
-    now = datetime.now()
+    now = time.monotonic()
+    expires_at = session['expires_at']
     
     # Check if session has expired
-    if now - session['last_accessed'] > SESSION_TIMEOUT:
-        logger.info(f"Admin session expired: {session_token[:8]}...")
-        # Remove expired session
-        if get_session_storage() == "database":
-            delete_session_db(session_token)
-        else:
+    if now > expires_at:
+        logger.info("Admin session expired: %.8s...", session_token)
+        with _sessions_lock:
             _active_sessions.pop(session_token, None)
+            _publish_sessions()
         return False
     
-    # Update last accessed time
-    session['last_accessed'] = now
-    if get_session_storage() == "database":
-        store_session_db(session_token, session)
-    else:
-        _active_sessions[session_token] = session
+    # Slide the expiry window forward, but only once the session is stale
+    # enough to matter so the common path never takes the lock
+    if expires_at - now < SESSION_TIMEOUT_SECONDS - SESSION_REFRESH_INTERVAL:
+        with _sessions_lock:
+            session['expires_at'] = now + SESSION_TIMEOUT_SECONDS
     
     return True
 
@@ -218,13 +263,16 @@ def logout_admin(session_token: str) -> bool:
     if get_session_storage() == "database":
         session = get_session_db(session_token)
         if session:
-            logger.info(f"Admin user logged out, session: {session_token[:8]}...")
+            logger.info("Admin user logged out, session: %.8s...", session_token)
             delete_session_db(session_token)
             return True
     else:
-        if session_token in _active_sessions:
-            logger.info(f"Admin user logged out, session: {session_token[:8]}...")
-            del _active_sessions[session_token]
+        with _sessions_lock:
+            removed = _active_sessions.pop(session_token, None) is not None
+            if removed:
+                _publish_sessions()
+        if removed:
+            logger.info("Admin user logged out, session: %.8s...", session_token)
             return True
     
     return False
@@ -232,28 +280,47 @@ def logout_admin(session_token: str) -> bool:
 
 def cleanup_expired_sessions():
     """Clean up expired sessions."""
+    global _active_sessions
+    
     if get_session_storage() == "database":
         cleanup_expired_sessions_db()
     else:
-        now = datetime.now()
-        expired_sessions = []
+        now = time.monotonic()
         
-        for token, session in _active_sessions.items():
-            if now - session['last_accessed'] > SESSION_TIMEOUT:
-                expired_sessions.append(token)
+        # Snapshot and delete under the lock so concurrent validation/logout
+        # can't mutate the dict mid-iteration
+        with _sessions_lock:
+            expired_sessions = [
+                token for token, session in _active_sessions.items()
+                if now > session['expires_at']
+            ]
+            
+            if len(expired_sessions) > len(_active_sessions) * 0.5:
+                # Bulk expiry (e.g. after a quiet night): building the survivor
+                # dict once is cheaper than many deletes, and the global
+                # rebind is atomic
+                _active_sessions = {
+                    token: session for token, session in _active_sessions.items()
+                    if now <= session['expires_at']
+                }
+            else:
+                for token in expired_sessions:
+                    _active_sessions.pop(token, None)
+            
+            if expired_sessions:
+                _publish_sessions()
         
         for token in expired_sessions:
-            logger.info(f"Cleaning up expired session: {token[:8]}...")
-            del _active_sessions[token]
+            logger.info("Cleaning up expired session: %.8s...", token)
         
         if expired_sessions:
-            logger.info(f"Cleaned up {len(expired_sessions)} expired admin sessions")
+            logger.info("Cleaned up %d expired admin sessions", len(expired_sessions))
 
 
 def get_active_sessions_count() -> int:
     """Get count of active admin sessions."""
     cleanup_expired_sessions()  # Clean up first
-    return len(_active_sessions)
+    return len(_sessions_view)
 
 
 def is_admin_authenticated(session_token: Optional[str]) -> bool:
@@ -1,10 +1,22 @@
 import time
 import threading
 from typing import Any, Optional, Tuple, Dict
-from collections import OrderedDict
 
 from ..settings import settings
 
+# Sentinel stored for lookups known to return nothing. ``get`` hands it back
+# as-is so callers can tell "known miss, don't retry" apart from a cache miss.
+NEGATIVE_RESULT = object()
+
+# Known misses are kept briefly so a product coming back into stock shows up soon
+NEGATIVE_TTL_SECONDS = 60
+
+# Small-int retailer ids keep cache keys compact and cheap to hash. Unknown
+# retailers (e.g. health-check probes) fall back to their name.
+RETAILER_ID = {"woolworths": 0, "coles": 1}
+
+CacheKey = Tuple[Any, str, str]
+
 
 class TTLCache:
     """Thread-safe LRU cache with TTL (Time To Live) support."""
@@ -20,16 +32,23 @@ class TTLCache:
         self.max_size = max_size
         self.default_ttl_seconds = default_ttl_seconds or (settings.CACHE_TTL_MIN * 60)
         
-        # Cache storage: key -> (value, expiry_time)
-        self._cache: OrderedDict[str, Tuple[Any, float]] = OrderedDict()
+        # Cache storage: key -> (value, expiry_time). Plain dicts keep
+        # insertion order, so re-inserting a key moves it to the MRU end and
+        # the first key is always the least recently used.
+        self._cache: Dict[CacheKey, Tuple[Any, float]] = {}
         self._lock = threading.RLock()
+        
+        # Running counters so stats() never has to walk the cache
+        self._insert_count = 0
+        self._eviction_count = 0  # LRU evictions due to max_size
+        self._expiry_evictions = 0  # Entries dropped because their TTL passed
     
-    def _generate_key(self, retailer: str, query: str, postcode: str) -> str:
+    def _generate_key(self, retailer: str, query: str, postcode: str) -> CacheKey:
         """Generate cache key from retailer, query, and postcode."""
         # Normalize inputs for consistent caching
         normalized_query = query.lower().strip()
         normalized_postcode = postcode.strip()
-        return f"{retailer}:{normalized_query}:{normalized_postcode}"
+        return (RETAILER_ID.get(retailer, retailer), normalized_query, normalized_postcode)
     
     def _is_expired(self, expiry_time: float) -> bool:
         """Check if an item has expired."""
@@ -46,12 +65,15 @@ class TTLCache:
         
         for key in expired_keys:
             del self._cache[key]
+        
+        self._expiry_evictions += len(expired_keys)
     
     def _enforce_size_limit(self) -> None:
         """Ensure cache doesn't exceed max_size (called with lock held)."""
         while len(self._cache) > self.max_size:
             # Remove least recently used item
-            self._cache.popitem(last=False)
+            del self._cache[next(iter(self._cache))]
+            self._eviction_count += 1
     
     def get(self, retailer: str, query: str, postcode: str) -> Optional[Any]:
         """
@@ -63,22 +85,24 @@ class TTLCache:
             postcode: Australian postcode
             
         Returns:
-            Cached value if found and not expired, None otherwise
+            Cached value if found and not expired, ``NEGATIVE_RESULT`` for a
+            known miss, None otherwise
         """
         key = self._generate_key(retailer, query, postcode)
         
         with self._lock:
-            if key not in self._cache:
+            entry = self._cache.pop(key, None)
+            if entry is None:
                 return None
             
-            value, expiry_time = self._cache[key]
+            value, expiry_time = entry
             
             if self._is_expired(expiry_time):
-                del self._cache[key]
+                self._expiry_evictions += 1
                 return None
             
-            # Move to end (mark as recently used)
-            self._cache.move_to_end(key)
+            # Re-insert at the end (mark as recently used)
+            self._cache[key] = entry
             return value
     
     def put(self, retailer: str, query: str, postcode: str, value: Any, ttl_seconds: int = None) -> None:
@@ -101,15 +125,29 @@ class TTLCache:
             if len(self._cache) % 100 == 0:  # Every 100 operations
                 self._evict_expired()
             
-            # Store the item
+            # Store the item at the end (mark as recently used)
+            self._cache.pop(key, None)
             self._cache[key] = (value, expiry_time)
-            
-            # Move to end (mark as recently used)
-            self._cache.move_to_end(key)
+            self._insert_count += 1
             
             # Enforce size limit
             self._enforce_size_limit()
     
+    def put_negative(self, retailer: str, query: str, postcode: str, ttl_seconds: int = NEGATIVE_TTL_SECONDS) -> None:
+        """
+        Record that a lookup returned no results.
+        
+        Subsequent ``get`` calls return ``NEGATIVE_RESULT`` until the (short)
+        TTL expires, letting callers skip repeat scrapes for the same miss.
+        
+        Args:
+            retailer: Retailer name ("woolworths", "coles")
+            query: Search query
+            postcode: Australian postcode
+            ttl_seconds: TTL in seconds for the negative entry
+        """
+        self.put(retailer, query, postcode, NEGATIVE_RESULT, ttl_seconds=ttl_seconds)
+    
     def clear(self) -> None:
         """Clear all items from cache."""
         with self._lock:
@@ -121,19 +159,19 @@ class TTLCache:
             return len(self._cache)
     
     def stats(self) -> Dict[str, Any]:
-        """Get cache statistics."""
+        """
+        Get cache statistics.
+        
+        O(1): reports running counters instead of scanning for expired entries,
+        so an admin dashboard polling this never holds the lock for long.
+        """
         with self._lock:
-            current_time = time.time()
-            expired_count = 0
-            
-            for _, expiry_time in self._cache.values():
-                if current_time > expiry_time:
-                    expired_count += 1
-            
             return {
                 "size": len(self._cache),
                 "max_size": self.max_size,
-                "expired_items": expired_count,
+                "inserts": self._insert_count,
+                "evictions": self._eviction_count,
+                "expired_evictions": self._expiry_evictions,
                 "default_ttl_seconds": self.default_ttl_seconds
             }
 
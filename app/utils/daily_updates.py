@@ -4,25 +4,343 @@ Daily price update functionality for building historical data.
 
 import asyncio
 import logging
+import random
+import re
+import statistics
+import time
+import httpx
+from collections import OrderedDict, deque, namedtuple
+from dataclasses import dataclass, asdict
 from datetime import date
-from typing import List, Dict, Any, Tuple
+from functools import lru_cache
+from itertools import islice
+from typing import List, Dict, Any, Optional, Tuple, Callable, Awaitable, Iterable, Iterator
 from ..adapters.woolworths import WoolworthsAdapter
-from .db_config import get_all_tracked_products, get_products_missing_todays_price, log_price_data
+from .db_config import (
+    get_all_tracked_products, get_latest_price, get_products_missing_todays_price, iter_tracked_products,
+    log_price_data, log_price_data_bulk
+)
 from .matching import get_product_matcher
+from .graceful_degradation import CircuitBreaker
+from .rate_limiting import AsyncTokenBucket
 
 logger = logging.getLogger(__name__)
 
+# HTTP/2 multiplexes concurrent searches onto one TLS connection per host;
+# httpx only supports it when the optional h2 package is installed
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Shared HTTP client pool. Idle connections are kept for a minute so the gaps
+# between batches don't force fresh TLS handshakes.
+HTTP_MAX_CONNECTIONS = 16
+HTTP_KEEPALIVE_EXPIRY = 60.0
+
+# Attempts per price write before the product is counted as failed
+DB_WRITE_RETRIES = 3
+
+# Per-product fetch timeout: a fixed default until enough latencies have been
+# observed, then 1.5x the rolling p95 clamped to [MIN, MAX]
+DEFAULT_FETCH_TIMEOUT = 10.0
+MIN_FETCH_TIMEOUT = 2.0
+MAX_FETCH_TIMEOUT = 30.0
+MIN_LATENCY_SAMPLES = 20
+
+# Per-run memo of retailer search results; different stored names often
+# reduce to the same search term
+SEARCH_CACHE_TTL = 600  # seconds
+SEARCH_CACHE_MAX_SIZE = 512
+
+# Oldest live price (in days) that may be carried forward when a fetch fails
+STALE_MAX_AGE_DAYS = 7
+
+# _process_one statuses where the retailer gave us no price for the product
+FALLBACK_STATUSES = ("timeout", "not_found", "error", "skipped")
+
+# Background price writer: rows queue up (bounded, for backpressure) and are
+# written in bulk by a flusher task, at most WRITE_FLUSH_MAX_ROWS per write
+WRITE_QUEUE_MAX_SIZE = 10_000
+WRITE_FLUSH_MAX_ROWS = 1000
+WRITE_FLUSH_INTERVAL = 0.2  # Seconds to let rows accumulate before each write
+
+# Minimum seconds between progress_callback calls from the concurrent update paths
+PROGRESS_MIN_INTERVAL = 0.2
+
+# How long a smart update may reuse the last "missing today's price" query
+MISSING_CACHE_TTL = 60
+
+# date -> (fetched_at, products) for smart_daily_update, so an admin
+# re-triggering it during an outage doesn't rerun the same query every time
+_missing_cache: Dict[date, Tuple[float, List[Dict[str, Any]]]] = {}
+
+# Lightweight view of a tracked product row for the per-product hot path
+TrackedProduct = namedtuple("TrackedProduct", "name retailer")
+
+# Per-retailer bulkhead for one update run: each retailer gets its own
+# concurrency slots and circuit breaker, so a slow or failing retailer can't
+# starve or trip the others
+RetailerLane = namedtuple("RetailerLane", "semaphore breaker")
+
+
+@dataclass(slots=True)
+class PriceRow:
+    """A fetched price, in the shape log_price_data takes."""
+    product_name: str
+    retailer: str
+    price: Optional[float]
+    was_price: Optional[float] = None
+    on_sale: bool = False
+    url: Optional[str] = None
+    stale: bool = False  # Carried forward from an earlier day
+
+
+@dataclass(slots=True)
+class BatchStats:
+    """Outcome counters for one batch, or a whole run once batches are merged in."""
+    successful: int = 0
+    failed: int = 0
+    new_records: int = 0
+    skipped: int = 0
+    stale: int = 0
+    
+    def merge(self, other: "BatchStats") -> None:
+        """Add another batch's counters to this one."""
+        self.successful += other.successful
+        self.failed += other.failed
+        self.new_records += other.new_records
+        self.skipped += other.skipped
+        self.stale += other.stale
+
+
+def _get_missing_products(limit: int) -> List[Dict[str, Any]]:
+    """get_products_missing_todays_price, reusing today's result for MISSING_CACHE_TTL seconds."""
+    today = date.today()
+    now = time.monotonic()
+    
+    cached = _missing_cache.get(today)
+    if cached and now - cached[0] < MISSING_CACHE_TTL:
+        return cached[1]
+    
+    products = get_products_missing_todays_price(limit=limit)
+    _missing_cache.clear()  # Earlier days' entries are never read again
+    _missing_cache[today] = (now, products)
+    return products
+
+
+def _load_tracked_products() -> Tuple[int, List[TrackedProduct]]:
+    """
+    Stream tracked products page by page, keeping only unique (name, retailer) keys.
+    
+    Only the compact TrackedProduct tuples are retained, never the full list
+    of row dicts.
+    
+    Returns:
+        Tuple of (rows read, unique products in first-seen order)
+    """
+    total = 0
+    unique: Dict[TrackedProduct, None] = {}
+    for page in iter_tracked_products():
+        total += len(page)
+        unique.update(dict.fromkeys(TrackedProduct(p['product_name'], p['retailer']) for p in page))
+    return total, list(unique)
+
+
+def _forget_missing(updated: Iterable[TrackedProduct]) -> None:
+    """Drop products that now have today's price from the cached missing list."""
+    today = date.today()
+    cached = _missing_cache.get(today)
+    if not cached:
+        return
+    
+    updated = set(updated)
+    remaining = [p for p in cached[1] if TrackedProduct(p['product_name'], p['retailer']) not in updated]
+    if remaining:
+        _missing_cache[today] = (cached[0], remaining)
+    else:
+        # An empty list would read as "nothing left to update"; query again instead
+        del _missing_cache[today]
+
+
+class _ThrottledProgress:
+    """
+    Coalesce progress_callback calls to at most one per min_interval seconds.
+    
+    Concurrent workers finish products in bursts, so reporting every one would
+    flood a callback that writes to a socket or file. The first call goes
+    straight through; calls inside the interval only replace the pending
+    arguments, which are delivered when the interval ends or on flush().
+    """
+    
+    def __init__(self, callback: Optional[Callable[..., Any]], min_interval: float = PROGRESS_MIN_INTERVAL):
+        self._callback = callback
+        self._min_interval = min_interval
+        self._last_call = float("-inf")
+        self._pending_args = None
+        self._handle = None
+    
+    def __call__(self, *args) -> None:
+        if self._callback is None:
+            return
+        
+        self._pending_args = args
+        if self._handle is not None:
+            return  # A flush is already scheduled and will pick these up
+        
+        wait = self._min_interval - (time.monotonic() - self._last_call)
+        if wait <= 0:
+            self.flush()
+        else:
+            self._handle = asyncio.get_running_loop().call_later(wait, self.flush)
+    
+    def flush(self) -> None:
+        """Deliver the latest pending progress now, if any."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        
+        if self._pending_args is None:
+            return
+        
+        args, self._pending_args = self._pending_args, None
+        self._last_call = time.monotonic()
+        self._callback(*args)
+
+
+def _batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Yield successive lists of up to size items (itertools.batched before Python 3.12)."""
+    iterator = iter(items)
+    return iter(lambda: list(islice(iterator, size)), [])
+
+
+async def retry_async(fn: Callable[[], Awaitable[Any]], tries: int = 3, base: float = 0.25,
+                      cap: float = 5.0, jitter: float = 0.5, retry_on: tuple = (Exception,)) -> Any:
+    """
+    Await fn() until it returns a truthy result, backing off between attempts.
+    
+    Sleeps min(cap, base * 2**attempt) scaled by a random factor in
+    [1, 1 + jitter] so that concurrent callers spread their retries out.
+    
+    Args:
+        fn: Zero-argument coroutine function to call
+        tries: Maximum number of attempts
+        base: Initial backoff in seconds
+        cap: Upper bound for a single backoff in seconds
+        jitter: Maximum extra fraction of the backoff added at random
+        retry_on: Exception types worth retrying; anything else is raised immediately
+        
+    Returns:
+        The first truthy result, or the last (falsy) result if every attempt failed
+    """
+    result = None
+    for attempt in range(tries):
+        try:
+            result = await fn()
+            if result:
+                return result
+        except retry_on as e:
+            if attempt == tries - 1:
+                raise
+            logger.warning("Attempt %s/%s failed: %s", attempt + 1, tries, e)
+        
+        if attempt < tries - 1:
+            await asyncio.sleep(min(cap, base * 2 ** attempt) * (1 + random.random() * jitter))
+    
+    return result
+
+
+# Brand prefixes stripped before searching (at most one, at the start)
+_BRAND_PREFIX_RE = re.compile(
+    r"^(?:woolworths|coles|cc's|wonder white|kettle|thins|kitkat|coca cola|pepsi)\s+"
+)
+
+# Words that look like sizes: a digit plus a letter ("3l", "175g") or a bare
+# number ("175")
+_SIZE_WORD_RE = re.compile(r"(?=.*\d)(?:(?=.*[^\W\d_])|\d+$)")
+
+
+@lru_cache(maxsize=4096)
+def _extract_search_term(product_name: str) -> str:
+    """
+    Extract a good search term from the stored product name.
+    
+    Product names recur across runs, so results are memoized.
+    
+    For example:
+    "woolworths full cream milk 3l dummy" -> "full cream milk"
+    "cc's corn chips taco 175g" -> "corn chips taco"
+    """
+    name = product_name.lower()
+    
+    # Remove "dummy" suffix if present
+    if "dummy" in name:
+        name = name.replace("dummy", "").strip()
+    
+    # Remove common brand prefixes
+    name = _BRAND_PREFIX_RE.sub("", name, count=1)
+    
+    # Remove size information and focus on the main product
+    # This is a simple approach - could be more sophisticated
+    words = name.split()
+    
+    # Drop size-like words (e.g., "3l", "175g", "700g") and standalone numbers
+    filtered_words = [word for word in words if not _SIZE_WORD_RE.match(word)]
+    
+    # Take the first few meaningful words (increased from 2 to 3)
+    search_term = " ".join(filtered_words[:3]) if filtered_words else name
+    
+    # Fallback to first few words if nothing meaningful found
+    if not search_term.strip():
+        search_term = " ".join(words[:2]) if len(words) >= 2 else (words[0] if words else product_name)
+    
+    logger.info("Extracted search term '%s' from '%s'", search_term, product_name)
+    return search_term.strip()
+
 
 class DailyPriceUpdater:
     """Handles daily price updates for all tracked products."""
     
     def __init__(self):
-        self.woolworths = WoolworthsAdapter()
+        # One pooled client for the updater's lifetime so consecutive product
+        # searches reuse TCP/TLS connections instead of handshaking each time
+        self._http_client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+            )
+        )
+        self.woolworths = WoolworthsAdapter(client=self._http_client)
         self.retailers = {
             "woolworths": self.woolworths
         }
         self.consecutive_failures = 0
-        self.circuit_breaker_threshold = 20  # Stop after 20 consecutive failures (less sensitive)
+        self.circuit_breaker_threshold = 20  # Open the breaker after 20 consecutive failures (less sensitive)
+        self.circuit_breaker_timeout = 30  # Seconds before the first probe after the breaker opens
+        self.circuit_breaker_max_timeout = 300  # Cap for the doubling wait between failed probes
+        self.max_concurrency = 8  # Products fetched in parallel per retailer per update run
+        self.api_requests_per_second = 4  # Search budget per retailer, shared by all its workers
+        self._limiters = {
+            retailer: AsyncTokenBucket(max_rate=self.api_requests_per_second, time_period=1.0)
+            for retailer in self.retailers
+        }
+        self._latencies = deque(maxlen=200)  # Recent successful fetch times (seconds)
+        self._fetch_timeout = DEFAULT_FETCH_TIMEOUT
+        self.matcher = get_product_matcher()
+        self._search_cache: "OrderedDict[Tuple[str, str, str], Tuple[float, list]]" = OrderedDict()
+        self._search_terms: Dict[str, str] = {}  # Product name -> search term, precomputed per full run
+        self._inflight_searches: Dict[Tuple[str, str, str], asyncio.Future] = {}  # Searches not yet cached
+        self._write_queue: "asyncio.Queue[Tuple[PriceRow, asyncio.Future]]" = asyncio.Queue(maxsize=WRITE_QUEUE_MAX_SIZE)
+        self._flusher: Optional[asyncio.Task] = None  # Started on demand, exits once the queue is empty
+    
+    async def aclose(self):
+        """Finish any queued price writes, then close the shared HTTP client."""
+        if self._flusher is not None:
+            await self._flusher
+        await self._http_client.aclose()
     
     async def update_all_products(self, batch_size: int = 20, max_batches: int = None, 
                                 progress_callback=None) -> Dict[str, Any]:
@@ -38,10 +356,12 @@ class DailyPriceUpdater:
             Dict with update results and statistics
         """
         try:
-            # Get all tracked products
-            tracked_products = get_all_tracked_products()
+            # Search each (name, retailer) pair once; one price row per pair per
+            # day covers every tracked row that shares it. Read off the event
+            # loop so a large catalog doesn't stall other requests.
+            total_products, unique_products = await asyncio.to_thread(_load_tracked_products)
             
-            if not tracked_products:
+            if not total_products:
                 return {
                     "success": True,
                     "message": "No products to update",
@@ -53,183 +373,121 @@ class DailyPriceUpdater:
                     }
                 }
             
-            total_products = len(tracked_products)
-            total_batches = (total_products + batch_size - 1) // batch_size  # Ceiling division
+            self._search_cache.clear()
+            
+            duplicates_skipped = total_products - len(unique_products)
+            if duplicates_skipped:
+                logger.info("Skipping %s duplicate tracked products", duplicates_skipped)
+            
+            # Derive every search term once up front. The fetches look terms up
+            # here, so a catalog larger than the memo can't thrash it with
+            # two full passes in the same order.
+            self._search_terms = {p.name: _extract_search_term(p.name) for p in unique_products}
+            
+            # Group products that search for the same term so they land in the
+            # same batch and share one (cached or coalesced) request
+            unique_products.sort(key=lambda p: (p.retailer, self._search_terms[p.name]))
+            
+            total_batches = (len(unique_products) + batch_size - 1) // batch_size  # Ceiling division
             
             # Limit batches if max_batches is specified
             if max_batches:
                 total_batches = min(total_batches, max_batches)
-                products_to_process = tracked_products[:max_batches * batch_size]
+                products_to_process = unique_products[:max_batches * batch_size]
             else:
-                products_to_process = tracked_products
+                products_to_process = unique_products
             
-            successful_updates = 0
-            failed_updates = 0
-            new_records = 0
+            totals = BatchStats()
             processed_products = 0
             
-            logger.info(f"Starting batched daily price update: {len(products_to_process)} products in {total_batches} batches of {batch_size}")
+            lanes = self._new_lanes(products_to_process, self.circuit_breaker_threshold)
+            progress = _ThrottledProgress(progress_callback)
             
-            # Process products in batches
-            for batch_num in range(total_batches):
-                start_idx = batch_num * batch_size
-                end_idx = min(start_idx + batch_size, len(products_to_process))
-                batch_products = products_to_process[start_idx:end_idx]
-                
-                logger.info(f"Processing batch {batch_num + 1}/{total_batches} ({len(batch_products)} products)")
-                
-                batch_successful = 0
-                batch_failed = 0
-                
-                for i, product in enumerate(batch_products):
-                    product_name = product['product_name']
-                    retailer = product['retailer']
-                    global_index = start_idx + i + 1
-                    updated_data = None
-                    
-                    try:
-                        if progress_callback:
-                            progress_callback(global_index, len(products_to_process), product_name, batch_num + 1, total_batches)
-                        
-                        # Search for current price data with timeout
-                        logger.info(f"Updating product {global_index}/{len(products_to_process)}: {product_name}")
-                        
-                        # Use asyncio.wait_for to add timeout protection
-                        try:
-                            updated_data = await asyncio.wait_for(
-                                self._get_current_price_data(product_name, retailer),
-                                timeout=30.0  # 30 second timeout per product
-                            )
-                        except asyncio.TimeoutError:
-                            logger.warning(f"Timeout while updating {product_name} - skipping")
-                            failed_updates += 1
-                            batch_failed += 1
-                            continue
+            logger.info("Starting batched daily price update: %s products in %s batches of %s", len(products_to_process), total_batches, batch_size)
+            
+            # Batches are pipelined: while one batch's rows are being written,
+            # the next batch is already fetching. The queue holds fetched
+            # batches awaiting their write; its bound keeps the fetcher from
+            # running far ahead of the database.
+            written = asyncio.Queue(maxsize=2)
+            
+            async def fetch_batches():
+                try:
+                    for batch_num, batch_products in enumerate(_batched(products_to_process, batch_size)):
+                        batch, batch_rows = await self._fetch_batch(
+                            lanes, progress, batch_products, batch_num, total_batches,
+                            start_idx=batch_num * batch_size, total=len(products_to_process)
+                        )
+                        await written.put((batch_num, batch_products, batch, batch_rows))
                         
-                        if updated_data:
-                            logger.info(f"Found price data for {product_name}: ${updated_data['price']}")
-                            
-                            # Reset consecutive failures on successful API call
-                            self.consecutive_failures = 0
-                            
-                            # Database operation with retry logic
-                            max_db_retries = 3
-                            db_success = False
+                        # Dynamic delay between batches based on how well the API answered.
+                        # It only holds back the next batch's requests; the write
+                        # of this batch proceeds meanwhile.
+                        if batch_num < total_batches - 1:  # Don't sleep after last batch
+                            # Stale carry-forward rows are fallbacks, not answers from the API
+                            fetch_rate = ((len(batch_rows) - batch.stale) / len(batch_products)) * 100 if batch_products else 0
+                            # Longer delay if batch had many failures (API might be stressed)
+                            if fetch_rate < 50:
+                                delay_time = 15.0  # Increased from 5.0
+                                logger.info("Low success rate (%.1f%%) - waiting %s seconds before next batch...", fetch_rate, delay_time)
+                            elif fetch_rate < 80:
+                                delay_time = 10.0  # Increased from 3.0
+                                logger.info("Moderate success rate (%.1f%%) - waiting %s seconds before next batch...", fetch_rate, delay_time)
+                            else:
+                                delay_time = 5.0   # Increased from 1.5
+                                logger.info("Good success rate (%.1f%%) - waiting %s seconds before next batch...", fetch_rate, delay_time)
                             
-                            for retry in range(max_db_retries):
-                                try:
-                                    success = log_price_data(
-                                        product_name=updated_data['product_name'],
-                                        retailer=updated_data['retailer'],
-                                        price=updated_data['price'],
-                                        was_price=updated_data.get('was_price'),
-                                        on_sale=updated_data.get('on_sale', False),
-                                        url=updated_data.get('url')
-                                    )
-                                    
-                                    if success:
-                                        successful_updates += 1
-                                        batch_successful += 1
-                                        new_records += 1
-                                        db_success = True
-                                        logger.debug(f"Updated price for {product_name}: ${updated_data['price']}")
-                                        break
-                                    else:
-                                        logger.warning(f"Database insert failed for {product_name} (attempt {retry + 1})")
-                                        if retry < max_db_retries - 1:
-                                            await asyncio.sleep(1.0)  # Wait before retry
-                                        
-                                except Exception as db_error:
-                                    logger.error(f"Database error for {product_name} (attempt {retry + 1}): {db_error}")
-                                    if retry < max_db_retries - 1:
-                                        await asyncio.sleep(1.0)  # Wait before retry
-                            
-                            if not db_success:
-                                failed_updates += 1
-                                batch_failed += 1
-                                logger.error(f"Failed to log price data for {product_name} after {max_db_retries} attempts")
-                        else:
-                            failed_updates += 1
-                            batch_failed += 1
-                            self.consecutive_failures += 1
-                            logger.warning(f"Could not find current price data for {product_name} (search term extraction or API search failed)")
-                            
-                            # Circuit breaker: if too many consecutive failures, abort
-                            if self.consecutive_failures >= self.circuit_breaker_threshold:
-                                logger.error(f"Circuit breaker triggered: {self.consecutive_failures} consecutive failures. Stopping update process.")
-                                result = {
-                                    "success": False,
-                                    "message": f"Update aborted due to circuit breaker: {self.consecutive_failures} consecutive API failures. This may indicate API rate limiting or service issues.",
-                                    "stats": {
-                                        "total_products_in_db": total_products,
-                                        "products_processed": processed_products + i + 1,  # Include current item
-                                        "successful_updates": successful_updates,
-                                        "failed_updates": failed_updates,
-                                        "new_records": new_records,
-                                        "success_rate": round((successful_updates / (processed_products + i + 1)) * 100, 1) if (processed_products + i + 1) > 0 else 0,
-                                        "batches_processed": batch_num + 1,
-                                        "batch_size": batch_size,
-                                        "circuit_breaker_triggered": True
-                                    }
-                                }
-                                return result
+                            await asyncio.sleep(delay_time)
+                finally:
+                    await written.put(None)  # Always release the writer
+            
+            async def write_batches():
+                nonlocal processed_products
+                while (item := await written.get()) is not None:
+                    batch_num, batch_products, batch, batch_rows = item
                     
-                    except Exception as e:
-                        failed_updates += 1
-                        batch_failed += 1
-                        logger.error(f"Unexpected error updating {product_name}: {e}")
+                    # Write everything fetched in this batch with a single transaction
+                    stored = await self._store_batch(batch_rows)
+                    batch.successful += stored
+                    batch.new_records += stored
+                    batch.failed += len(batch_rows) - stored
+                    totals.merge(batch)
                     
-                    # Dynamic delay to be respectful to the API and avoid rate limits
-                    if updated_data:
-                        delay = 1.5  # Longer delay for successful requests (increased from 0.5)
-                    else:
-                        delay = 0.8  # Delay for failed requests (increased from 0.2)
+                    # Log batch completion
+                    batch_success_rate = (batch.successful / len(batch_products)) * 100 if batch_products else 0
+                    logger.info("Batch %s completed: %s/%s successful (%.1f%%)", batch_num + 1, batch.successful, len(batch_products), batch_success_rate)
                     
-                    await asyncio.sleep(delay)
-                
-                # Log batch completion
-                batch_success_rate = (batch_successful / len(batch_products)) * 100 if batch_products else 0
-                logger.info(f"Batch {batch_num + 1} completed: {batch_successful}/{len(batch_products)} successful ({batch_success_rate:.1f}%)")
-                
-                processed_products += len(batch_products)
-                
-                # Dynamic delay between batches based on success rate (increased delays)
-                if batch_num < total_batches - 1:  # Don't sleep after last batch
-                    # Longer delay if batch had many failures (API might be stressed)
-                    if batch_success_rate < 50:
-                        delay_time = 15.0  # Increased from 5.0
-                        logger.info(f"Low success rate ({batch_success_rate:.1f}%) - waiting {delay_time} seconds before next batch...")
-                    elif batch_success_rate < 80:
-                        delay_time = 10.0  # Increased from 3.0
-                        logger.info(f"Moderate success rate ({batch_success_rate:.1f}%) - waiting {delay_time} seconds before next batch...")
-                    else:
-                        delay_time = 5.0   # Increased from 1.5
-                        logger.info(f"Good success rate ({batch_success_rate:.1f}%) - waiting {delay_time} seconds before next batch...")
-                    
-                    await asyncio.sleep(delay_time)
+                    processed_products += len(batch_products)
             
-            success_rate = (successful_updates / processed_products) * 100 if processed_products > 0 else 0
+            await asyncio.gather(fetch_batches(), write_batches())
+            
+            success_rate = (totals.successful / processed_products) * 100 if processed_products > 0 else 0
             
             result = {
                 "success": True,
-                "message": f"Batched daily update completed: {successful_updates}/{processed_products} products updated ({success_rate:.1f}% success rate) in {total_batches} batches",
+                "message": f"Batched daily update completed: {totals.successful}/{processed_products} products updated ({success_rate:.1f}% success rate) in {total_batches} batches",
                 "stats": {
                     "total_products_in_db": total_products,
                     "products_processed": processed_products,
-                    "successful_updates": successful_updates,
-                    "failed_updates": failed_updates,
-                    "new_records": new_records,
+                    "successful_updates": totals.successful,
+                    "failed_updates": totals.failed,
+                    "new_records": totals.new_records,
                     "success_rate": round(success_rate, 1),
                     "batches_processed": total_batches,
-                    "batch_size": batch_size
+                    "batch_size": batch_size,
+                    "api_calls": processed_products - totals.skipped,
+                    "duplicates_skipped": duplicates_skipped,
+                    "skipped_updates": totals.skipped,
+                    "stale_records": totals.stale,
+                    "circuit_breaker_triggered": any(lane.breaker.trip_count > 0 for lane in lanes.values())
                 }
             }
             
-            logger.info(f"Daily update completed: {result['message']}")
+            logger.info("Daily update completed: %s", result['message'])
             return result
             
         except Exception as e:
-            logger.error(f"Daily update failed: {e}")
+            logger.error("Daily update failed: %s", e)
             return {
                 "success": False,
                 "message": f"Daily update failed: {str(e)}",
@@ -258,11 +516,8 @@ class DailyPriceUpdater:
             Dict with update results and statistics
         """
         try:
-            # Reset consecutive failures counter for new update session
-            self.consecutive_failures = 0
-            
             # Get products missing today's price data
-            products_to_update = get_products_missing_todays_price(limit=100)
+            products_to_update = _get_missing_products(limit=100)
             
             if not products_to_update:
                 return {
@@ -280,127 +535,81 @@ class DailyPriceUpdater:
                 }
             
             total_products = len(products_to_update)
-            successful_updates = 0
-            failed_updates = 0
-            new_records = 0
+            totals = BatchStats()
+            updated = []
+            self._search_cache.clear()
             
-            logger.info(f"Starting smart daily update: {total_products} products missing today's price data")
+            logger.info("Starting smart daily update: %s products missing today's price data", total_products)
             
-            # Process products one by one (no batching needed for 100 items)
-            for i, product in enumerate(products_to_update):
-                product_name = product['product_name']
-                retailer = product['retailer']
-                current_index = i + 1
-                updated_data = None
-                
-                try:
-                    if progress_callback:
-                        progress_callback(current_index, total_products, product_name, 1, 1)
+            # Process products concurrently (no batching needed for 100 items)
+            products = [TrackedProduct(p['product_name'], p['retailer']) for p in products_to_update]
+            lanes = self._new_lanes(products, 5)  # Lower breaker threshold for smart updates
+            tasks = [
+                asyncio.create_task(self._run_bounded(
+                    lanes[product.retailer], product, i + 1, total_products
+                ))
+                for i, product in enumerate(products)
+            ]
+            progress = _ThrottledProgress(progress_callback)
+            pending_writes = []
+            done = 0
+            
+            try:
+                for completed in asyncio.as_completed(tasks):
+                    outcome = await completed
+                    done += 1
                     
-                    # Search for current price data with timeout
-                    logger.info(f"Smart update {current_index}/{total_products}: {product_name}")
+                    if outcome['status'] == "skipped":
+                        totals.skipped += 1
                     
-                    try:
-                        updated_data = await asyncio.wait_for(
-                            self._get_current_price_data(product_name, retailer),
-                            timeout=30.0  # 30 second timeout per product
-                        )
-                    except asyncio.TimeoutError:
-                        logger.warning(f"Timeout while updating {product_name} - skipping")
-                        failed_updates += 1
-                        continue
-                    
-                    if updated_data:
-                        logger.info(f"Found price data for {product_name}: ${updated_data['price']}")
-                        
-                        # Reset consecutive failures on successful API call
-                        self.consecutive_failures = 0
-                        
-                        # Database operation with retry logic
-                        max_db_retries = 3
-                        db_success = False
-                        
-                        for retry in range(max_db_retries):
-                            try:
-                                success = log_price_data(
-                                    product_name=updated_data['product_name'],
-                                    retailer=updated_data['retailer'],
-                                    price=updated_data['price'],
-                                    was_price=updated_data.get('was_price'),
-                                    on_sale=updated_data.get('on_sale', False),
-                                    url=updated_data.get('url')
-                                )
-                                
-                                if success:
-                                    successful_updates += 1
-                                    new_records += 1
-                                    db_success = True
-                                    logger.debug(f"Updated price for {product_name}: ${updated_data['price']}")
-                                    break
-                                else:
-                                    logger.warning(f"Database insert failed for {product_name} (attempt {retry + 1})")
-                                    if retry < max_db_retries - 1:
-                                        await asyncio.sleep(1.0)  # Wait before retry
-                                    
-                            except Exception as db_error:
-                                logger.error(f"Database error for {product_name} (attempt {retry + 1}): {db_error}")
-                                if retry < max_db_retries - 1:
-                                    await asyncio.sleep(1.0)  # Wait before retry
-                        
-                        if not db_success:
-                            failed_updates += 1
-                            logger.error(f"Failed to log price data for {product_name} after {max_db_retries} attempts")
+                    # Rows go to the background writer, so workers never wait on a commit
+                    row = outcome.get('data') or outcome.get('stale_data')
+                    if row:
+                        pending_writes.append((await self._enqueue_price(row), row, outcome['product']))
                     else:
-                        failed_updates += 1
-                        self.consecutive_failures += 1
-                        logger.warning(f"Could not find current price data for {product_name}")
-                        
-                        # Circuit breaker for smart updates (stricter threshold)
-                        if self.consecutive_failures >= 5:  # Lower threshold for smart updates
-                            logger.warning(f"Smart update circuit breaker triggered: {self.consecutive_failures} consecutive failures. Stopping early.")
-                            break
-                
-                except Exception as e:
-                    failed_updates += 1
-                    self.consecutive_failures += 1
-                    logger.error(f"Unexpected error updating {product_name}: {e}")
+                        totals.failed += 1
                     
-                    # Circuit breaker
-                    if self.consecutive_failures >= 5:
-                        logger.warning(f"Smart update circuit breaker triggered: {self.consecutive_failures} consecutive failures. Stopping early.")
-                        break
-                
-                # Respectful delay between requests (increased for API stability)
-                if updated_data:
-                    delay = 2.0  # 2 second delay for successful requests (increased from 1.0)
+                    progress(done, total_products, outcome['product_name'], 1, 1)
+            finally:
+                await self._cancel_pending(tasks)
+                progress.flush()
+            
+            # The run's stats need to know what was stored, so wait for its rows
+            for written, row, product in pending_writes:
+                if await written:
+                    totals.successful += 1
+                    totals.new_records += 1
+                    totals.stale += row.stale
+                    updated.append(product)
                 else:
-                    delay = 1.0  # 1 second delay for failed requests (increased from 0.5)
-                
-                await asyncio.sleep(delay)
+                    totals.failed += 1
+            _forget_missing(updated)
             
-            processed_products = successful_updates + failed_updates
-            success_rate = (successful_updates / processed_products) * 100 if processed_products > 0 else 0
+            processed_products = totals.successful + totals.failed
+            success_rate = (totals.successful / processed_products) * 100 if processed_products > 0 else 0
             
             result = {
                 "success": True,
-                "message": f"Smart update completed: {successful_updates}/{processed_products} products updated ({success_rate:.1f}% success rate)",
+                "message": f"Smart update completed: {totals.successful}/{processed_products} products updated ({success_rate:.1f}% success rate)",
                 "stats": {
                     "total_products_missing": total_products,
                     "products_processed": processed_products,
-                    "successful_updates": successful_updates,
-                    "failed_updates": failed_updates,
-                    "new_records": new_records,
+                    "successful_updates": totals.successful,
+                    "failed_updates": totals.failed,
+                    "new_records": totals.new_records,
                     "success_rate": round(success_rate, 1),
                     "update_type": "smart",
-                    "circuit_breaker_triggered": self.consecutive_failures >= 5
+                    "skipped_updates": totals.skipped,
+                    "stale_records": totals.stale,
+                    "circuit_breaker_triggered": any(lane.breaker.trip_count > 0 for lane in lanes.values())
                 }
             }
             
-            logger.info(f"Smart daily update completed: {result['message']}")
+            logger.info("Smart daily update completed: %s", result['message'])
             return result
             
         except Exception as e:
-            logger.error(f"Smart daily update failed: {e}")
+            logger.error("Smart daily update failed: %s", e)
             return {
                 "success": False,
                 "message": f"Smart daily update failed: {str(e)}",
@@ -454,7 +663,7 @@ class DailyPriceUpdater:
             failed_updates = 0
             new_records = 0
             
-            logger.info(f"Starting quick update: {total_products} products missing today's price data")
+            logger.info("Starting quick update: %s products missing today's price data", total_products)
             
             # Process products one by one
             for i, product in enumerate(products_to_update):
@@ -468,7 +677,7 @@ class DailyPriceUpdater:
                         progress_callback(current_index, total_products, product_name, 1, 1)
                     
                     # Search for current price data with timeout
-                    logger.info(f"Quick update {current_index}/{total_products}: {product_name}")
+                    logger.info("Quick update %s/%s: %s", current_index, total_products, product_name)
                     
                     try:
                         updated_data = await asyncio.wait_for(
@@ -476,77 +685,42 @@ class DailyPriceUpdater:
                             timeout=30.0  # 30 second timeout per product
                         )
                     except asyncio.TimeoutError:
-                        logger.warning(f"Timeout while updating {product_name} - skipping")
+                        logger.warning("Timeout while updating %s - skipping", product_name)
                         failed_updates += 1
                         continue
                     
                     if updated_data:
-                        logger.info(f"Found price data for {product_name}: ${updated_data['price']}")
+                        logger.info("Found price data for %s: $%s", product_name, updated_data.price)
                         
                         # Reset consecutive failures on successful API call
                         self.consecutive_failures = 0
                         
-                        # Database operation with retry logic
-                        max_db_retries = 3
-                        db_success = False
-                        
-                        for retry in range(max_db_retries):
-                            try:
-                                success = log_price_data(
-                                    product_name=updated_data['product_name'],
-                                    retailer=updated_data['retailer'],
-                                    price=updated_data['price'],
-                                    was_price=updated_data.get('was_price'),
-                                    on_sale=updated_data.get('on_sale', False),
-                                    url=updated_data.get('url')
-                                )
-                                
-                                if success:
-                                    successful_updates += 1
-                                    new_records += 1
-                                    db_success = True
-                                    logger.debug(f"Updated price for {product_name}: ${updated_data['price']}")
-                                    break
-                                else:
-                                    logger.warning(f"Database insert failed for {product_name} (attempt {retry + 1})")
-                                    if retry < max_db_retries - 1:
-                                        await asyncio.sleep(1.0)  # Wait before retry
-                                    
-                            except Exception as db_error:
-                                logger.error(f"Database error for {product_name} (attempt {retry + 1}): {db_error}")
-                                if retry < max_db_retries - 1:
-                                    await asyncio.sleep(1.0)  # Wait before retry
-                        
-                        if not db_success:
+                        if await self._store_price(updated_data):
+                            successful_updates += 1
+                            new_records += 1
+                            logger.debug("Updated price for %s: $%s", product_name, updated_data.price)
+                        else:
                             failed_updates += 1
-                            logger.error(f"Failed to log price data for {product_name} after {max_db_retries} attempts")
+                            logger.error("Failed to log price data for %s after %s attempts", product_name, DB_WRITE_RETRIES)
                     else:
                         failed_updates += 1
                         self.consecutive_failures += 1
-                        logger.warning(f"Could not find current price data for {product_name}")
+                        logger.warning("Could not find current price data for %s", product_name)
                         
                         # Quick update circuit breaker (very strict threshold)
                         if self.consecutive_failures >= 3:  # Very low threshold for quick updates
-                            logger.warning(f"Quick update circuit breaker triggered: {self.consecutive_failures} consecutive failures. Stopping early.")
+                            logger.warning("Quick update circuit breaker triggered: %s consecutive failures. Stopping early.", self.consecutive_failures)
                             break
                 
                 except Exception as e:
                     failed_updates += 1
                     self.consecutive_failures += 1
-                    logger.error(f"Unexpected error updating {product_name}: {e}")
+                    logger.error("Unexpected error updating %s: %s", product_name, e)
                     
                     # Circuit breaker
                     if self.consecutive_failures >= 3:
-                        logger.warning(f"Quick update circuit breaker triggered: {self.consecutive_failures} consecutive failures. Stopping early.")
+                        logger.warning("Quick update circuit breaker triggered: %s consecutive failures. Stopping early.", self.consecutive_failures)
                         break
-                
-                # Shorter delay for quick updates
-                if updated_data:
-                    delay = 1.0  # 1 second delay for successful requests
-                else:
-                    delay = 0.5  # 0.5 second delay for failed requests
-                
-                await asyncio.sleep(delay)
             
             processed_products = successful_updates + failed_updates
             success_rate = (successful_updates / processed_products) * 100 if processed_products > 0 else 0
@@ -566,11 +740,11 @@ class DailyPriceUpdater:
                 }
             }
             
-            logger.info(f"Quick update completed: {result['message']}")
+            logger.info("Quick update completed: %s", result['message'])
             return result
             
         except Exception as e:
-            logger.error(f"Quick update failed: {e}")
+            logger.error("Quick update failed: %s", e)
             return {
                 "success": False,
                 "message": f"Quick update failed: {str(e)}",
@@ -614,10 +788,9 @@ class DailyPriceUpdater:
                 }
             
             # Randomly select 5 products 
-            import random
             selected_products = random.sample(all_products, min(5, len(all_products)))
             
-            logger.info(f"Force updating {len(selected_products)} random products")
+            logger.info("Force updating %s random products", len(selected_products))
             
             successful_updates = 0
             failed_updates = 0
@@ -633,38 +806,39 @@ class DailyPriceUpdater:
                         progress = int((i / len(selected_products)) * 100)
                         await progress_callback(progress, f"Force updating {product_name}...")
                     
-                    logger.info(f"Force updating {i+1}/{len(selected_products)}: {product_name} ({retailer})")
+                    logger.info("Force updating %s/%s: %s (%s)", i+1, len(selected_products), product_name, retailer)
                     
                     # Extract search term and search for current price
                     search_term = self._extract_search_term(product_name)
-                    logger.debug(f"Using search term '{search_term}' for '{product_name}'")
+                    logger.debug("Using search term '%s' for '%s'", search_term, product_name)
                     
                     # Get current price from retailer
                     adapter = self.retailers.get(retailer.lower())
                     if not adapter:
-                        logger.error(f"No adapter for retailer: {retailer}")
+                        logger.error("No adapter for retailer: %s", retailer)
                         failed_updates += 1
                         continue
                     
-                    # Search for product
-                    search_results = await adapter.search(search_term, "2000")
+                    # Search for product, paced by the retailer's token bucket
+                    async with self._limiters[retailer.lower()]:
+                        search_results = await adapter.search(search_term, "2000")
                     
                     if not search_results:
-                        logger.warning(f"No search results for {search_term}")
+                        logger.warning("No search results for %s", search_term)
                         failed_updates += 1
                         continue
                     
                     # Find best match
-                    matcher = get_product_matcher()
-                    best_match, best_score = matcher.find_best_match(product_name, search_results)
+                    best_match, best_score = self.matcher.find_best_match(product_name, search_results)
                     
                     if not best_match or not best_score or best_score.total_score < 0.3:
-                        logger.warning(f"No good match found for {product_name} (score: {best_score.total_score if best_score else 0})")
+                        logger.warning("No good match found for %s (score: %s)", product_name, best_score.total_score if best_score else 0)
                         failed_updates += 1
                         continue
                     
                     # Log the updated price data (FORCE OVERWRITE today's data)
-                    updated_data = log_price_data(
+                    updated_data = await asyncio.to_thread(
+                        log_price_data,
                         product_name=product_name,
                         retailer=retailer,
                         price=best_match.price,
@@ -678,19 +852,16 @@ class DailyPriceUpdater:
                         successful_updates += 1
                         new_records += 1
                         self.consecutive_failures = 0  # Reset failure counter
-                        logger.info(f"✅ Force updated {product_name}: ${best_match.price}")
+                        logger.info("✅ Force updated %s: $%s", product_name, best_match.price)
                     else:
                         failed_updates += 1
                         self.consecutive_failures += 1
-                        logger.warning(f"❌ Failed to log data for {product_name}")
+                        logger.warning("❌ Failed to log data for %s", product_name)
                 
                 except Exception as e:
                     failed_updates += 1
                     self.consecutive_failures += 1
-                    logger.error(f"Unexpected error force updating {product_name}: {e}")
-                
-                # Short delay between requests
-                await asyncio.sleep(0.5)
+                    logger.error("Unexpected error force updating %s: %s", product_name, e)
             
             processed_products = successful_updates + failed_updates
             success_rate = (successful_updates / processed_products) * 100 if processed_products > 0 else 0
@@ -709,11 +880,11 @@ class DailyPriceUpdater:
                 }
             }
             
-            logger.info(f"Force update completed: {result['message']}")
+            logger.info("Force update completed: %s", result['message'])
             return result
             
         except Exception as e:
-            logger.error(f"Force update failed: {e}")
+            logger.error("Force update failed: %s", e)
             return {
                 "success": False,
                 "message": f"Force update failed: {str(e)}",
@@ -768,7 +939,7 @@ class DailyPriceUpdater:
             failed_updates = 0
             new_records = 0
             
-            logger.info(f"Starting daily update (25): {total_products} products missing today's price data")
+            logger.info("Starting daily update (25): %s products missing today's price data", total_products)
             
             # Process products one by one
             for i, product in enumerate(products_to_update):
@@ -782,7 +953,7 @@ class DailyPriceUpdater:
                         progress_callback(current_index, total_products, product_name, 1, 1)
                     
                     # Search for current price data with timeout
-                    logger.info(f"Daily update {current_index}/{total_products}: {product_name}")
+                    logger.info("Daily update %s/%s: %s", current_index, total_products, product_name)
                     
                     try:
                         updated_data = await asyncio.wait_for(
@@ -790,77 +961,42 @@ class DailyPriceUpdater:
                             timeout=30.0  # 30 second timeout per product
                         )
                     except asyncio.TimeoutError:
-                        logger.warning(f"Timeout while updating {product_name} - skipping")
+                        logger.warning("Timeout while updating %s - skipping", product_name)
                         failed_updates += 1
                         continue
                     
                     if updated_data:
-                        logger.info(f"Found price data for {product_name}: ${updated_data['price']}")
+                        logger.info("Found price data for %s: $%s", product_name, updated_data.price)
                         
                         # Reset consecutive failures on successful API call
                         self.consecutive_failures = 0
                         
-                        # Database operation with retry logic
-                        max_db_retries = 3
-                        db_success = False
-                        
-                        for retry in range(max_db_retries):
-                            try:
-                                success = log_price_data(
-                                    product_name=updated_data['product_name'],
-                                    retailer=updated_data['retailer'],
-                                    price=updated_data['price'],
-                                    was_price=updated_data.get('was_price'),
-                                    on_sale=updated_data.get('on_sale', False),
-                                    url=updated_data.get('url')
-                                )
-                                
-                                if success:
-                                    successful_updates += 1
-                                    new_records += 1
-                                    db_success = True
-                                    logger.debug(f"Updated price for {product_name}: ${updated_data['price']}")
-                                    break
-                                else:
-                                    logger.warning(f"Database insert failed for {product_name} (attempt {retry + 1})")
-                                    if retry < max_db_retries - 1:
-                                        await asyncio.sleep(1.0)  # Wait before retry
-                                    
-                            except Exception as db_error:
-                                logger.error(f"Database error for {product_name} (attempt {retry + 1}): {db_error}")
-                                if retry < max_db_retries - 1:
-                                    await asyncio.sleep(1.0)  # Wait before retry
-                        
-                        if not db_success:
+                        if await self._store_price(updated_data):
+                            successful_updates += 1
+                            new_records += 1
+                            logger.debug("Updated price for %s: $%s", product_name, updated_data.price)
+                        else:
                             failed_updates += 1
-                            logger.error(f"Failed to log price data for {product_name} after {max_db_retries} attempts")
+                            logger.error("Failed to log price data for %s after %s attempts", product_name, DB_WRITE_RETRIES)
                     else:
                         failed_updates += 1
                         self.consecutive_failures += 1
-                        logger.warning(f"Could not find current price data for {product_name}")
+                        logger.warning("Could not find current price data for %s", product_name)
                         
                         # Daily update circuit breaker (moderate threshold)
                         if self.consecutive_failures >= 5:  # Moderate threshold for daily updates
-                            logger.warning(f"Daily update circuit breaker triggered: {self.consecutive_failures} consecutive failures. Stopping early.")
+                            logger.warning("Daily update circuit breaker triggered: %s consecutive failures. Stopping early.", self.consecutive_failures)
                             break
                 
                 except Exception as e:
                     failed_updates += 1
                     self.consecutive_failures += 1
-                    logger.error(f"Unexpected error updating {product_name}: {e}")
+                    logger.error("Unexpected error updating %s: %s", product_name, e)
                     
                     # Circuit breaker
                     if self.consecutive_failures >= 5:
-                        logger.warning(f"Daily update circuit breaker triggered: {self.consecutive_failures} consecutive failures. Stopping early.")
+                        logger.warning("Daily update circuit breaker triggered: %s consecutive failures. Stopping early.", self.consecutive_failures)
                         break
-                
-                # Balanced delay for daily updates (between quick and smart)
-                if updated_data:
-                    delay = 1.5  # 1.5 second delay for successful requests
-                else:
-                    delay = 0.8  # 0.8 second delay for failed requests
-                
-                await asyncio.sleep(delay)
             
             processed_products = successful_updates + failed_updates
             success_rate = (successful_updates / processed_products) * 100 if processed_products > 0 else 0
@@ -880,11 +1016,11 @@ class DailyPriceUpdater:
                 }
             }
             
-            logger.info(f"Daily update (25) completed: {result['message']}")
+            logger.info("Daily update (25) completed: %s", result['message'])
             return result
             
         except Exception as e:
-            logger.error(f"Daily update (25) failed: {e}")
+            logger.error("Daily update (25) failed: %s", e)
             return {
                 "success": False,
                 "message": f"Daily update failed: {str(e)}",
@@ -899,7 +1035,293 @@ class DailyPriceUpdater:
                 }
             }
     
-    async def _get_current_price_data(self, product_name: str, retailer: str) -> Dict[str, Any]:
+    async def _process_one(self, breaker: CircuitBreaker, product: TrackedProduct, index: int,
+                           total: int) -> Dict[str, Any]:
+        """
+        Fetch the current price for one tracked product.
+        
+        Storing is left to the caller (bulk batch writes or the background writer).
+        
+        Args:
+            breaker: Circuit breaker for the current run; the product is
+                     skipped without calling the API while it is open
+            product: Tracked product to update
+            index: 1-based position of the product in the current run
+            total: Number of products in the current run
+            
+        Returns:
+            Dict with product_name and a status of "fetched" (with the PriceRow
+            under "data"), "not_found", "timeout", "error" or "skipped"
+        """
+        product_name, retailer = product
+        
+        if not breaker.can_execute():
+            logger.info("Circuit breaker open - skipping %s", product_name)
+            return {"product_name": product_name, "status": "skipped"}
+        
+        try:
+            logger.info("Updating product %d/%d: %s", index, total, product_name)
+            
+            # The retailer request itself is timed out inside _fetch_search, so
+            # waiting for a rate-limit slot or for matching never counts against it
+            try:
+                updated_data = await self._get_current_price_data(product_name, retailer)
+            except asyncio.TimeoutError:
+                logger.warning("Timeout while updating %s - skipping", product_name)
+                return {"product_name": product_name, "status": "timeout"}
+            
+            if not updated_data:
+                logger.warning("Could not find current price data for %s (search term extraction or API search failed)", product_name)
+                return {"product_name": product_name, "status": "not_found"}
+            
+            logger.info("Found price data for %s: $%s", product_name, updated_data.price)
+            return {"product_name": product_name, "status": "fetched", "data": updated_data}
+            
+        except Exception as e:
+            logger.error("Unexpected error updating %s: %s", product_name, e)
+            return {"product_name": product_name, "status": "error"}
+    
+    async def _fetch_batch(self, lanes: Dict[str, RetailerLane], progress: "_ThrottledProgress",
+                           batch_products: List[TrackedProduct], batch_num: int, total_batches: int,
+                           start_idx: int, total: int) -> Tuple[BatchStats, List[PriceRow]]:
+        """
+        Fetch one batch of products concurrently without storing them.
+        
+        Returns:
+            The batch's counters so far (failed/skipped/stale) and the rows to
+            write, including any stale fallback rows
+        """
+        logger.info("Processing batch %d/%d (%d products)", batch_num + 1, total_batches, len(batch_products))
+        
+        batch = BatchStats()
+        batch_done = 0
+        batch_rows = []
+        
+        # Fetch the whole batch concurrently; each retailer's lane bounds
+        # how many requests are in flight against that retailer's API
+        tasks = [
+            asyncio.create_task(self._run_bounded(
+                lanes[product.retailer], product, start_idx + i + 1, total
+            ))
+            for i, product in enumerate(batch_products)
+        ]
+        
+        try:
+            for completed in asyncio.as_completed(tasks):
+                outcome = await completed
+                batch_done += 1
+                
+                progress(start_idx + batch_done, total, outcome['product_name'], batch_num + 1, total_batches)
+                
+                if outcome['status'] == "skipped":
+                    batch.skipped += 1
+                
+                if outcome['status'] == "fetched":
+                    batch_rows.append(outcome['data'])
+                elif outcome.get('stale_data'):
+                    batch_rows.append(outcome['stale_data'])
+                    batch.stale += 1
+                else:
+                    batch.failed += 1
+        finally:
+            await self._cancel_pending(tasks)
+            progress.flush()  # Report the batch's final count before moving on
+        
+        return batch, batch_rows
+    
+    async def _store_price(self, updated_data: PriceRow) -> bool:
+        """
+        Log fetched price data, retrying with backoff + jitter so concurrent
+        writers don't hammer a locked database in lockstep.
+        
+        Returns:
+            True if the price was stored, False otherwise
+        """
+        def write_price():
+            # log_price_data blocks on the database, so run it on a worker
+            # thread to keep the event loop free for in-flight API requests
+            return asyncio.to_thread(
+                log_price_data,
+                product_name=updated_data.product_name,
+                retailer=updated_data.retailer,
+                price=updated_data.price,
+                was_price=updated_data.was_price,
+                on_sale=updated_data.on_sale,
+                url=updated_data.url,
+                stale=updated_data.stale
+            )
+        
+        try:
+            return bool(await retry_async(write_price, tries=DB_WRITE_RETRIES))
+        except Exception as db_error:
+            logger.error("Database error for %s: %s", updated_data.product_name, db_error)
+            return False
+    
+    async def _enqueue_price(self, row: PriceRow) -> "asyncio.Future[bool]":
+        """
+        Hand a price row to the background writer.
+        
+        Returns:
+            Future resolving to True once the row is stored, False if the write failed
+        """
+        written = asyncio.get_running_loop().create_future()
+        await self._write_queue.put((row, written))
+        
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+        
+        return written
+    
+    async def _flush_loop(self):
+        """Write queued rows in bulk until the queue is empty, then exit."""
+        while not self._write_queue.empty():
+            # Let concurrent workers add more rows to this write
+            await asyncio.sleep(WRITE_FLUSH_INTERVAL)
+            
+            pending = [
+                self._write_queue.get_nowait()
+                for _ in range(min(self._write_queue.qsize(), WRITE_FLUSH_MAX_ROWS))
+            ]
+            stored = await self._store_batch([row for row, _ in pending])
+            
+            # The bulk write skips rows missing a name or retailer and returns
+            # how many it stored, so resolve each row on its own. A count that
+            # doesn't match the storable rows leaves which ones landed unknown,
+            # and they are all reported as failed.
+            storable = [bool(row.product_name and row.retailer) for row, _ in pending]
+            all_storable_written = stored == sum(storable)
+            for (_, written), is_storable in zip(pending, storable):
+                if not written.done():
+                    written.set_result(is_storable and all_storable_written)
+    
+    async def _store_batch(self, rows: List[PriceRow]) -> int:
+        """
+        Log a batch of fetched price data in one transaction.
+        
+        Returns:
+            Number of rows stored (0 if every attempt failed)
+        """
+        if not rows:
+            return 0
+        
+        # Rows only become dicts here, at the database boundary
+        records = [asdict(row) for row in rows]
+        
+        try:
+            stored = await retry_async(lambda: asyncio.to_thread(log_price_data_bulk, records), tries=DB_WRITE_RETRIES)
+        except Exception as db_error:
+            logger.error("Database error storing batch of %s prices: %s", len(rows), db_error)
+            stored = 0
+        
+        if not stored:
+            logger.error("Failed to log batch of %s prices after %s attempts", len(rows), DB_WRITE_RETRIES)
+        
+        return stored or 0
+    
+    async def _run_bounded(self, lane: RetailerLane, product: TrackedProduct,
+                           index: int, total: int) -> Dict[str, Any]:
+        """
+        Run _process_one inside the product's retailer lane (API pacing is done
+        by the retailer's limiter in _search).
+        
+        The outcome also carries the ``product`` it was run for. When no price
+        could be fetched, it carries a ``stale_data`` row copying the last known
+        price (see _stale_fallback) for the caller to store.
+        """
+        async with lane.semaphore:
+            outcome = await self._process_one(lane.breaker, product, index, total)
+            
+            # Record before releasing the slot so the next product sees the new state
+            self._record_api_outcome(lane.breaker, outcome['status'])
+        
+        outcome['product'] = product
+        if outcome['status'] in FALLBACK_STATUSES:
+            try:
+                outcome['stale_data'] = await self._stale_fallback(product)
+            except Exception as e:
+                # Every task must return an outcome; one bad history row
+                # shouldn't abort the rest of the batch
+                logger.error("Stale price fallback failed for %s: %s", product.name, e)
+        
+        return outcome
+    
+    async def _stale_fallback(self, product: TrackedProduct) -> Optional[PriceRow]:
+        """
+        Build a stale price row from the product's last live price.
+        
+        Carrying the last known price forward during an API outage keeps
+        price charts free of gaps without putting more load on the retailer.
+        
+        Returns:
+            Row for log_price_data/log_price_data_bulk flagged ``stale``, or None
+            if there is no live price from the last STALE_MAX_AGE_DAYS days
+            (or today's price is already recorded)
+        """
+        last = await asyncio.to_thread(get_latest_price, product.name, product.retailer)
+        if not last:
+            return None
+        
+        age_days = (date.today() - date.fromisoformat(str(last['date_recorded']))).days
+        if not 0 < age_days <= STALE_MAX_AGE_DAYS:
+            return None
+        
+        logger.info("Carrying forward %s-day-old price for %s at %s", age_days, product.name, product.retailer)
+        return PriceRow(
+            product_name=product.name,
+            retailer=product.retailer,
+            price=last['price'],
+            was_price=last['was_price'],
+            on_sale=last['on_sale'],
+            url=last['url'],
+            stale=True
+        )
+    
+    def _current_timeout(self) -> float:
+        """Timeout for the next product fetch, tuned to the observed p95 latency."""
+        if len(self._latencies) < MIN_LATENCY_SAMPLES:
+            return DEFAULT_FETCH_TIMEOUT
+        
+        p95 = statistics.quantiles(self._latencies, n=20)[-1]
+        timeout = min(MAX_FETCH_TIMEOUT, max(MIN_FETCH_TIMEOUT, 1.5 * p95))
+        
+        if abs(timeout - self._fetch_timeout) >= 1.0:
+            logger.info("Adjusting per-product timeout from %.1fs to %.1fs (p95 latency %.2fs)", self._fetch_timeout, timeout, p95)
+            self._fetch_timeout = timeout
+        
+        return timeout
+    
+    def _new_circuit_breaker(self, failure_threshold: int) -> CircuitBreaker:
+        """Create a circuit breaker for one update run."""
+        return CircuitBreaker(
+            failure_threshold=failure_threshold,
+            timeout=self.circuit_breaker_timeout,
+            max_timeout=self.circuit_breaker_max_timeout
+        )
+    
+    def _new_lanes(self, products: Iterable[TrackedProduct], failure_threshold: int) -> Dict[str, RetailerLane]:
+        """Create one lane per retailer appearing in this run's products."""
+        return {
+            retailer: RetailerLane(asyncio.Semaphore(self.max_concurrency), self._new_circuit_breaker(failure_threshold))
+            for retailer in {product.retailer for product in products}
+        }
+    
+    @staticmethod
+    def _record_api_outcome(breaker: CircuitBreaker, status: str):
+        """Feed a _process_one status into the run's circuit breaker."""
+        if status == "fetched":
+            # The API answered, even if the database write later fails
+            breaker.record_success()
+        elif status in ("not_found", "error"):
+            breaker.record_failure()
+    
+    @staticmethod
+    async def _cancel_pending(tasks: List[asyncio.Task]):
+        """Cancel any tasks still running (e.g. if the run is interrupted)."""
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def _get_current_price_data(self, product_name: str, retailer: str) -> Optional[PriceRow]:
         """
         Get current price data for a specific product.
         
@@ -907,7 +1329,7 @@ class DailyPriceUpdater:
         """
         try:
             if retailer not in self.retailers:
-                logger.warning(f"Unsupported retailer: {retailer}")
+                logger.warning("Unsupported retailer: %s", retailer)
                 return None
             
             adapter = self.retailers[retailer]
@@ -916,84 +1338,87 @@ class DailyPriceUpdater:
             search_term = self._extract_search_term(product_name)
             
             # Search for the product
-            products = await adapter.search(search_term, "2000")  # Use default postcode
+            products = await self._search(retailer, adapter, search_term, "2000")  # Use default postcode
             
             if not products:
-                logger.debug(f"No products found for search term: {search_term}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("No products found for search term: %s", search_term)
                 return None
             
             # Find the best match using our matching algorithm
-            matcher = get_product_matcher()
-            best_match, score = matcher.find_best_match(product_name, products)
+            # Scoring is pure-Python CPU work; run it on the default thread pool so
+            # other workers' requests keep flowing while this product is matched
+            best_match, score = await asyncio.to_thread(self.matcher.find_best_match, product_name, products)
             
             if not best_match or not score or score.total_score < 0.2:  # Reduced threshold from 0.3 to 0.2
-                logger.warning(f"No good match found for {product_name} (best score: {score.total_score if score else 0}, search term: '{search_term}')")
+                logger.warning("No good match found for %s (best score: %s, search term: '%s')", product_name, score.total_score if score else 0, search_term)
                 return None
             
             # Return the updated price data
-            return {
-                "product_name": product_name,  # Keep the original normalized name
-                "retailer": retailer,
-                "price": best_match.price,
-                "was_price": best_match.was,
-                "on_sale": best_match.promoFlag or False,
-                "url": best_match.url
-            }
+            return PriceRow(
+                product_name=product_name,  # Keep the original normalized name
+                retailer=retailer,
+                price=best_match.price,
+                was_price=best_match.was,
+                on_sale=best_match.promoFlag or False,
+                url=best_match.url
+            )
             
+        except asyncio.TimeoutError:
+            # Reported as a timeout by the caller rather than as a missing product
+            raise
         except Exception as e:
-            logger.error(f"Error getting price data for {product_name}: {e}")
+            logger.error("Error getting price data for %s: %s", product_name, e)
             return None
     
-    def _extract_search_term(self, product_name: str) -> str:
-        """
-        Extract a good search term from the stored product name.
-        
-        For example:
-        "woolworths full cream milk 3l dummy" -> "milk"
-        "cc's corn chips taco 175g" -> "corn chips"
-        """
-        name = product_name.lower()
-        
-        # Remove "dummy" suffix if present
-        if "dummy" in name:
-            name = name.replace("dummy", "").strip()
-        
-        # Remove common brand prefixes
-        brands_to_remove = [
-            "woolworths ", "coles ", "cc's ", "wonder white ",
-            "kettle ", "thins ", "kitkat ", "coca cola ", "pepsi "
-        ]
+    async def _search(self, retailer: str, adapter, search_term: str, postcode: str) -> list:
+        """Search the retailer, reusing results for the same term within this run."""
+        key = (retailer, search_term, postcode)
+        now = time.monotonic()
         
-        for brand in brands_to_remove:
-            if name.startswith(brand):
-                name = name[len(brand):].strip()
-                break
+        cached = self._search_cache.get(key)
+        if cached and now - cached[0] < SEARCH_CACHE_TTL:
+            self._search_cache.move_to_end(key)
+            return cached[1]
         
-        # Remove size information and focus on the main product
-        # This is a simple approach - could be more sophisticated
-        words = name.split()
+        # Concurrent workers asking for the same term await the request that is
+        # already running instead of issuing their own. The shield keeps one
+        # worker's timeout from cancelling the search the others are waiting on.
+        pending = self._inflight_searches.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._fetch_search(key, retailer, adapter, search_term, postcode))
+            # Retrieve the exception even if every waiter has already given up
+            pending.add_done_callback(lambda f: f.cancelled() or f.exception())
+            self._inflight_searches[key] = pending
         
-        # Remove size-like words (numbers + units)
-        filtered_words = []
-        for word in words:
-            # Skip words that look like sizes (e.g., "3l", "175g", "700g")
-            if any(char.isdigit() for char in word) and any(char.isalpha() for char in word):
-                continue
-            # Skip standalone numbers
-            if word.isdigit():
-                continue
-            filtered_words.append(word)
-        
-        # Take the first few meaningful words (increased from 2 to 3)
-        search_term = " ".join(filtered_words[:3]) if filtered_words else name
+        return await asyncio.shield(pending)
+    
+    async def _fetch_search(self, key: Tuple[str, str, str], retailer: str, adapter, search_term: str, postcode: str) -> list:
+        """Run one rate-limited search, timing out the request alone, and cache its results."""
+        try:
+            # Every worker draws from the retailer's token bucket, so the request
+            # rate to each retailer stays fixed regardless of concurrency
+            async with self._limiters[retailer]:
+                started = time.monotonic()
+                async with asyncio.timeout(self._current_timeout()):
+                    products = await adapter.search(search_term, postcode)
+            # Only real requests are sampled; cache hits and coalesced waits
+            # return almost instantly and would drag the p95 down
+            self._latencies.append(time.monotonic() - started)
+        finally:
+            self._inflight_searches.pop(key, None)
         
-        # Fallback to first few words if nothing meaningful found
-        if not search_term.strip():
-            search_term = " ".join(words[:2]) if len(words) >= 2 else (words[0] if words else product_name)
+        self._search_cache[key] = (time.monotonic(), products)
+        self._search_cache.move_to_end(key)
+        if len(self._search_cache) > SEARCH_CACHE_MAX_SIZE:
+            self._search_cache.popitem(last=False)
         
-        logger.info(f"Extracted search term '{search_term}' from '{product_name}'")
-        return search_term.strip()
-
+        return products
+    
+    def _extract_search_term(self, product_name: str) -> str:
+        """Extract a good search term from the stored product name."""
+        search_term = self._search_terms.get(product_name)
+        return search_term if search_term is not None else _extract_search_term(product_name)
 
 # Global instance
 _daily_updater = None
@@ -1003,4 +1428,11 @@ def get_daily_updater():
     global _daily_updater
     if _daily_updater is None:
         _daily_updater = DailyPriceUpdater()
-    return _daily_updater
\ No newline at end of file
+    return _daily_updater
+
+async def close_daily_updater():
+    """Close the global daily updater's connections, if it was created."""
+    global _daily_updater
+    if _daily_updater is not None:
+        await _daily_updater.aclose()
+        _daily_updater = None
\ No newline at end of file
@@ -5,16 +5,54 @@ This module provides validation functions to ensure scraped product data
 meets quality standards and contains expected information.
 """
 
+import math
 import re
+import string
 import logging
-from typing import List, Dict, Any, Optional, Set
+from collections import Counter
+from typing import List, Dict, Any, Optional, Set, Iterator
 from dataclasses import dataclass
-from decimal import Decimal, InvalidOperation
 
 from ..models import ProductResult
 
 logger = logging.getLogger(__name__)
 
+# Compiled once at import; validation runs for every scraped product
+_URL_RE = re.compile(r'https?://[^\s<>"{}|\\^`\[\]]+')
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+
+# Common Australian grocery terms that should appear in product names
+_GROCERY_KEYWORDS = frozenset({
+    'milk', 'bread', 'butter', 'cheese', 'eggs', 'flour', 'sugar', 'rice', 
+    'pasta', 'cereal', 'yogurt', 'cream', 'meat', 'chicken', 'beef', 'pork',
+    'fish', 'salmon', 'tuna', 'apple', 'banana', 'orange', 'carrot', 'potato',
+    'tomato', 'lettuce', 'spinach', 'broccoli', 'onion', 'garlic', 'oil',
+    'sauce', 'soap', 'shampoo', 'tissue', 'paper', 'detergent', 'coffee',
+    'tea', 'chocolate', 'biscuit', 'cookie', 'juice', 'water', 'beer', 'wine'
+})
+
+# One alternation finds any keyword in a single pass over the name. Like a
+# plain substring test, it also matches inside longer words ("milkshake").
+_GROCERY_KEYWORD_RE = re.compile(
+    "|".join(re.escape(term) for term in sorted(_GROCERY_KEYWORDS, key=len, reverse=True))
+)
+
+_VALID_RETAILERS = frozenset({'woolworths', 'coles'})
+
+# Cheap screen run before the suspicious-pattern regex. A name made only of
+# these characters can't contain a tag or an unusual character, and without a
+# ':' it can't hold a URL or "javascript:"; only placeholder words remain
+# possible. Deliberately a subset of what the regex allows.
+_PLAIN_NAME_CHARS = frozenset(string.ascii_letters + string.digits + "_ -.()&$+%/',")
+_PLACEHOLDER_WORDS = ('lorem', 'ipsum', 'placeholder', 'test', 'sample', 'example')
+
+# Quality score deduction per issue, by severity
+_SEVERITY_WEIGHTS = {
+    "error": -0.3,
+    "warning": -0.1,
+    "info": -0.05
+}
+
 @dataclass
 class ValidationIssue:
     """Represents a validation issue found in product data."""
@@ -37,31 +75,27 @@ class ProductDataValidator:
     """
     
     def __init__(self):
-        # Common Australian grocery terms that should appear in product names
-        self.grocery_keywords = {
-            'milk', 'bread', 'butter', 'cheese', 'eggs', 'flour', 'sugar', 'rice', 
-            'pasta', 'cereal', 'yogurt', 'cream', 'meat', 'chicken', 'beef', 'pork',
-            'fish', 'salmon', 'tuna', 'apple', 'banana', 'orange', 'carrot', 'potato',
-            'tomato', 'lettuce', 'spinach', 'broccoli', 'onion', 'garlic', 'oil',
-            'sauce', 'soap', 'shampoo', 'tissue', 'paper', 'detergent', 'coffee',
-            'tea', 'chocolate', 'biscuit', 'cookie', 'juice', 'water', 'beer', 'wine'
-        }
-        
         # Valid price range (in AUD)
         self.min_price = 0.01
         self.max_price = 999.99
         
-        # Valid retailers
-        self.valid_retailers = {'woolworths', 'coles'}
-        
         # Suspicious patterns in product names
         self.suspicious_patterns = [
-            r'<[^>]+>',  # HTML tags
-            r'javascript:',  # JavaScript
-            r'[^\w\s\-\.\(\)&\$\+\%\/\:\'\,]',  # Unusual characters
-            r'\b(lorem|ipsum|placeholder|test|sample|example)\b',  # Placeholder text
-            r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+',  # URLs
+            re.compile(pattern, re.IGNORECASE) for pattern in (
+                r'<[^>]+>',  # HTML tags
+                r'javascript:',  # JavaScript
+                r'[^\w\s\-\.\(\)&\$\+\%\/\:\'\,]',  # Unusual characters
+                r'\b(lorem|ipsum|placeholder|test|sample|example)\b',  # Placeholder text
+                r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+',  # URLs
+            )
         ]
+        
+        # All suspicious patterns as one alternation, so clean names (the vast
+        # majority) are cleared in a single scan
+        self._any_suspicious = re.compile(
+            "|".join(f"(?:{pattern.pattern})" for pattern in self.suspicious_patterns),
+            re.IGNORECASE
+        )
     
     def validate_product_name(self, name: str) -> List[ValidationIssue]:
         """Validate product name for quality and consistency."""
@@ -96,19 +130,25 @@ class ProductDataValidator:
                 severity="warning"
             ))
         
-        # Check for suspicious patterns
-        for pattern in self.suspicious_patterns:
-            if re.search(pattern, name, re.IGNORECASE):
-                issues.append(ValidationIssue(
-                    field="name",
-                    issue_type="suspicious_content",
-                    message=f"Suspicious pattern found in name: {pattern}",
-                    severity="error"
-                ))
+        name_lower = name.lower()
+        
+        # Check for suspicious patterns. Matches can overlap (an HTML tag also
+        # contains unusual characters), so only a hit on the combined pattern
+        # is worth checking pattern by pattern to report each one. Plain names
+        # skip the regex altogether.
+        plain = _PLAIN_NAME_CHARS.issuperset(name) and not any(word in name_lower for word in _PLACEHOLDER_WORDS)
+        if not plain and self._any_suspicious.search(name):
+            for pattern in self.suspicious_patterns:
+                if pattern.search(name):
+                    issues.append(ValidationIssue(
+                        field="name",
+                        issue_type="suspicious_content",
+                        message=f"Suspicious pattern found in name: {pattern.pattern}",
+                        severity="error"
+                    ))
         
         # Check if name contains common grocery terms
-        name_lower = name.lower()
-        contains_grocery_term = any(term in name_lower for term in self.grocery_keywords)
+        contains_grocery_term = _GROCERY_KEYWORD_RE.search(name_lower) is not None
         
         if not contains_grocery_term:
             issues.append(ValidationIssue(
@@ -120,11 +160,8 @@ class ProductDataValidator:
         
         # Check for repeated text (common scraping error)
         words = name_lower.split()
-        if len(words) > 2:
-            word_counts = {}
-            for word in words:
-                if len(word) > 2:  # Only check meaningful words
-                    word_counts[word] = word_counts.get(word, 0) + 1
+        if len(words) > 2:  # A word needs three occurrences to count as repeated
+            word_counts = Counter(word for word in words if len(word) > 2)  # Only check meaningful words
             
             repeated_words = [word for word, count in word_counts.items() if count > 2]
             if repeated_words:
@@ -159,23 +196,22 @@ class ProductDataValidator:
                     severity="warning"
                 ))
             
-            # Check for impossible precision (more than 2 decimal places)
-            try:
-                decimal_price = Decimal(str(price))
-                if decimal_price.as_tuple().exponent < -2:
-                    issues.append(ValidationIssue(
-                        field="price",
-                        issue_type="invalid_precision",
-                        message=f"Price has too many decimal places: ${price}",
-                        severity="warning"
-                    ))
-            except InvalidOperation:
+            # Check for impossible precision (more than 2 decimal places). The
+            # tolerance absorbs float noise such as 0.1 + 0.2.
+            if not math.isfinite(price):
                 issues.append(ValidationIssue(
                     field="price",
                     issue_type="invalid_format",
                     message=f"Price format invalid: {price}",
                     severity="error"
                 ))
+            elif abs(round(price, 2) - price) > 1e-9:
+                issues.append(ValidationIssue(
+                    field="price",
+                    issue_type="invalid_precision",
+                    message=f"Price has too many decimal places: ${price}",
+                    severity="warning"
+                ))
         
         # Validate was_price if provided
         if was_price is not None:
@@ -213,7 +249,7 @@ class ProductDataValidator:
             return issues
         
         # Check URL format
-        if not re.match(r'https?://[^\s<>"{}|\\^`\[\]]+', url):
+        if not _URL_RE.match(url):
             issues.append(ValidationIssue(
                 field="url",
                 issue_type="invalid_format",
@@ -261,7 +297,7 @@ class ProductDataValidator:
             ))
             return issues
         
-        if retailer.lower() not in self.valid_retailers:
+        if retailer.lower() not in _VALID_RETAILERS:
             issues.append(ValidationIssue(
                 field="retailer",
                 issue_type="invalid_value",
@@ -301,7 +337,7 @@ class ProductDataValidator:
         # Validate promo text content
         if promo_text:
             # Check for suspicious content
-            if re.search(r'<[^>]+>', promo_text):
+            if _HTML_TAG_RE.search(promo_text):
                 issues.append(ValidationIssue(
                     field="promoText",
                     issue_type="contains_html",
@@ -330,19 +366,8 @@ class ProductDataValidator:
         Returns:
             Validation result with issues and quality score
         """
-        all_issues = []
-        
         # Validate each field
-        all_issues.extend(self.validate_product_name(product.name or ""))
-        all_issues.extend(self.validate_price(product.price, product.was))
-        all_issues.extend(self.validate_url(product.url, product.retailer or ""))
-        all_issues.extend(self.validate_retailer(product.retailer))
-        all_issues.extend(self.validate_promo_data(
-            product.promoText, 
-            product.promoFlag, 
-            product.price, 
-            product.was
-        ))
+        all_issues = [issue for field_issues in self._field_issues(product) for issue in field_issues]
         
         # Calculate quality score
         quality_score = self._calculate_quality_score(all_issues)
@@ -366,7 +391,7 @@ class ProductDataValidator:
         # Log validation result
         if critical_errors:
             logger.warning(
-                f"Product validation failed: {product.name}",
+                "Product validation failed: %s", product.name,
                 extra={
                     "retailer": product.retailer,
                     "errors": len(critical_errors),
@@ -374,9 +399,9 @@ class ProductDataValidator:
                     "quality_score": quality_score
                 }
             )
-        elif all_issues:
+        elif all_issues and logger.isEnabledFor(logging.DEBUG):
             logger.debug(
-                f"Product validation passed with issues: {product.name}",
+                "Product validation passed with issues: %s", product.name,
                 extra={
                     "retailer": product.retailer,
                     "warnings": len([i for i in all_issues if i.severity == "warning"]),
@@ -386,19 +411,58 @@ class ProductDataValidator:
         
         return result
     
+    def validate_batch(self, products: List[ProductResult],
+                       min_quality_score: float = 0.0) -> List[Optional[ProductResult]]:
+        """
+        Validate many products when only pass/fail matters.
+        
+        Gives the same verdicts as validate_product, but builds no result
+        objects or log records, and stops checking a product as soon as it
+        has an error or its score drops below min_quality_score.
+        
+        Args:
+            products: Products to validate
+            min_quality_score: Minimum quality score to pass
+            
+        Returns:
+            The cleaned product for each input that passed, None otherwise
+        """
+        return [self._passes(product, min_quality_score) for product in products]
+    
+    def _passes(self, product: ProductResult, min_quality_score: float) -> Optional[ProductResult]:
+        """Return the cleaned product if it is valid and meets the score."""
+        total_deduction = 0.0
+        for field_issues in self._field_issues(product):
+            for issue in field_issues:
+                if issue.severity == "error":
+                    return None
+                total_deduction += _SEVERITY_WEIGHTS.get(issue.severity, -0.1)
+            
+            # Further issues can only lower the score
+            if max(0.0, min(1.0, 1.0 + total_deduction)) < min_quality_score:
+                return None
+        
+        return self._clean_product_data(product)
+    
+    def _field_issues(self, product: ProductResult) -> Iterator[List[ValidationIssue]]:
+        """Validate each field in turn, lazily so callers can stop early."""
+        yield self.validate_product_name(product.name or "")
+        yield self.validate_price(product.price, product.was)
+        yield self.validate_url(product.url, product.retailer or "")
+        yield self.validate_retailer(product.retailer)
+        yield self.validate_promo_data(
+            product.promoText, 
+            product.promoFlag, 
+            product.price, 
+            product.was
+        )
+    
     def _calculate_quality_score(self, issues: List[ValidationIssue]) -> float:
         """Calculate a quality score from 0-1 based on validation issues."""
         if not issues:
             return 1.0
         
-        # Weight different issue types
-        weights = {
-            "error": -0.3,
-            "warning": -0.1,
-            "info": -0.05
-        }
-        
-        total_deduction = sum(weights.get(issue.severity, -0.1) for issue in issues)
+        total_deduction = sum(_SEVERITY_WEIGHTS.get(issue.severity, -0.1) for issue in issues)
         
         # Ensure score stays between 0 and 1
         quality_score = max(0.0, min(1.0, 1.0 + total_deduction))
@@ -406,16 +470,16 @@ class ProductDataValidator:
         return quality_score
     
     def _clean_product_data(self, product: ProductResult) -> ProductResult:
-        """Clean and normalize product data."""
-        # Create a copy with cleaned data
+        """
+        Clean and normalize product data.
+        
+        Most scraped products are already clean; those are returned as-is
+        rather than copied.
+        """
         cleaned_data = {
             "name": (product.name or "").strip(),
-            "price": product.price,
-            "was": product.was,
             "promoText": (product.promoText or "").strip() if product.promoText else None,
-            "promoFlag": product.promoFlag,
             "url": (product.url or "").strip() if product.url else None,
-            "inStock": product.inStock,
             "retailer": (product.retailer or "").lower()
         }
         
@@ -424,7 +488,12 @@ class ProductDataValidator:
             if cleaned_data[key] == "":
                 cleaned_data[key] = None
         
-        return ProductResult(**cleaned_data)
+        if all(getattr(product, key) == value for key, value in cleaned_data.items()):
+            return product
+        
+        # The cleaned values came from an already validated model, so copy
+        # without re-running validation
+        return product.model_copy(update=cleaned_data)
 
 # Global validator instance
 _product_validator = ProductDataValidator()
@@ -448,14 +517,15 @@ def validate_scraped_products(products: List[ProductResult],
     validator = get_product_validator()
     validated_products = []
     
-    for product in products:
-        validation_result = validator.validate_product(product)
-        
-        if validation_result.is_valid and validation_result.quality_score >= min_quality_score:
-            validated_products.append(validation_result.validated_product)
+    for product, validated in zip(products, validator.validate_batch(products, min_quality_score)):
+        if validated is not None:
+            validated_products.append(validated)
         else:
+            # Rejects are the exception, so they get the full validation for
+            # diagnostics; validate_product warns about products with errors
+            validation_result = validator.validate_product(product)
             logger.debug(
-                f"Product filtered due to low quality: {product.name}",
+                "Product filtered due to low quality: %s", product.name,
                 extra={
                     "quality_score": validation_result.quality_score,
                     "min_required": min_quality_score,
@@ -464,7 +534,7 @@ def validate_scraped_products(products: List[ProductResult],
             )
     
     logger.info(
-        f"Product validation completed: {len(validated_products)}/{len(products)} products passed",
+        "Product validation completed: %s/%s products passed", len(validated_products), len(products),
         extra={
             "total_products": len(products),
             "validated_products": len(validated_products),
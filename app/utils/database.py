@@ -2,108 +2,378 @@
 Database utilities for price history tracking.
 """
 
+import atexit
+import queue
 import sqlite3
 import logging
+import threading
 from datetime import datetime, date, timezone
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator
 from contextlib import contextmanager
+from functools import lru_cache, wraps
+from operator import itemgetter
 import os
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
 # Database file path - use absolute path to ensure it's found
-DB_PATH = "/Users/nickmirsepassi/nick-claude/test02/price_history.db"
+DB_PATH = os.getenv("DB_PATH", "/Users/nickmirsepassi/nick-claude/test02/price_history.db")
+
+# Page cache per connection, in KiB (negative values are KiB for PRAGMA cache_size)
+SQLITE_CACHE_SIZE_KIB = 64000
+
+# Wait this long for a competing writer's lock instead of failing with
+# "database is locked"
+SQLITE_BUSY_TIMEOUT_MS = 5000
+
+# Keep temp tables and sort spill in memory. Off by default: large sorts
+# then grow process memory instead of using temp files.
+SQLITE_TEMP_STORE_MEMORY = os.getenv("SQLITE_TEMP_STORE_MEMORY", "").lower() in ("1", "true", "yes")
+
+# Idle connections kept open for reuse. Reusing a connection skips the
+# open/PRAGMA cost and keeps its warm page cache between calls.
+SQLITE_POOL_SIZE = 8
+
+# Compiled statements kept per connection. Pooled connections live long,
+# so each hot statement is parsed and planned once rather than per call.
+SQLITE_CACHED_STATEMENTS = 256
+
+# Memory-map up to this many bytes of the database file, so reads are
+# served from the OS page cache without copying into SQLite's own cache.
+# Set SQLITE_MMAP_SIZE=0 to disable.
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+# Mapping a tiny database costs more than it saves, so smaller files skip it
+SQLITE_MMAP_MIN_DB_SIZE = 1_000_000
+
+# Database files already switched to WAL in this process. journal_mode is
+# stored in the file, so it only needs setting once per database.
+_wal_enabled = set()
+
+
+def _configure_connection(conn: sqlite3.Connection):
+    """Apply performance PRAGMAs to a newly opened connection."""
+    if DB_PATH not in _wal_enabled:
+        # Readers no longer block the writer (or vice versa), and a commit
+        # appends to the log instead of rewriting pages through a rollback journal
+        conn.execute("PRAGMA journal_mode=WAL")
+        _wal_enabled.add(DB_PATH)
+    
+    # Per-connection settings. NORMAL is durable in WAL mode apart from the
+    # last transactions before a power loss, and avoids an fsync per commit.
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    conn.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KIB}")
+    if SQLITE_TEMP_STORE_MEMORY:
+        conn.execute("PRAGMA temp_store=MEMORY")
+    if SQLITE_MMAP_SIZE and _database_size() >= SQLITE_MMAP_MIN_DB_SIZE:
+        conn.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+
+
+def _database_size() -> int:
+    """Size in bytes of the database file at DB_PATH (0 if it can't be read)."""
+    try:
+        return os.path.getsize(DB_PATH)
+    except OSError:
+        return 0
+
+
+# Most recently returned connection is reused first, so the warmest cache
+# serves the next call. All pooled connections belong to _pool_path.
+_pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=SQLITE_POOL_SIZE)
+_pool_path = None
+_pool_lock = threading.Lock()
+
+
+def _new_connection() -> sqlite3.Connection:
+    # A pooled connection may be checked out by a different thread each time;
+    # it is never used by two threads at once
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=SQLITE_CACHED_STATEMENTS)
+    conn.row_factory = sqlite3.Row  # Enable dict-like access to rows
+    _configure_connection(conn)
+    return conn
+
+
+def _acquire_connection() -> sqlite3.Connection:
+    """Take an idle pooled connection for DB_PATH, or open a new one."""
+    global _pool_path
+    with _pool_lock:
+        if _pool_path != DB_PATH:
+            # The database moved (tests point DB_PATH at temp files); the
+            # pooled connections belong to the old file
+            _close_pooled_connections()
+            _pool_path = DB_PATH
+        try:
+            return _pool.get_nowait()
+        except queue.Empty:
+            pass
+    return _new_connection()
+
+
+def _release_connection(conn: sqlite3.Connection):
+    """Return a connection to the pool, closing it if the pool is full or stale."""
+    if conn.in_transaction:
+        # Uncommitted work is discarded, as closing the connection used to do
+        conn.rollback()
+    with _pool_lock:
+        if _pool_path == DB_PATH:
+            try:
+                _pool.put_nowait(conn)
+                return
+            except queue.Full:
+                pass
+    _close_connection(conn)
+
+
+def _close_connection(conn: sqlite3.Connection):
+    """Close a connection, first letting SQLite refresh planner statistics."""
+    try:
+        # Cheap unless tables changed enough since the last ANALYZE to matter;
+        # works from what this connection's queries touched
+        conn.execute("PRAGMA optimize")
+    except sqlite3.Error as e:
+        logger.debug("PRAGMA optimize failed: %s", e)
+    conn.close()
+
+
+def _close_pooled_connections():
+    while True:
+        try:
+            _close_connection(_pool.get_nowait())
+        except queue.Empty:
+            return
+
+
+def close_db_connections():
+    """Close every idle pooled connection (called automatically at exit)."""
+    with _pool_lock:
+        _close_pooled_connections()
+
+
+atexit.register(close_db_connections)
 
 
 @contextmanager
 def get_db_connection():
-    """Get database connection with proper error handling."""
+    """Get a pooled database connection with proper error handling."""
     conn = None
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row  # Enable dict-like access to rows
+        conn = _acquire_connection()
         yield conn
     except Exception as e:
         if conn:
-            conn.rollback()
-        logger.error(f"Database error: {e}")
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                # A connection that can't roll back isn't fit for reuse
+                conn.close()
+                conn = None
+        logger.error("Database error: %s", e)
         raise
     finally:
         if conn:
-            conn.close()
+            _release_connection(conn)
+
+
+
+def _db_op(message: str, default: Any = None):
+    """
+    Decorator for database functions that log failures instead of raising.
+    
+    Args:
+        message: Logged, with the exception, when the call fails
+        default: Value returned on failure; a callable (e.g. list) is called
+                 so each failure gets a fresh object
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                logger.error("%s: %s", message, e)
+                return default() if callable(default) else default
+        return wrapper
+    return decorator
+
+# Bump whenever SCHEMA_DDL or the migrations in init_database change; the
+# version is stored in the database file (PRAGMA user_version), so an
+# up-to-date database is recognised with a single read
+SCHEMA_VERSION = 3
+
+SCHEMA_DDL = """
+    CREATE TABLE IF NOT EXISTS price_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        product_name TEXT NOT NULL,
+        retailer TEXT NOT NULL,
+        price REAL,
+        was_price REAL,
+        on_sale BOOLEAN DEFAULT FALSE,
+        date_recorded DATE NOT NULL,
+        url TEXT,
+        stale BOOLEAN DEFAULT FALSE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(product_name, retailer, date_recorded)
+    );
+    
+    CREATE TABLE IF NOT EXISTS alternative_products (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        search_query TEXT NOT NULL,
+        retailer TEXT NOT NULL,
+        product_name TEXT NOT NULL,
+        price REAL,
+        was_price REAL,
+        on_sale BOOLEAN DEFAULT FALSE,
+        promo_text TEXT,
+        url TEXT,
+        match_score REAL,
+        rank_position INTEGER,
+        date_recorded DATE NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    
+    CREATE TABLE IF NOT EXISTS favorites (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        product_name TEXT NOT NULL,
+        retailer TEXT NOT NULL DEFAULT 'woolworths',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(product_name, retailer)
+    );
+    
+    -- Indexes for faster queries
+    CREATE INDEX IF NOT EXISTS idx_product_retailer_date 
+    ON price_history(product_name, retailer, date_recorded);
+    
+    -- One row per rank per search, so a re-run can upsert in place. Both
+    -- alternatives indexes match get_alternative_products' ORDER BY
+    -- (newest date first, then rank), with or without a retailer filter,
+    -- so results are read in order instead of sorted
+    DROP INDEX IF EXISTS idx_alternatives_query_retailer_date;
+    DROP INDEX IF EXISTS idx_alternatives_query_retailer_date_rank;
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_alternatives_query_retailer_recent 
+    ON alternative_products(search_query, retailer, date_recorded DESC, rank_position);
+    
+    CREATE INDEX IF NOT EXISTS idx_alternatives_query_recent 
+    ON alternative_products(search_query, date_recorded DESC, rank_position);
+    
+    CREATE INDEX IF NOT EXISTS idx_alternatives_product_name 
+    ON alternative_products(product_name);
+"""
 
 
 def init_database():
-    """Initialize the database with required tables."""
+    """Initialize the database with required tables, unless already current."""
     with get_db_connection() as conn:
-        cursor = conn.cursor()
-        
-        # Create price_history table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS price_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                product_name TEXT NOT NULL,
-                retailer TEXT NOT NULL,
-                price REAL,
-                was_price REAL,
-                on_sale BOOLEAN DEFAULT FALSE,
-                date_recorded DATE NOT NULL,
-                url TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(product_name, retailer, date_recorded)
-            )
-        """)
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
         
-        # Create alternative_products table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS alternative_products (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                search_query TEXT NOT NULL,
-                retailer TEXT NOT NULL,
-                product_name TEXT NOT NULL,
-                price REAL,
-                was_price REAL,
-                on_sale BOOLEAN DEFAULT FALSE,
-                promo_text TEXT,
-                url TEXT,
-                match_score REAL,
-                rank_position INTEGER,
-                date_recorded DATE NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Create favorites table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS favorites (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                product_name TEXT NOT NULL,
-                retailer TEXT NOT NULL DEFAULT 'woolworths',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(product_name, retailer)
-            )
-        """)
-        
-        # Create indexes for faster queries
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_product_retailer_date 
-            ON price_history(product_name, retailer, date_recorded)
-        """)
+        # Older databases may hold repeated ranks for a search, which would
+        # block the unique index; keep the newest row of each
+        has_alternatives = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'alternative_products'"
+        ).fetchone()
+        if has_alternatives:
+            conn.execute("""
+                DELETE FROM alternative_products WHERE id NOT IN (
+                    SELECT MAX(id) FROM alternative_products
+                    GROUP BY search_query, retailer, date_recorded, rank_position
+                )
+            """)
         
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_alternatives_query_retailer_date 
-            ON alternative_products(search_query, retailer, date_recorded)
-        """)
+        conn.executescript(SCHEMA_DDL)
         
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_alternatives_product_name 
-            ON alternative_products(product_name)
-        """)
+        # Databases created before the stale flag existed need the column added
+        columns = {row['name'] for row in conn.execute("PRAGMA table_info(price_history)")}
+        if 'stale' not in columns:
+            conn.execute("ALTER TABLE price_history ADD COLUMN stale BOOLEAN DEFAULT FALSE")
         
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
         conn.commit()
+        
+        # New indexes have no statistics yet; gather any the planner needs
+        conn.execute("PRAGMA optimize")
         logger.info("Database initialized successfully")
 
 
+# Hot-path statements. The statement cache is keyed on the exact SQL text,
+# so each is written once here and shared by every caller.
+_SQL_UPSERT_PRICE = """
+    INSERT OR REPLACE INTO price_history 
+    (product_name, retailer, price, was_price, on_sale, date_recorded, url, stale)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_ALTERNATIVES_JSON = """
+    SELECT json_group_array(json_object(
+        'search_query', search_query,
+        'retailer', retailer,
+        'product_name', product_name,
+        'price', price,
+        'was_price', was_price,
+        'on_sale', json(CASE WHEN on_sale THEN 'true' ELSE 'false' END),
+        'promo_text', promo_text,
+        'url', url,
+        'match_score', match_score,
+        'rank_position', rank_position,
+        'date_recorded', date_recorded,
+        'created_at', created_at
+    ))
+    FROM (
+        SELECT * FROM alternative_products 
+        WHERE search_query = ?
+        AND date_recorded >= date('now', ?)
+        {retailer_filter}
+        ORDER BY date_recorded DESC, rank_position ASC
+    )
+"""
+
+_SQL_UPSERT_ALTERNATIVE = """
+    INSERT INTO alternative_products 
+    (search_query, retailer, product_name, price, was_price, on_sale, 
+     promo_text, url, match_score, rank_position, date_recorded)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (search_query, retailer, date_recorded, rank_position) DO UPDATE SET
+        product_name = excluded.product_name,
+        price = excluded.price,
+        was_price = excluded.was_price,
+        on_sale = excluded.on_sale,
+        promo_text = excluded.promo_text,
+        url = excluded.url,
+        match_score = excluded.match_score,
+        created_at = CURRENT_TIMESTAMP
+"""
+
+_SQL_DELETE_TRAILING_ALTERNATIVES = """
+    DELETE FROM alternative_products 
+    WHERE search_query = ? AND retailer = ? AND date_recorded = ? AND rank_position > ?
+"""
+
+
+# Use Australian timezone for accurate local date recording
+try:
+    import zoneinfo
+    _AUS_TZ = zoneinfo.ZoneInfo("Australia/Sydney")
+except ImportError:
+    # Fallback for Python < 3.9
+    from datetime import timedelta
+    # Approximate Australian timezone (UTC+10/+11 depending on DST)
+    _AUS_TZ = timezone(timedelta(hours=10))
+
+
+def _record_date(date_recorded: Optional[date] = None) -> str:
+    """
+    ISO date string to store for a record, defaulting to today in Australia.
+    
+    Dates are bound as TEXT, which skips sqlite3's Python-level date adapter.
+    """
+    return (date_recorded or datetime.now(_AUS_TZ).date()).isoformat()
+
+
+# Product names recur on every update run and every lookup, so normalized
+# forms are memoized (strings are immutable, so sharing results is safe)
+@lru_cache(maxsize=4096)
 def normalize_product_name(product_name: str) -> str:
     """Normalize product name for consistent storage."""
     if not product_name:
@@ -119,6 +389,54 @@ def normalize_product_name(product_name: str) -> str:
     return normalized
 
 
+# Alternative product fields in column order, with the value stored when
+# one is missing
+_ALTERNATIVE_DEFAULTS = {
+    'name': '',
+    'price': None,
+    'was': None,
+    'onSale': False,
+    'promoText': None,
+    'url': None,
+    'matchScore': None,
+}
+_alternative_fields = itemgetter(*_ALTERNATIVE_DEFAULTS)
+
+
+def _alternative_rows(
+    normalized_query: str,
+    retailer: str,
+    alternatives: List[Dict[str, Any]],
+    record_date: Any
+) -> List[tuple]:
+    """Build alternative_products parameter tuples, ranked in list order."""
+    rows = []
+    for rank_position, alt in enumerate(alternatives, 1):
+        try:
+            # Alternatives from the checker carry every field, so one C-level
+            # lookup usually pulls them all
+            name, price, was, on_sale, promo_text, url, match_score = _alternative_fields(alt)
+        except KeyError:
+            name, price, was, on_sale, promo_text, url, match_score = _alternative_fields(
+                {**_ALTERNATIVE_DEFAULTS, **alt}
+            )
+        rows.append((
+            normalized_query,
+            retailer,
+            normalize_product_name(name),
+            price,
+            was,
+            on_sale,
+            promo_text,
+            url,
+            match_score,
+            rank_position,
+            record_date
+        ))
+    return rows
+
+
+@_db_op("Failed to log alternative products", default=False)
 def log_alternative_products(
     search_query: str,
     retailer: str,
@@ -141,59 +459,29 @@ def log_alternative_products(
         logger.warning("Missing required fields for alternatives logging")
         return False
     
-    try:
-        normalized_query = normalize_product_name(search_query)
-        # Use Australian timezone for accurate local date recording
-        try:
-            import zoneinfo
-            aus_tz = zoneinfo.ZoneInfo("Australia/Sydney")
-        except ImportError:
-            # Fallback for Python < 3.9
-            from datetime import timezone, timedelta
-            # Approximate Australian timezone (UTC+10/+11 depending on DST)
-            aus_tz = timezone(timedelta(hours=10))
+    normalized_query = normalize_product_name(search_query)
+    record_date = _record_date(date_recorded)
+    
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
         
-        record_date = date_recorded or datetime.now(aus_tz).date()
+        # Write each rank in place with one executemany call
+        cursor.executemany(_SQL_UPSERT_ALTERNATIVE, _alternative_rows(
+            normalized_query, retailer, alternatives, record_date
+        ))
         
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # First, delete any existing alternatives for this query/retailer/date
-            cursor.execute("""
-                DELETE FROM alternative_products 
-                WHERE search_query = ? AND retailer = ? AND date_recorded = ?
-            """, (normalized_query, retailer, record_date))
-            
-            # Insert new alternatives
-            for rank_position, alt in enumerate(alternatives, 1):
-                cursor.execute("""
-                    INSERT INTO alternative_products 
-                    (search_query, retailer, product_name, price, was_price, on_sale, 
-                     promo_text, url, match_score, rank_position, date_recorded)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    normalized_query,
-                    retailer,
-                    normalize_product_name(alt.get('name', '')),
-                    alt.get('price'),
-                    alt.get('was'),
-                    alt.get('onSale', False),
-                    alt.get('promoText'),
-                    alt.get('url'),
-                    alt.get('matchScore'),
-                    rank_position,
-                    record_date
-                ))
-            
-            conn.commit()
-            logger.debug(f"Logged {len(alternatives)} alternatives for '{search_query}' at {retailer}")
-            return True
-            
-    except Exception as e:
-        logger.error(f"Failed to log alternative products: {e}")
-        return False
+        # Drop ranks left over from an earlier, longer result list
+        cursor.execute(
+            _SQL_DELETE_TRAILING_ALTERNATIVES,
+            (normalized_query, retailer, record_date, len(alternatives))
+        )
+        
+        conn.commit()
+        logger.debug("Logged %s alternatives for '%s' at %s", len(alternatives), search_query, retailer)
+        return True
 
 
+@_db_op("Failed to log price data", default=False)
 def log_price_data(
     product_name: str,
     retailer: str,
@@ -201,7 +489,8 @@ def log_price_data(
     was_price: Optional[float] = None,
     on_sale: bool = False,
     url: Optional[str] = None,
-    date_recorded: Optional[date] = None
+    date_recorded: Optional[date] = None,
+    stale: bool = False
 ) -> bool:
     """
     Log price data to the database.
@@ -214,6 +503,7 @@ def log_price_data(
         on_sale: Whether product is on sale
         url: Product URL
         date_recorded: Date to record (defaults to today)
+        stale: Whether the price was carried forward from an earlier day
     
     Returns:
         bool: True if successful, False otherwise
@@ -222,47 +512,81 @@ def log_price_data(
         logger.warning("Missing required fields for price logging")
         return False
     
-    try:
-        normalized_name = normalize_product_name(product_name)
-        # Use Australian timezone for accurate local date recording
-        try:
-            import zoneinfo
-            aus_tz = zoneinfo.ZoneInfo("Australia/Sydney")
-        except ImportError:
-            # Fallback for Python < 3.9
-            from datetime import timezone, timedelta
-            # Approximate Australian timezone (UTC+10/+11 depending on DST)
-            aus_tz = timezone(timedelta(hours=10))
+    normalized_name = normalize_product_name(product_name)
+    record_date = _record_date(date_recorded)
+    
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
         
-        record_date = date_recorded or datetime.now(aus_tz).date()
+        # Use INSERT OR REPLACE to handle duplicates (one entry per day)
+        cursor.execute(_SQL_UPSERT_PRICE, (
+            normalized_name,
+            retailer,
+            price,
+            was_price,
+            on_sale,
+            record_date,
+            url,
+            stale
+        ))
         
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Use INSERT OR REPLACE to handle duplicates (one entry per day)
-            cursor.execute("""
-                INSERT OR REPLACE INTO price_history 
-                (product_name, retailer, price, was_price, on_sale, date_recorded, url)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
-                normalized_name,
-                retailer,
-                price,
-                was_price,
-                on_sale,
-                record_date,
-                url
-            ))
-            
-            conn.commit()
-            logger.debug(f"Logged price data for {normalized_name} at {retailer}: ${price}")
-            return True
-            
-    except Exception as e:
-        logger.error(f"Failed to log price data: {e}")
-        return False
+        conn.commit()
+        logger.debug("Logged price data for %s at %s: $%s", normalized_name, retailer, price)
+        return True
+
+
+@_db_op("Failed to bulk log price data", default=0)
+def log_price_data_bulk(
+    rows: List[Dict[str, Any]],
+    date_recorded: Optional[date] = None
+) -> int:
+    """
+    Log many price records in a single transaction.
+    
+    Args:
+        rows: Dicts with product_name, retailer, price and optionally
+              was_price, on_sale, url, stale and date_recorded (the shape
+              log_price_data takes)
+        date_recorded: Date to record for rows without their own (defaults to today)
+    
+    Returns:
+        int: Number of rows written (0 on failure)
+    """
+    record_date = _record_date(date_recorded)
+    
+    params = [
+        (
+            normalize_product_name(row['product_name']),
+            row['retailer'],
+            row['price'],
+            row.get('was_price'),
+            row.get('on_sale', False),
+            _record_date(row['date_recorded']) if row.get('date_recorded') else record_date,
+            row.get('url'),
+            row.get('stale', False)
+        )
+        for row in rows
+        if row.get('product_name') and row.get('retailer')
+    ]
+    
+    if len(params) < len(rows):
+        logger.warning("Skipping %s price rows with missing required fields", len(rows) - len(params))
+    
+    if not params:
+        return 0
+    
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        
+        # One statement, one commit for the whole batch
+        cursor.executemany(_SQL_UPSERT_PRICE, params)
+        
+        conn.commit()
+        logger.debug("Logged %s price records in bulk", len(params))
+        return len(params)
 
 
+@_db_op("Failed to get alternative products", default=list)
 def get_alternative_products(
     search_query: str,
     retailer: Optional[str] = None,
@@ -279,56 +603,27 @@ def get_alternative_products(
     Returns:
         List of alternative product records
     """
-    try:
-        normalized_query = normalize_product_name(search_query)
+    normalized_query = normalize_product_name(search_query)
+    
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
         
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            query = """
-                SELECT search_query, retailer, product_name, price, was_price, on_sale, 
-                       promo_text, url, match_score, rank_position, date_recorded, created_at
-                FROM alternative_products 
-                WHERE search_query = ?
-                AND date_recorded >= date('now', '-{} days')
-            """.format(days_back)
-            
-            params = [normalized_query]
-            
-            if retailer:
-                query += " AND retailer = ?"
-                params.append(retailer)
-            
-            query += " ORDER BY date_recorded DESC, rank_position ASC"
-            
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
-            
-            # Convert rows to dictionaries
-            alternatives = []
-            for row in rows:
-                alternatives.append({
-                    'search_query': row['search_query'],
-                    'retailer': row['retailer'],
-                    'product_name': row['product_name'],
-                    'price': row['price'],
-                    'was_price': row['was_price'],
-                    'on_sale': bool(row['on_sale']),
-                    'promo_text': row['promo_text'],
-                    'url': row['url'],
-                    'match_score': row['match_score'],
-                    'rank_position': row['rank_position'],
-                    'date_recorded': row['date_recorded'],
-                    'created_at': row['created_at']
-                })
-            
-            return alternatives
-            
-    except Exception as e:
-        logger.error(f"Failed to get alternative products: {e}")
-        return []
+        # The window is bound rather than formatted in, so calls with the
+        # same filters share one cached statement
+        params = [normalized_query, f"-{int(days_back)} days"]
+        if retailer:
+            params.append(retailer)
+        
+        # SQLite builds the whole result as one JSON array, so rows never
+        # become Python objects until a single parse
+        cursor.execute(
+            _SQL_ALTERNATIVES_JSON.format(retailer_filter="AND retailer = ?" if retailer else ""),
+            params
+        )
+        return orjson.loads(cursor.fetchone()[0])
 
 
+@_db_op("Failed to get price history", default=list)
 def get_price_history(
     product_name: str,
     retailer: Optional[str] = None,
@@ -345,52 +640,93 @@ def get_price_history(
     Returns:
         List of price history records
     """
-    try:
-        normalized_name = normalize_product_name(product_name)
+    normalized_name = normalize_product_name(product_name)
+    
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
         
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            query = """
-                SELECT product_name, retailer, price, was_price, on_sale, 
-                       date_recorded, url, created_at
-                FROM price_history 
-                WHERE product_name = ?
-                AND date_recorded >= date('now', '-{} days')
-            """.format(days_back)
-            
-            params = [normalized_name]
-            
-            if retailer:
-                query += " AND retailer = ?"
-                params.append(retailer)
-            
-            query += " ORDER BY date_recorded ASC"
-            
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
-            
-            # Convert rows to dictionaries
-            history = []
-            for row in rows:
-                history.append({
-                    'product_name': row['product_name'],
-                    'retailer': row['retailer'],
-                    'price': row['price'],
-                    'was_price': row['was_price'],
-                    'on_sale': bool(row['on_sale']),
-                    'date_recorded': row['date_recorded'],
-                    'url': row['url'],
-                    'created_at': row['created_at']
-                })
-            
-            return history
-            
-    except Exception as e:
-        logger.error(f"Failed to get price history: {e}")
-        return []
+        query = """
+            SELECT product_name, retailer, price, was_price, on_sale, 
+                   date_recorded, url, stale, created_at
+            FROM price_history 
+            WHERE product_name = ?
+            AND date_recorded >= date('now', ?)
+        """
+        
+        # The window is bound rather than formatted in, so every call
+        # shares one cached statement
+        params = [normalized_name, f"-{int(days_back)} days"]
+        
+        if retailer:
+            query += " AND retailer = ?"
+            params.append(retailer)
+        
+        query += " ORDER BY date_recorded ASC"
+        
+        # Plain tuples unpacked straight into dicts skip building a
+        # sqlite3.Row per record
+        cursor.row_factory = None
+        cursor.execute(query, params)
+        
+        return [
+            {
+                'product_name': name,
+                'retailer': row_retailer,
+                'price': price,
+                'was_price': was_price,
+                'on_sale': bool(on_sale),
+                'date_recorded': date_recorded,
+                'url': url,
+                'stale': bool(stale),
+                'created_at': created_at
+            }
+            for (name, row_retailer, price, was_price, on_sale,
+                 date_recorded, url, stale, created_at) in cursor.fetchall()
+        ]
 
 
+@_db_op("Failed to get latest price", default=None)
+def get_latest_price(product_name: str, retailer: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the most recent live (non-stale) price recorded for a product.
+    
+    Stale rows are skipped so a carried-forward price is always anchored to
+    the last day the retailer actually answered.
+    
+    Args:
+        product_name: Product name to look up
+        retailer: Retailer name (woolworths/coles)
+    
+    Returns:
+        Dict with price, was_price, on_sale, date_recorded and url, or None
+    """
+    normalized_name = normalize_product_name(product_name)
+    
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT price, was_price, on_sale, date_recorded, url
+            FROM price_history 
+            WHERE product_name = ? AND retailer = ? AND NOT stale
+            ORDER BY date_recorded DESC
+            LIMIT 1
+        """, (normalized_name, retailer))
+        row = cursor.fetchone()
+        
+        if not row:
+            return None
+        
+        return {
+            'price': row['price'],
+            'was_price': row['was_price'],
+            'on_sale': bool(row['on_sale']),
+            'date_recorded': row['date_recorded'],
+            'url': row['url']
+        }
+
+
+@_db_op("Error getting products missing today's price", default=list)
 def get_products_missing_todays_price(limit: int = 100) -> List[Dict[str, Any]]:
     """
     Get products that don't have price data for today, randomly selected.
@@ -401,82 +737,128 @@ def get_products_missing_todays_price(limit: int = 100) -> List[Dict[str, Any]]:
     Returns:
         List of products that need price updates for today
     """
-    try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            today = date.today()
-            
-            # Get products that don't have price data for today
-            # Use DISTINCT to avoid duplicates, ORDER BY RANDOM() for randomization
-            query = """
-                SELECT DISTINCT p.product_name, p.retailer
-                FROM (
-                    SELECT DISTINCT product_name, retailer 
-                    FROM price_history
-                ) p
-                LEFT JOIN price_history ph_today 
-                    ON p.product_name = ph_today.product_name 
-                    AND p.retailer = ph_today.retailer 
-                    AND DATE(ph_today.date_recorded) = ?
-                WHERE ph_today.product_name IS NULL
-                ORDER BY RANDOM()
-                LIMIT ?
-            """
-            
-            cursor.execute(query, (today, limit))
-            results = cursor.fetchall()
-            
-            products = []
-            for row in results:
-                products.append({
-                    'product_name': row[0],
-                    'retailer': row[1]
-                })
-            
-            logger.info(f"Found {len(products)} products missing today's price data (limit: {limit})")
-            return products
-            
-    except Exception as e:
-        logger.error(f"Error getting products missing today's price: {e}")
-        return []
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        
+        today = date.today().isoformat()
+        
+        # Get products that don't have price data for today
+        # Use DISTINCT to avoid duplicates, ORDER BY RANDOM() for randomization
+        query = """
+            SELECT DISTINCT p.product_name, p.retailer
+            FROM (
+                SELECT DISTINCT product_name, retailer 
+                FROM price_history
+            ) p
+            LEFT JOIN price_history ph_today 
+                ON p.product_name = ph_today.product_name 
+                AND p.retailer = ph_today.retailer 
+                AND DATE(ph_today.date_recorded) = ?
+            WHERE ph_today.product_name IS NULL
+            ORDER BY RANDOM()
+            LIMIT ?
+        """
+        
+        cursor.execute(query, (today, limit))
+        results = cursor.fetchall()
+        
+        products = []
+        for row in results:
+            products.append({
+                'product_name': row[0],
+                'retailer': row[1]
+            })
+        
+        logger.info("Found %s products missing today's price data (limit: %s)", len(products), limit)
+        return products
 
 
+def _tracked_product_dicts(rows: List[tuple]) -> List[Dict[str, Any]]:
+    """Turn plain (name, retailer, count, first, last) tuples into product dicts."""
+    return [
+        {
+            'product_name': name,
+            'retailer': retailer,
+            'record_count': record_count,
+            'first_seen': first_seen,
+            'last_seen': last_seen
+        }
+        for name, retailer, record_count, first_seen, last_seen in rows
+    ]
+
+
+@_db_op("Failed to get tracked products", default=list)
 def get_all_tracked_products() -> List[Dict[str, Any]]:
     """Get list of all products we're tracking."""
-    try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT DISTINCT product_name, retailer, 
-                       COUNT(*) as record_count,
-                       MIN(date_recorded) as first_seen,
-                       MAX(date_recorded) as last_seen
-                FROM price_history 
-                GROUP BY product_name, retailer
-                ORDER BY last_seen DESC
-            """)
-            
-            rows = cursor.fetchall()
-            
-            products = []
-            for row in rows:
-                products.append({
-                    'product_name': row['product_name'],
-                    'retailer': row['retailer'],
-                    'record_count': row['record_count'],
-                    'first_seen': row['first_seen'],
-                    'last_seen': row['last_seen']
-                })
-            
-            return products
-            
-    except Exception as e:
-        logger.error(f"Failed to get tracked products: {e}")
-        return []
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        
+        # GROUP BY already yields one row per product, and every column it
+        # reads is in idx_product_retailer_date, so this is an index-only scan
+        cursor.execute("""
+            SELECT product_name, retailer, 
+                   COUNT(*) as record_count,
+                   MIN(date_recorded) as first_seen,
+                   MAX(date_recorded) as last_seen
+            FROM price_history 
+            GROUP BY product_name, retailer
+            ORDER BY last_seen DESC
+        """)
+        
+        return _tracked_product_dicts(cursor.fetchall())
+
+
+def iter_tracked_products(page_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield tracked products a page at a time, ordered by product name and retailer.
+    
+    Pages are fetched with keyset pagination (each query resumes after the
+    last (product_name, retailer) seen) on a fresh connection, so memory stays
+    bounded by page_size and the generator may be advanced from any thread.
+    
+    Args:
+        page_size: Maximum number of products per page
+        
+    Yields:
+        Lists of product dicts with the same fields as get_all_tracked_products()
+    """
+    last_key = None
+    while True:
+        try:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = None
+                
+                after = "WHERE (product_name, retailer) > (?, ?)" if last_key else ""
+                cursor.execute(f"""
+                    SELECT product_name, retailer,
+                           COUNT(*) as record_count,
+                           MIN(date_recorded) as first_seen,
+                           MAX(date_recorded) as last_seen
+                    FROM price_history
+                    {after}
+                    GROUP BY product_name, retailer
+                    ORDER BY product_name, retailer
+                    LIMIT ?
+                """, (*(last_key or ()), page_size))
+                
+                rows = cursor.fetchall()
+        except Exception as e:
+            logger.error("Failed to get tracked products page: %s", e)
+            return
+        
+        if not rows:
+            return
+        
+        yield _tracked_product_dicts(rows)
+        
+        if len(rows) < page_size:
+            return
+        last_key = rows[-1][:2]
 
 
+@_db_op("Failed to clear database", default=False)
 def clear_all_price_history() -> bool:
     """
     Clear all price history and alternative products data from the database.
@@ -486,33 +868,28 @@ def clear_all_price_history() -> bool:
     Returns:
         bool: True if successful, False otherwise
     """
-    try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Get count before deletion for logging
-            cursor.execute("SELECT COUNT(*) as total FROM price_history")
-            price_records = cursor.fetchone()['total']
-            
-            cursor.execute("SELECT COUNT(*) as total FROM alternative_products")
-            alt_records = cursor.fetchone()['total']
-            
-            # Delete all records
-            cursor.execute("DELETE FROM price_history")
-            cursor.execute("DELETE FROM alternative_products")
-            
-            # Reset the auto-increment counters
-            cursor.execute("DELETE FROM sqlite_sequence WHERE name='price_history'")
-            cursor.execute("DELETE FROM sqlite_sequence WHERE name='alternative_products'")
-            
-            conn.commit()
-            
-            logger.warning(f"Cleared {price_records} price history and {alt_records} alternative product records from database")
-            return True
-            
-    except Exception as e:
-        logger.error(f"Failed to clear database: {e}")
-        return False
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        
+        # Get count before deletion for logging
+        cursor.execute("SELECT COUNT(*) as total FROM price_history")
+        price_records = cursor.fetchone()['total']
+        
+        cursor.execute("SELECT COUNT(*) as total FROM alternative_products")
+        alt_records = cursor.fetchone()['total']
+        
+        # Delete all records
+        cursor.execute("DELETE FROM price_history")
+        cursor.execute("DELETE FROM alternative_products")
+        
+        # Reset the auto-increment counters
+        cursor.execute("DELETE FROM sqlite_sequence WHERE name='price_history'")
+        cursor.execute("DELETE FROM sqlite_sequence WHERE name='alternative_products'")
+        
+        conn.commit()
+        
+        logger.warning("Cleared %s price history and %s alternative product records from database", price_records, alt_records)
+        return True
 
 
 def delete_product_history(product_name: str, retailer: str) -> Dict[str, Any]:
@@ -532,12 +909,12 @@ def delete_product_history(product_name: str, retailer: str) -> Dict[str, Any]:
         with get_db_connection() as conn:
             cursor = conn.cursor()
             
-            # First, count how many records will be deleted
+            # Delete in one pass; the row count says whether anything matched
             cursor.execute(
-                "SELECT COUNT(*) FROM price_history WHERE product_name = ? AND retailer = ?",
+                "DELETE FROM price_history WHERE product_name = ? AND retailer = ?",
                 (normalized_name, retailer)
             )
-            records_to_delete = cursor.fetchone()[0]
+            records_to_delete = cursor.rowcount
             
             if records_to_delete == 0:
                 return {
@@ -546,15 +923,9 @@ def delete_product_history(product_name: str, retailer: str) -> Dict[str, Any]:
                     "records_deleted": 0
                 }
             
-            # Delete the records
-            cursor.execute(
-                "DELETE FROM price_history WHERE product_name = ? AND retailer = ?",
-                (normalized_name, retailer)
-            )
-            
             conn.commit()
             
-            logger.info(f"Deleted {records_to_delete} records for {normalized_name} at {retailer}")
+            logger.info("Deleted %s records for %s at %s", records_to_delete, normalized_name, retailer)
             return {
                 "success": True,
                 "message": f"Successfully deleted {records_to_delete} records",
@@ -562,7 +933,7 @@ def delete_product_history(product_name: str, retailer: str) -> Dict[str, Any]:
             }
             
     except Exception as e:
-        logger.error(f"Failed to delete product history: {e}")
+        logger.error("Failed to delete product history: %s", e)
         return {
             "success": False,
             "message": f"Error deleting product: {str(e)}",
@@ -570,152 +941,119 @@ def delete_product_history(product_name: str, retailer: str) -> Dict[str, Any]:
         }
 
 
+def _empty_database_stats() -> Dict[str, Any]:
+    """Statistics reported when the database can't be read."""
+    return {
+        'price_history': {
+            'total_records': 0,
+            'unique_products': 0,
+            'unique_retailers': 0,
+            'oldest_record': None,
+            'newest_record': None
+        },
+        'alternatives': {
+            'total_records': 0,
+            'unique_queries': 0,
+            'unique_products': 0
+        }
+    }
+
+
+@_db_op("Failed to get database stats", default=_empty_database_stats)
 def get_database_stats() -> Dict[str, Any]:
     """Get basic statistics about the database."""
-    try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Price history stats
-            cursor.execute("SELECT COUNT(*) FROM price_history")
-            total_records = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(DISTINCT product_name) FROM price_history")
-            unique_products = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(DISTINCT retailer) FROM price_history")
-            unique_retailers = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT MIN(date_recorded), MAX(date_recorded) FROM price_history")
-            date_range = cursor.fetchone()
-            
-            # Today's updates count  
-            cursor.execute("SELECT COUNT(DISTINCT product_name) FROM price_history WHERE date_recorded = date('now')")
-            todays_updates = cursor.fetchone()[0]
-            
-            # Alternative products stats
-            cursor.execute("SELECT COUNT(*) FROM alternative_products")
-            total_alternatives = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(DISTINCT search_query) FROM alternative_products")
-            unique_queries = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(DISTINCT product_name) FROM alternative_products")
-            unique_alt_products = cursor.fetchone()[0]
-            
-            return {
-                'price_history': {
-                    'total_records': total_records,
-                    'unique_products': unique_products,
-                    'unique_retailers': unique_retailers,
-                    'oldest_record': date_range[0] if date_range and date_range[0] else None,
-                    'newest_record': date_range[1] if date_range and date_range[1] else None,
-                    'todays_updates': todays_updates
-                },
-                'alternatives': {
-                    'total_records': total_alternatives,
-                    'unique_queries': unique_queries,
-                    'unique_products': unique_alt_products
-                }
-            }
-            
-    except Exception as e:
-        logger.error(f"Failed to get database stats: {e}")
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        
+        # Price history stats, including today's updates, in one scan
+        cursor.execute("""
+            SELECT COUNT(*),
+                   COUNT(DISTINCT product_name),
+                   COUNT(DISTINCT retailer),
+                   MIN(date_recorded),
+                   MAX(date_recorded),
+                   COUNT(DISTINCT CASE WHEN date_recorded = date('now') THEN product_name END)
+            FROM price_history
+        """)
+        (total_records, unique_products, unique_retailers,
+         oldest_record, newest_record, todays_updates) = cursor.fetchone()
+        
+        # Alternative products stats
+        cursor.execute("""
+            SELECT COUNT(*), COUNT(DISTINCT search_query), COUNT(DISTINCT product_name)
+            FROM alternative_products
+        """)
+        total_alternatives, unique_queries, unique_alt_products = cursor.fetchone()
+        
         return {
             'price_history': {
-                'total_records': 0,
-                'unique_products': 0,
-                'unique_retailers': 0,
-                'oldest_record': None,
-                'newest_record': None
+                'total_records': total_records,
+                'unique_products': unique_products,
+                'unique_retailers': unique_retailers,
+                'oldest_record': oldest_record,
+                'newest_record': newest_record,
+                'todays_updates': todays_updates
             },
             'alternatives': {
-                'total_records': 0,
-                'unique_queries': 0,
-                'unique_products': 0
+                'total_records': total_alternatives,
+                'unique_queries': unique_queries,
+                'unique_products': unique_alt_products
             }
         }
 
 
 # Favorites System Functions (SQLite version)
+@_db_op("Failed to add favorite", default=False)
 def add_to_favorites(product_name: str, retailer: str) -> bool:
     """Add product to admin favorites."""
-    try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Check if already exists
-            cursor.execute(
-                "SELECT id FROM favorites WHERE product_name = ? AND retailer = ?",
-                (product_name, retailer)
-            )
-            
-            if cursor.fetchone():
-                return False  # Already exists
-                
-            # Add to favorites
-            cursor.execute(
-                "INSERT INTO favorites (product_name, retailer) VALUES (?, ?)",
-                (product_name, retailer)
-            )
-            
-            conn.commit()
-            logger.info(f"Added {product_name} ({retailer}) to favorites")
-            return True
-            
-    except Exception as e:
-        logger.error(f"Failed to add favorite: {e}")
-        return False
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        
+        # The UNIQUE constraint skips existing favorites, so no lookup is needed
+        cursor.execute(
+            "INSERT OR IGNORE INTO favorites (product_name, retailer) VALUES (?, ?)",
+            (product_name, retailer)
+        )
+        
+        if cursor.rowcount == 0:
+            return False  # Already exists
+        
+        conn.commit()
+        logger.info("Added %s (%s) to favorites", product_name, retailer)
+        return True
 
+@_db_op("Failed to get favorites", default=list)
 def get_favorites() -> list:
     """Get all admin favorites."""
-    try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT id, product_name, retailer, created_at
-                FROM favorites
-                ORDER BY created_at DESC
-            """)
-            
-            favorites = []
-            for row in cursor.fetchall():
-                favorites.append({
-                    'id': row['id'],
-                    'product_name': row['product_name'],
-                    'retailer': row['retailer'],
-                    'created_at': row['created_at']
-                })
-            
-            return favorites
-            
-    except Exception as e:
-        logger.error(f"Failed to get favorites: {e}")
-        return []
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT id, product_name, retailer, created_at
+            FROM favorites
+            ORDER BY created_at DESC
+        """)
+        
+        return [dict(row) for row in cursor.fetchall()]
 
+@_db_op("Failed to remove favorite", default=False)
 def remove_from_favorites(favorite_id: int) -> bool:
     """Remove product from admin favorites."""
-    try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute("DELETE FROM favorites WHERE id = ?", (favorite_id,))
-            
-            if cursor.rowcount > 0:
-                conn.commit()
-                logger.info(f"Removed favorite ID {favorite_id}")
-                return True
-            else:
-                return False
-                
-    except Exception as e:
-        logger.error(f"Failed to remove favorite: {e}")
-        return False
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute("DELETE FROM favorites WHERE id = ?", (favorite_id,))
+        
+        if cursor.rowcount > 0:
+            conn.commit()
+            logger.info("Removed favorite ID %s", favorite_id)
+            return True
+        else:
+            return False
 
 
 # Initialize database on import
 try:
     init_database()
 except Exception as e:
-    logger.error(f"Failed to initialize database: {e}")
\ No newline at end of file
+    logger.error("Failed to initialize database: %s", e)
\ No newline at end of file
@@ -6,13 +6,19 @@ import psycopg2
 import psycopg2.extras
 import logging
 from datetime import datetime, date, timezone
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator
 from contextlib import contextmanager
+from functools import lru_cache, wraps
+from operator import itemgetter
 import os
 from urllib.parse import urlparse
 
 logger = logging.getLogger(__name__)
 
+# Below this many rows, executemany is cheaper than building one multi-row
+# INSERT with execute_values
+BULK_EXECUTE_VALUES_THRESHOLD = 50
+
 # Get database URL from environment (Railway provides this)
 DATABASE_URL = os.getenv("DATABASE_URL")
 
@@ -47,12 +53,32 @@ def get_db_connection():
     except Exception as e:
         if conn:
             conn.rollback()
-        logger.error(f"Database error: {e}")
+        logger.error("Database error: %s", e)
         raise
     finally:
         if conn:
             conn.close()
 
+def _db_op(message: str, default: Any = None):
+    """
+    Decorator for database functions that log failures instead of raising.
+    
+    Args:
+        message: Logged, with the exception, when the call fails
+        default: Value returned on failure; a callable (e.g. list) is called
+                 so each failure gets a fresh object
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                logger.error("%s: %s", message, e)
+                return default() if callable(default) else default
+        return wrapper
+    return decorator
+
 def init_database():
     """Initialize the PostgreSQL database with required tables."""
     with get_db_connection() as conn:
@@ -69,11 +95,15 @@ def init_database():
                 on_sale BOOLEAN DEFAULT FALSE,
                 date_recorded DATE NOT NULL,
                 url TEXT,
+                stale BOOLEAN DEFAULT FALSE,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 UNIQUE(product_name, retailer, date_recorded)
             )
         """)
         
+        # Databases created before the stale flag existed need the column added
+        cursor.execute("ALTER TABLE price_history ADD COLUMN IF NOT EXISTS stale BOOLEAN DEFAULT FALSE")
+        
         # Create alternative_products table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS alternative_products (
@@ -170,9 +200,17 @@ def init_database():
             ON price_history(product_name, retailer, date_recorded)
         """)
         
+        # Match get_alternative_products' ORDER BY (newest date first, then
+        # rank), with or without a retailer filter, so no sort is needed
+        cursor.execute("DROP INDEX IF EXISTS idx_alternatives_query_retailer_date")
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_alternatives_query_retailer_recent 
+            ON alternative_products(search_query, retailer, date_recorded DESC, rank_position)
+        """)
+        
         cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_alternatives_query_retailer_date 
-            ON alternative_products(search_query, retailer, date_recorded)
+            CREATE INDEX IF NOT EXISTS idx_alternatives_query_recent 
+            ON alternative_products(search_query, date_recorded DESC, rank_position)
         """)
         
         cursor.execute("""
@@ -209,6 +247,19 @@ def init_database():
         conn.commit()
         logger.info("PostgreSQL database initialized successfully")
 
+# Use Australian timezone for accurate local date recording
+try:
+    import zoneinfo
+    _AUS_TZ = zoneinfo.ZoneInfo("Australia/Sydney")
+except ImportError:
+    # Fallback for Python < 3.9
+    from datetime import timedelta
+    # Approximate Australian timezone (UTC+10/+11 depending on DST)
+    _AUS_TZ = timezone(timedelta(hours=10))
+
+# Product names recur on every update run and every lookup, so normalized
+# forms are memoized (strings are immutable, so sharing results is safe)
+@lru_cache(maxsize=4096)
 def normalize_product_name(product_name: str) -> str:
     """Normalize product name for consistent storage."""
     if not product_name:
@@ -219,6 +270,52 @@ def normalize_product_name(product_name: str) -> str:
     
     return normalized
 
+# Alternative product fields in column order, with the value stored when
+# one is missing
+_ALTERNATIVE_DEFAULTS = {
+    'name': '',
+    'price': None,
+    'was': None,
+    'onSale': False,
+    'promoText': None,
+    'url': None,
+    'matchScore': None,
+}
+_alternative_fields = itemgetter(*_ALTERNATIVE_DEFAULTS)
+
+def _alternative_rows(
+    normalized_query: str,
+    retailer: str,
+    alternatives: List[Dict[str, Any]],
+    record_date: Any
+) -> List[tuple]:
+    """Build alternative_products parameter tuples, ranked in list order."""
+    rows = []
+    for rank_position, alt in enumerate(alternatives, 1):
+        try:
+            # Alternatives from the checker carry every field, so one C-level
+            # lookup usually pulls them all
+            name, price, was, on_sale, promo_text, url, match_score = _alternative_fields(alt)
+        except KeyError:
+            name, price, was, on_sale, promo_text, url, match_score = _alternative_fields(
+                {**_ALTERNATIVE_DEFAULTS, **alt}
+            )
+        rows.append((
+            normalized_query,
+            retailer,
+            normalize_product_name(name),
+            price,
+            was,
+            on_sale,
+            promo_text,
+            url,
+            match_score,
+            rank_position,
+            record_date
+        ))
+    return rows
+
+@_db_op("Failed to log alternative products", default=False)
 def log_alternative_products(
     search_query: str,
     retailer: str,
@@ -230,58 +327,34 @@ def log_alternative_products(
         logger.warning("Missing required fields for alternatives logging")
         return False
     
-    try:
-        normalized_query = normalize_product_name(search_query)
-        # Use Australian timezone for accurate local date recording
-        try:
-            import zoneinfo
-            aus_tz = zoneinfo.ZoneInfo("Australia/Sydney")
-        except ImportError:
-            # Fallback for Python < 3.9
-            from datetime import timezone, timedelta
-            # Approximate Australian timezone (UTC+10/+11 depending on DST)
-            aus_tz = timezone(timedelta(hours=10))
+    normalized_query = normalize_product_name(search_query)
+    record_date = date_recorded or datetime.now(_AUS_TZ).date()
+    
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
         
-        record_date = date_recorded or datetime.now(aus_tz).date()
+        # First, delete any existing alternatives for this query/retailer/date
+        cursor.execute("""
+            DELETE FROM alternative_products 
+            WHERE search_query = %s AND retailer = %s AND date_recorded = %s
+        """, (normalized_query, retailer, record_date))
         
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # First, delete any existing alternatives for this query/retailer/date
-            cursor.execute("""
-                DELETE FROM alternative_products 
-                WHERE search_query = %s AND retailer = %s AND date_recorded = %s
-            """, (normalized_query, retailer, record_date))
-            
-            # Insert new alternatives
-            for rank_position, alt in enumerate(alternatives, 1):
-                cursor.execute("""
-                    INSERT INTO alternative_products 
-                    (search_query, retailer, product_name, price, was_price, on_sale, 
-                     promo_text, url, match_score, rank_position, date_recorded)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """, (
-                    normalized_query,
-                    retailer,
-                    normalize_product_name(alt.get('name', '')),
-                    alt.get('price'),
-                    alt.get('was'),
-                    alt.get('onSale', False),
-                    alt.get('promoText'),
-                    alt.get('url'),
-                    alt.get('matchScore'),
-                    rank_position,
-                    record_date
-                ))
-            
-            conn.commit()
-            logger.debug(f"Logged {len(alternatives)} alternatives for '{search_query}' at {retailer}")
-            return True
-            
-    except Exception as e:
-        logger.error(f"Failed to log alternative products: {e}")
-        return False
+        # Insert new alternatives as one multi-row INSERT (one round trip;
+        # psycopg2's executemany would still send a statement per row)
+        psycopg2.extras.execute_values(cursor, """
+            INSERT INTO alternative_products 
+            (search_query, retailer, product_name, price, was_price, on_sale, 
+             promo_text, url, match_score, rank_position, date_recorded)
+            VALUES %s
+        """, _alternative_rows(
+            normalized_query, retailer, alternatives, record_date
+        ))
+        
+        conn.commit()
+        logger.debug("Logged %s alternatives for '%s' at %s", len(alternatives), search_query, retailer)
+        return True
 
+@_db_op("Failed to log price data", default=False)
 def log_price_data(
     product_name: str,
     retailer: str,
@@ -289,146 +362,228 @@ def log_price_data(
     was_price: Optional[float] = None,
     on_sale: bool = False,
     url: Optional[str] = None,
-    date_recorded: Optional[date] = None
+    date_recorded: Optional[date] = None,
+    stale: bool = False
 ) -> bool:
     """Log price data to the database."""
     if not product_name or not retailer:
         logger.warning("Missing required fields for price logging")
         return False
     
-    try:
-        normalized_name = normalize_product_name(product_name)
-        # Use Australian timezone for accurate local date recording
-        try:
-            import zoneinfo
-            aus_tz = zoneinfo.ZoneInfo("Australia/Sydney")
-        except ImportError:
-            # Fallback for Python < 3.9
-            from datetime import timezone, timedelta
-            # Approximate Australian timezone (UTC+10/+11 depending on DST)
-            aus_tz = timezone(timedelta(hours=10))
+    normalized_name = normalize_product_name(product_name)
+    record_date = date_recorded or datetime.now(_AUS_TZ).date()
+    
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
         
-        record_date = date_recorded or datetime.now(aus_tz).date()
+        # Use INSERT ON CONFLICT to handle duplicates (one entry per day)
+        cursor.execute("""
+            INSERT INTO price_history 
+            (product_name, retailer, price, was_price, on_sale, date_recorded, url, stale)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (product_name, retailer, date_recorded) 
+            DO UPDATE SET 
+                price = EXCLUDED.price,
+                was_price = EXCLUDED.was_price,
+                on_sale = EXCLUDED.on_sale,
+                url = EXCLUDED.url,
+                stale = EXCLUDED.stale,
+                created_at = CURRENT_TIMESTAMP
+        """, (
+            normalized_name,
+            retailer,
+            price,
+            was_price,
+            on_sale,
+            record_date,
+            url,
+            stale
+        ))
         
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Use INSERT ON CONFLICT to handle duplicates (one entry per day)
-            cursor.execute("""
-                INSERT INTO price_history 
-                (product_name, retailer, price, was_price, on_sale, date_recorded, url)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (product_name, retailer, date_recorded) 
-                DO UPDATE SET 
-                    price = EXCLUDED.price,
-                    was_price = EXCLUDED.was_price,
-                    on_sale = EXCLUDED.on_sale,
-                    url = EXCLUDED.url,
-                    created_at = CURRENT_TIMESTAMP
-            """, (
-                normalized_name,
-                retailer,
-                price,
-                was_price,
-                on_sale,
-                record_date,
-                url
-            ))
-            
-            conn.commit()
-            logger.debug(f"Logged price data for {normalized_name} at {retailer}: ${price}")
-            return True
-            
-    except Exception as e:
-        logger.error(f"Failed to log price data: {e}")
-        return False
+        conn.commit()
+        logger.debug("Logged price data for %s at %s: $%s", normalized_name, retailer, price)
+        return True
 
+@_db_op("Failed to bulk log price data", default=0)
+def log_price_data_bulk(
+    rows: List[Dict[str, Any]],
+    date_recorded: Optional[date] = None
+) -> int:
+    """
+    Log many price records in a single transaction.
+    
+    Args:
+        rows: Dicts with product_name, retailer, price and optionally
+              was_price, on_sale, url, stale and date_recorded (the shape
+              log_price_data takes)
+        date_recorded: Date to record for rows without their own (defaults to today)
+    
+    Returns:
+        int: Number of rows written (0 on failure)
+    """
+    record_date = date_recorded or datetime.now(_AUS_TZ).date()
+    
+    params = [
+        (
+            normalize_product_name(row['product_name']),
+            row['retailer'],
+            row['price'],
+            row.get('was_price'),
+            row.get('on_sale', False),
+            row.get('date_recorded') or record_date,
+            row.get('url'),
+            row.get('stale', False)
+        )
+        for row in rows
+        if row.get('product_name') and row.get('retailer')
+    ]
+    
+    if len(params) < len(rows):
+        logger.warning("Skipping %s price rows with missing required fields", len(rows) - len(params))
+    
+    if not params:
+        return 0
+    
+    upsert = """
+        INSERT INTO price_history 
+        (product_name, retailer, price, was_price, on_sale, date_recorded, url, stale)
+        VALUES {values}
+        ON CONFLICT (product_name, retailer, date_recorded) 
+        DO UPDATE SET 
+            price = EXCLUDED.price,
+            was_price = EXCLUDED.was_price,
+            on_sale = EXCLUDED.on_sale,
+            url = EXCLUDED.url,
+            stale = EXCLUDED.stale,
+            created_at = CURRENT_TIMESTAMP
+    """
+    
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        
+        if len(params) >= BULK_EXECUTE_VALUES_THRESHOLD:
+            # A multi-row INSERT can't update the same row twice, so keep
+            # only the last row per (product, retailer, day) like the
+            # row-by-row path would
+            unique_params = list({(p[0], p[1], p[5]): p for p in params}.values())
+            psycopg2.extras.execute_values(
+                cursor, upsert.format(values="%s"), unique_params, page_size=500
+            )
+        else:
+            # One statement, one commit for the whole batch
+            cursor.executemany(upsert.format(values="(%s, %s, %s, %s, %s, %s, %s, %s)"), params)
+        
+        conn.commit()
+        logger.debug("Logged %s price records in bulk", len(params))
+        return len(params)
+
+@_db_op("Failed to get alternative products", default=list)
 def get_alternative_products(
     search_query: str,
     retailer: Optional[str] = None,
     days_back: int = 30
 ) -> List[Dict[str, Any]]:
     """Get alternative products for a search query."""
-    try:
-        normalized_query = normalize_product_name(search_query)
+    normalized_query = normalize_product_name(search_query)
+    
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
         
-        with get_db_connection() as conn:
-            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-            
-            query = """
-                SELECT search_query, retailer, product_name, price, was_price, on_sale, 
-                       promo_text, url, match_score, rank_position, date_recorded, created_at
-                FROM alternative_products 
-                WHERE search_query = %s
-                AND date_recorded >= CURRENT_DATE - INTERVAL '%s days'
-            """
-            
-            params = [normalized_query, days_back]
-            
-            if retailer:
-                query += " AND retailer = %s"
-                params.append(retailer)
-            
-            query += " ORDER BY date_recorded DESC, rank_position ASC"
-            
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
-            
-            # Convert rows to dictionaries
-            alternatives = []
-            for row in rows:
-                alternatives.append(dict(row))
-            
-            return alternatives
-            
-    except Exception as e:
-        logger.error(f"Failed to get alternative products: {e}")
-        return []
+        query = """
+            SELECT search_query, retailer, product_name, price, was_price, on_sale, 
+                   promo_text, url, match_score, rank_position, date_recorded, created_at
+            FROM alternative_products 
+            WHERE search_query = %s
+            AND date_recorded >= CURRENT_DATE - INTERVAL '%s days'
+        """
+        
+        params = [normalized_query, days_back]
+        
+        if retailer:
+            query += " AND retailer = %s"
+            params.append(retailer)
+        
+        query += " ORDER BY date_recorded DESC, rank_position ASC"
+        
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        
+        # Convert rows to dictionaries
+        alternatives = []
+        for row in rows:
+            alternatives.append(dict(row))
+        
+        return alternatives
 
+@_db_op("Failed to get price history", default=list)
 def get_price_history(
     product_name: str,
     retailer: Optional[str] = None,
     days_back: int = 30
 ) -> List[Dict[str, Any]]:
     """Get price history for a product."""
-    try:
-        normalized_name = normalize_product_name(product_name)
+    normalized_name = normalize_product_name(product_name)
+    
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
         
-        with get_db_connection() as conn:
-            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-            
-            query = """
-                SELECT product_name, retailer, price, was_price, on_sale, 
-                       date_recorded, url, created_at
-                FROM price_history 
-                WHERE product_name = %s
-                AND date_recorded >= CURRENT_DATE - INTERVAL '%s days'
-            """
-            
-            params = [normalized_name, days_back]
-            
-            if retailer:
-                query += " AND retailer = %s"
-                params.append(retailer)
-            
-            query += " ORDER BY date_recorded ASC"
-            
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
-            
-            # Convert rows to dictionaries
-            history = []
-            for row in rows:
-                row_dict = dict(row)
-                row_dict['on_sale'] = bool(row_dict['on_sale'])
-                history.append(row_dict)
-            
-            return history
-            
-    except Exception as e:
-        logger.error(f"Failed to get price history: {e}")
-        return []
+        query = """
+            SELECT product_name, retailer, price, was_price, on_sale, 
+                   date_recorded, url, stale, created_at
+            FROM price_history 
+            WHERE product_name = %s
+            AND date_recorded >= CURRENT_DATE - INTERVAL '%s days'
+        """
+        
+        params = [normalized_name, days_back]
+        
+        if retailer:
+            query += " AND retailer = %s"
+            params.append(retailer)
+        
+        query += " ORDER BY date_recorded ASC"
+        
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        
+        # Convert rows to dictionaries
+        history = []
+        for row in rows:
+            row_dict = dict(row)
+            row_dict['on_sale'] = bool(row_dict['on_sale'])
+            history.append(row_dict)
+        
+        return history
+
+@_db_op("Failed to get latest price", default=None)
+def get_latest_price(product_name: str, retailer: str) -> Optional[Dict[str, Any]]:
+    """Get the most recent live (non-stale) price recorded for a product."""
+    normalized_name = normalize_product_name(product_name)
+    
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        
+        cursor.execute("""
+            SELECT price, was_price, on_sale, date_recorded, url
+            FROM price_history 
+            WHERE product_name = %s AND retailer = %s AND NOT stale
+            ORDER BY date_recorded DESC
+            LIMIT 1
+        """, (normalized_name, retailer))
+        row = cursor.fetchone()
+        
+        if not row:
+            return None
+        
+        return {
+            'price': row['price'],
+            'was_price': row['was_price'],
+            'on_sale': bool(row['on_sale']),
+            'date_recorded': row['date_recorded'],
+            'url': row['url']
+        }
 
+@_db_op("Error getting products missing today's price", default=list)
 def get_products_missing_todays_price(limit: int = 100) -> List[Dict[str, Any]]:
     """
     Get products that don't have price data for today, randomly selected.
@@ -439,103 +594,138 @@ def get_products_missing_todays_price(limit: int = 100) -> List[Dict[str, Any]]:
     Returns:
         List of products that need price updates for today
     """
-    try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            today = date.today()
-            
-            # Get products that don't have price data for today
-            # Use DISTINCT to avoid duplicates, ORDER BY RANDOM() for randomization
-            query = """
-                SELECT DISTINCT p.product_name, p.retailer
-                FROM (
-                    SELECT DISTINCT product_name, retailer 
-                    FROM price_history
-                ) p
-                LEFT JOIN price_history ph_today 
-                    ON p.product_name = ph_today.product_name 
-                    AND p.retailer = ph_today.retailer 
-                    AND DATE(ph_today.date_recorded) = %s
-                WHERE ph_today.product_name IS NULL
-                ORDER BY RANDOM()
-                LIMIT %s
-            """
-            
-            cursor.execute(query, (today, limit))
-            results = cursor.fetchall()
-            
-            products = []
-            for row in results:
-                products.append({
-                    'product_name': row[0],
-                    'retailer': row[1]
-                })
-            
-            logger.info(f"Found {len(products)} products missing today's price data (limit: {limit})")
-            return products
-            
-    except Exception as e:
-        logger.error(f"Error getting products missing today's price: {e}")
-        return []
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        
+        today = date.today()
+        
+        # Get products that don't have price data for today
+        # Use DISTINCT to avoid duplicates, ORDER BY RANDOM() for randomization
+        query = """
+            SELECT DISTINCT p.product_name, p.retailer
+            FROM (
+                SELECT DISTINCT product_name, retailer 
+                FROM price_history
+            ) p
+            LEFT JOIN price_history ph_today 
+                ON p.product_name = ph_today.product_name 
+                AND p.retailer = ph_today.retailer 
+                AND DATE(ph_today.date_recorded) = %s
+            WHERE ph_today.product_name IS NULL
+            ORDER BY RANDOM()
+            LIMIT %s
+        """
+        
+        cursor.execute(query, (today, limit))
+        results = cursor.fetchall()
+        
+        products = []
+        for row in results:
+            products.append({
+                'product_name': row[0],
+                'retailer': row[1]
+            })
+        
+        logger.info("Found %s products missing today's price data (limit: %s)", len(products), limit)
+        return products
 
+@_db_op("Failed to get tracked products", default=list)
 def get_all_tracked_products() -> List[Dict[str, Any]]:
     """Get list of all products we're tracking."""
-    try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-            
-            cursor.execute("""
-                SELECT DISTINCT product_name, retailer, 
-                       COUNT(*) as record_count,
-                       MIN(date_recorded) as first_seen,
-                       MAX(date_recorded) as last_seen
-                FROM price_history 
-                GROUP BY product_name, retailer
-                ORDER BY last_seen DESC
-            """)
-            
-            rows = cursor.fetchall()
-            
-            products = []
-            for row in rows:
-                products.append(dict(row))
-            
-            return products
-            
-    except Exception as e:
-        logger.error(f"Failed to get tracked products: {e}")
-        return []
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        
+        cursor.execute("""
+            SELECT product_name, retailer, 
+                   COUNT(*) as record_count,
+                   MIN(date_recorded) as first_seen,
+                   MAX(date_recorded) as last_seen
+            FROM price_history 
+            GROUP BY product_name, retailer
+            ORDER BY last_seen DESC
+        """)
+        
+        rows = cursor.fetchall()
+        
+        products = []
+        for row in rows:
+            products.append(dict(row))
+        
+        return products
+
 
+def iter_tracked_products(page_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield tracked products a page at a time, ordered by product name and retailer.
+    
+    Pages are fetched with keyset pagination (each query resumes after the
+    last (product_name, retailer) seen) on a fresh connection, so memory stays
+    bounded by page_size and the generator may be advanced from any thread.
+    
+    Args:
+        page_size: Maximum number of products per page
+        
+    Yields:
+        Lists of product dicts with the same fields as get_all_tracked_products()
+    """
+    last_key = None
+    while True:
+        try:
+            with get_db_connection() as conn:
+                cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+                
+                after = "WHERE (product_name, retailer) > (%s, %s)" if last_key else ""
+                cursor.execute(f"""
+                    SELECT product_name, retailer,
+                           COUNT(*) as record_count,
+                           MIN(date_recorded) as first_seen,
+                           MAX(date_recorded) as last_seen
+                    FROM price_history
+                    {after}
+                    GROUP BY product_name, retailer
+                    ORDER BY product_name, retailer
+                    LIMIT %s
+                """, (*(last_key or ()), page_size))
+                
+                rows = cursor.fetchall()
+        except Exception as e:
+            logger.error("Failed to get tracked products page: %s", e)
+            return
+        
+        if not rows:
+            return
+        
+        yield [dict(row) for row in rows]
+        
+        if len(rows) < page_size:
+            return
+        last_key = (rows[-1]['product_name'], rows[-1]['retailer'])
+
+@_db_op("Failed to clear database", default=False)
 def clear_all_price_history() -> bool:
     """Clear all price history and alternative products data."""
-    try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Get count before deletion for logging
-            cursor.execute("SELECT COUNT(*) FROM price_history")
-            price_records = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM alternative_products")
-            alt_records = cursor.fetchone()[0]
-            
-            # Delete all records
-            cursor.execute("DELETE FROM price_history")
-            cursor.execute("DELETE FROM alternative_products")
-            
-            # Reset sequences
-            cursor.execute("ALTER SEQUENCE price_history_id_seq RESTART WITH 1")
-            cursor.execute("ALTER SEQUENCE alternative_products_id_seq RESTART WITH 1")
-            
-            conn.commit()
-            
-            logger.warning(f"Cleared {price_records} price history and {alt_records} alternative product records from database")
-            return True
-            
-    except Exception as e:
-        logger.error(f"Failed to clear database: {e}")
-        return False
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        
+        # Get count before deletion for logging
+        cursor.execute("SELECT COUNT(*) FROM price_history")
+        price_records = cursor.fetchone()[0]
+        
+        cursor.execute("SELECT COUNT(*) FROM alternative_products")
+        alt_records = cursor.fetchone()[0]
+        
+        # Delete all records
+        cursor.execute("DELETE FROM price_history")
+        cursor.execute("DELETE FROM alternative_products")
+        
+        # Reset sequences
+        cursor.execute("ALTER SEQUENCE price_history_id_seq RESTART WITH 1")
+        cursor.execute("ALTER SEQUENCE alternative_products_id_seq RESTART WITH 1")
+        
+        conn.commit()
+        
+        logger.warning("Cleared %s price history and %s alternative product records from database", price_records, alt_records)
+        return True
 
 def delete_product_history(product_name: str, retailer: str) -> Dict[str, Any]:
     """Delete all price history for a specific product at a specific retailer."""
@@ -545,12 +735,12 @@ def delete_product_history(product_name: str, retailer: str) -> Dict[str, Any]:
         with get_db_connection() as conn:
             cursor = conn.cursor()
             
-            # First, count how many records will be deleted
+            # Delete in one pass; the row count says whether anything matched
             cursor.execute(
-                "SELECT COUNT(*) FROM price_history WHERE product_name = %s AND retailer = %s",
+                "DELETE FROM price_history WHERE product_name = %s AND retailer = %s",
                 (normalized_name, retailer)
             )
-            records_to_delete = cursor.fetchone()[0]
+            records_to_delete = cursor.rowcount
             
             if records_to_delete == 0:
                 return {
@@ -559,15 +749,9 @@ def delete_product_history(product_name: str, retailer: str) -> Dict[str, Any]:
                     "records_deleted": 0
                 }
             
-            # Delete the records
-            cursor.execute(
-                "DELETE FROM price_history WHERE product_name = %s AND retailer = %s",
-                (normalized_name, retailer)
-            )
-            
             conn.commit()
             
-            logger.info(f"Deleted {records_to_delete} records for {normalized_name} at {retailer}")
+            logger.info("Deleted %s records for %s at %s", records_to_delete, normalized_name, retailer)
             return {
                 "success": True,
                 "message": f"Successfully deleted {records_to_delete} records",
@@ -575,145 +759,121 @@ def delete_product_history(product_name: str, retailer: str) -> Dict[str, Any]:
             }
             
     except Exception as e:
-        logger.error(f"Failed to delete product history: {e}")
+        logger.error("Failed to delete product history: %s", e)
         return {
             "success": False,
             "message": f"Error deleting product: {str(e)}",
             "records_deleted": 0
         }
 
+def _empty_database_stats() -> Dict[str, Any]:
+    """Statistics reported when the database can't be read."""
+    return {
+        'price_history': {
+            'total_records': 0,
+            'unique_products': 0,
+            'unique_retailers': 0,
+            'oldest_record': None,
+            'newest_record': None
+        },
+        'alternatives': {
+            'total_records': 0,
+            'unique_queries': 0,
+            'unique_products': 0
+        }
+    }
+
+@_db_op("Failed to get database stats", default=_empty_database_stats)
 def get_database_stats() -> Dict[str, Any]:
     """Get basic statistics about the database."""
-    try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Price history stats
-            cursor.execute("SELECT COUNT(*) FROM price_history")
-            total_records = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(DISTINCT product_name) FROM price_history")
-            unique_products = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(DISTINCT retailer) FROM price_history")
-            unique_retailers = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT MIN(date_recorded), MAX(date_recorded) FROM price_history")
-            date_range = cursor.fetchone()
-            
-            # Today's updates count
-            cursor.execute("SELECT COUNT(DISTINCT product_name) FROM price_history WHERE date_recorded = CURRENT_DATE")
-            todays_updates = cursor.fetchone()[0]
-            
-            # On sale count
-            cursor.execute("SELECT COUNT(*) FROM price_history WHERE on_sale = true")
-            on_sale_count = cursor.fetchone()[0]
-            
-            return {
-                'price_history': {
-                    'total_records': total_records,
-                    'unique_products': unique_products,
-                    'unique_retailers': unique_retailers,
-                    'oldest_record': date_range[0].isoformat() if date_range and date_range[0] else None,
-                    'newest_record': date_range[1].isoformat() if date_range and date_range[1] else None,
-                    'todays_updates': todays_updates,
-                    'on_sale_count': on_sale_count
-                }
-            }
-            
-    except Exception as e:
-        logger.error(f"Failed to get database stats: {e}")
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        
+        # Price history stats, including today's updates and sales, in one scan
+        cursor.execute("""
+            SELECT COUNT(*),
+                   COUNT(DISTINCT product_name),
+                   COUNT(DISTINCT retailer),
+                   MIN(date_recorded),
+                   MAX(date_recorded),
+                   COUNT(DISTINCT product_name) FILTER (WHERE date_recorded = CURRENT_DATE),
+                   COUNT(*) FILTER (WHERE on_sale = true)
+            FROM price_history
+        """)
+        (total_records, unique_products, unique_retailers,
+         oldest_record, newest_record, todays_updates, on_sale_count) = cursor.fetchone()
+        
         return {
             'price_history': {
-                'total_records': 0,
-                'unique_products': 0,
-                'unique_retailers': 0,
-                'oldest_record': None,
-                'newest_record': None
-            },
-            'alternatives': {
-                'total_records': 0,
-                'unique_queries': 0,
-                'unique_products': 0
+                'total_records': total_records,
+                'unique_products': unique_products,
+                'unique_retailers': unique_retailers,
+                'oldest_record': oldest_record.isoformat() if oldest_record else None,
+                'newest_record': newest_record.isoformat() if newest_record else None,
+                'todays_updates': todays_updates,
+                'on_sale_count': on_sale_count
             }
         }
 
 # Favorites System Functions
+@_db_op("Failed to add favorite", default=False)
 def add_to_favorites(product_name: str, retailer: str) -> bool:
     """Add product to admin favorites."""
-    try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Check if already exists
-            cursor.execute(
-                "SELECT id FROM favorites WHERE product_name = %s AND retailer = %s",
-                (product_name, retailer)
-            )
-            
-            if cursor.fetchone():
-                return False  # Already exists
-                
-            # Add to favorites
-            cursor.execute(
-                """INSERT INTO favorites (product_name, retailer) 
-                   VALUES (%s, %s)""",
-                (product_name, retailer)
-            )
-            
-            conn.commit()
-            logger.info(f"Added {product_name} ({retailer}) to favorites")
-            return True
-            
-    except Exception as e:
-        logger.error(f"Failed to add favorite: {e}")
-        return False
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        
+        # The UNIQUE constraint skips existing favorites, so no lookup is needed
+        cursor.execute(
+            """INSERT INTO favorites (product_name, retailer) 
+               VALUES (%s, %s)
+               ON CONFLICT (product_name, retailer) DO NOTHING""",
+            (product_name, retailer)
+        )
+        
+        if cursor.rowcount == 0:
+            return False  # Already exists
+        
+        conn.commit()
+        logger.info("Added %s (%s) to favorites", product_name, retailer)
+        return True
 
+@_db_op("Failed to get favorites", default=list)
 def get_favorites() -> list:
     """Get all admin favorites."""
-    try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT id, product_name, retailer, created_at
-                FROM favorites
-                ORDER BY created_at DESC
-            """)
-            
-            favorites = []
-            for row in cursor.fetchall():
-                favorites.append({
-                    'id': row[0],
-                    'product_name': row[1],
-                    'retailer': row[2],
-                    'created_at': row[3].isoformat() if row[3] else None
-                })
-            
-            return favorites
-            
-    except Exception as e:
-        logger.error(f"Failed to get favorites: {e}")
-        return []
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT id, product_name, retailer, created_at
+            FROM favorites
+            ORDER BY created_at DESC
+        """)
+        
+        favorites = []
+        for row in cursor.fetchall():
+            favorites.append({
+                'id': row[0],
+                'product_name': row[1],
+                'retailer': row[2],
+                'created_at': row[3].isoformat() if row[3] else None
+            })
+        
+        return favorites
 
+@_db_op("Failed to remove favorite", default=False)
 def remove_from_favorites(favorite_id: int) -> bool:
     """Remove product from admin favorites."""
-    try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute("DELETE FROM favorites WHERE id = %s", (favorite_id,))
-            
-            if cursor.rowcount > 0:
-                conn.commit()
-                logger.info(f"Removed favorite ID {favorite_id}")
-                return True
-            else:
-                return False
-                
-    except Exception as e:
-        logger.error(f"Failed to remove favorite: {e}")
-        return False
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute("DELETE FROM favorites WHERE id = %s", (favorite_id,))
+        
+        if cursor.rowcount > 0:
+            conn.commit()
+            logger.info("Removed favorite ID %s", favorite_id)
+            return True
+        else:
+            return False
 
 # Auto-initialize database on import in production
 try:
@@ -721,4 +881,4 @@ try:
         init_database()
         logger.info("PostgreSQL database auto-initialized on startup")
 except Exception as e:
-    logger.warning(f"Could not auto-initialize PostgreSQL database: {e}")
\ No newline at end of file
+    logger.warning("Could not auto-initialize PostgreSQL database: %s", e)
\ No newline at end of file
@@ -5,19 +5,175 @@ This module provides standardized error handling, logging, and response formatti
 to ensure consistent error reporting across the application.
 """
 
+import atexit
+import itertools
 import logging
-import traceback
-from typing import Dict, Any, Optional, List, Union
-from dataclasses import dataclass
+import logging.handlers
+import queue
+import re
+import reprlib
+import sys
+import threading
+from typing import ClassVar, Dict, Any, Optional, List, Union
+from dataclasses import dataclass, field
 from enum import Enum
+from functools import lru_cache
+from hashlib import blake2b
+from types import MappingProxyType
+from uuid import uuid4
 import time
 
+import orjson
 from fastapi import Request, HTTPException, status
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 
 logger = logging.getLogger(__name__)
 
+# Error records waiting for the background writer. Bounded so an error storm
+# can't grow memory without limit; records beyond this are dropped.
+LOG_QUEUE_SIZE = 10000
+
+# Most records the writer takes off the queue per wake-up. During a storm it
+# drains a whole batch without blocking, instead of waiting once per record.
+LOG_BATCH_SIZE = 512
+
+# Identical errors (same code, path and exception type) are logged at most
+# once per this many seconds; repeats inside the window are suppressed
+LOG_DEDUP_WINDOW = 5.0
+
+# Most records logged per second for any one error code, as a token bucket
+LOG_RATE_LIMIT = 1000
+
+# Dedup entries kept before expired ones are pruned
+LOG_DEDUP_MAX_KEYS = 1024
+
+
+class _ErrorLogQueueHandler(logging.handlers.QueueHandler):
+    """Queue records as-is, dropping (and counting) them when the queue is full."""
+    
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting (including any traceback) is left to the writer thread
+        return record
+    
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _ErrorLogWriter:
+    """
+    Background thread handing queued records to the handlers the source
+    logger would normally propagate to, a batch at a time.
+    """
+    
+    _STOP = object()
+    
+    def __init__(self, log_queue: queue.Queue, source: logging.Logger):
+        self.queue = log_queue
+        self.source = source
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="error-log-writer", daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        """Write everything queued so far, then stop the thread."""
+        if self._thread:
+            self.queue.put(self._STOP)
+            self._thread.join()
+            self._thread = None
+    
+    def _run(self) -> None:
+        while True:
+            batch = [self.queue.get()]
+            try:
+                while len(batch) < LOG_BATCH_SIZE:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+            
+            stopping = False
+            for record in batch:
+                if record is self._STOP:
+                    stopping = True
+                elif self.source.parent:
+                    self.source.parent.callHandlers(record)
+            if stopping:
+                return
+
+
+# Error logging runs on request-handling coroutines, so emitting only
+# enqueues the record; the writer thread does the actual (blocking) writes
+# through whatever handlers the application configured upstream
+_log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+_log_queue_handler = _ErrorLogQueueHandler(_log_queue)
+_log_listener = _ErrorLogWriter(_log_queue, logger)
+logger.addHandler(_log_queue_handler)
+logger.propagate = False
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+# Context keys containing any of these are redacted before logging. Longer
+# names such as api_key or access_token are already covered by key/token.
+_SENSITIVE_RE = re.compile(r'password|token|secret|key|auth|credential|session_id')
+
+
+@lru_cache(maxsize=1024)
+def _is_sensitive_key(key: str) -> bool:
+    """Whether a context key should be redacted; context keys come from a small fixed set."""
+    return _SENSITIVE_RE.search(key.lower()) is not None
+
+
+# Lists and dicts in logged context are logged whole only when they hold at
+# most this many items, all scalars with strings up to CONTEXT_MAX_STRING
+# characters. Anything else is replaced by a bounded repr, with "..." where
+# it was cut.
+CONTEXT_MAX_ITEMS = 20
+CONTEXT_MAX_STRING = 500
+
+_context_repr = reprlib.Repr()
+_context_repr.maxstring = CONTEXT_MAX_STRING
+_context_repr.maxother = CONTEXT_MAX_STRING
+_context_repr.maxlist = 10
+_context_repr.maxdict = 10
+
+
+def _loggable_as_is(value: Union[list, dict]) -> bool:
+    """Whether a context list or dict is small and flat enough to log unchanged."""
+    if len(value) > CONTEXT_MAX_ITEMS:
+        return False
+    items = itertools.chain(value.keys(), value.values()) if isinstance(value, dict) else value
+    for item in items:
+        if isinstance(item, str):
+            if len(item) > CONTEXT_MAX_STRING:
+                return False
+        elif item is not None and not isinstance(item, (int, float, bool)):
+            return False
+    return True
+
+# [second, formatted timestamp] for the last second an error response was built
+_timestamp_cache: List[Any] = [0, ""]
+
+
+def _iso_now() -> str:
+    """Current UTC time as an ISO string, formatted at most once per second."""
+    now = int(time.time())
+    cache = _timestamp_cache
+    if cache[0] != now:
+        # A racing thread can at worst return the previous second's string
+        cache[1] = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(now))
+        cache[0] = now
+    return cache[1]
+
+
 class ErrorCategory(str, Enum):
     """Categories of errors for better classification."""
     VALIDATION = "validation"
@@ -38,6 +194,14 @@ class ErrorSeverity(str, Enum):
     HIGH = "high"
     CRITICAL = "critical"
 
+# Log level each error severity is written at
+_SEVERITY_TO_LEVEL = {
+    ErrorSeverity.CRITICAL: logging.CRITICAL,
+    ErrorSeverity.HIGH: logging.ERROR,
+    ErrorSeverity.MEDIUM: logging.WARNING,
+    ErrorSeverity.LOW: logging.INFO
+}
+
 @dataclass
 class ErrorDetails:
     """Detailed error information for logging and debugging."""
@@ -50,6 +214,24 @@ class ErrorDetails:
     retryable: bool = False
     retry_after: Optional[int] = None
     context: Optional[Dict[str, Any]] = None
+    # Values derived once for logging and response headers
+    category_str: str = field(default="", init=False, repr=False, compare=False)
+    severity_str: str = field(default="", init=False, repr=False, compare=False)
+    retry_after_str: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Plain interned strings, shared by every record logged for this error
+        self.code = sys.intern(self.code)
+        self.category_str = sys.intern(ErrorCategory(self.category).value)
+        self.severity_str = sys.intern(ErrorSeverity(self.severity).value)
+        if self.retry_after:
+            self.retry_after_str = str(self.retry_after)
+
+class _OrjsonJSONResponse(JSONResponse):
+    """JSONResponse whose body is encoded with orjson."""
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
 
 class ErrorResponse(BaseModel):
     """Structured error response model."""
@@ -65,9 +247,15 @@ class ErrorHandler:
     Centralized error handler with structured logging and responses.
     """
     
+    # User data fields that are logged as-is
+    _SAFE_FIELDS: ClassVar[frozenset] = frozenset({
+        'user_id', 'username', 'email_hash', 'role', 'session_duration',
+        'last_login', 'preferences', 'settings', 'location', 'timezone'
+    })
+    
     def __init__(self):
         # Predefined error configurations
-        self.error_configs = {
+        self._error_configs = {
             "VALIDATION_FAILED": ErrorDetails(
                 code="VALIDATION_FAILED",
                 message="Input validation failed",
@@ -137,13 +325,66 @@ class ErrorHandler:
                 retry_after=120
             )
         }
+        # Read-only view; add_error_config is the way to register codes
+        self.error_configs = MappingProxyType(self._error_configs)
+        
+        # Error storm protection for log_error
+        self._last_logged: Dict[tuple, list] = {}  # dedup key -> [logged at, request ID, repeats suppressed]
+        self._log_allowance: Dict[str, tuple] = {}
+        self._last_request_id: Dict[str, str] = {}  # error code -> ID of its last written record
+        self._rate_limited: Dict[str, int] = {}  # error code -> records dropped since then
+        self.suppressed_count = 0
+    
+    def _suppressed_as(self, error_code: str, key: tuple, now: float) -> Optional[str]:
+        """
+        Apply the dedup window and per-code rate limit.
+        
+        Returns:
+            None if the error should be logged, otherwise the request ID of the
+            written record it is counted against
+        """
+        entry = self._last_logged.get(key)
+        if entry is not None and now - entry[0] < LOG_DEDUP_WINDOW:
+            entry[2] += 1
+            self.suppressed_count += 1
+            return entry[1]
+        
+        # Refill the code's bucket for the time since it was last used
+        tokens, refilled_at = self._log_allowance.get(error_code, (LOG_RATE_LIMIT, now))
+        tokens = min(LOG_RATE_LIMIT, tokens + (now - refilled_at) * LOG_RATE_LIMIT)
+        if tokens < 1:
+            # An empty bucket means this code has written records already
+            self._log_allowance[error_code] = (tokens, now)
+            self._rate_limited[error_code] = self._rate_limited.get(error_code, 0) + 1
+            self.suppressed_count += 1
+            return self._last_request_id[error_code]
+        self._log_allowance[error_code] = (tokens - 1, now)
+        return None
+    
+    def _record_logged(self, error_code: str, key: tuple, now: float, request_id: str) -> int:
+        """Remember a written record; returns how many suppressed errors it accounts for."""
+        previous = self._last_logged.get(key)
+        suppressed = (previous[2] if previous else 0) + self._rate_limited.pop(error_code, 0)
+        
+        if len(self._last_logged) >= LOG_DEDUP_MAX_KEYS:
+            self._last_logged = {
+                k: entry for k, entry in self._last_logged.items() if now - entry[0] < LOG_DEDUP_WINDOW
+            }
+        self._last_logged[key] = [now, request_id, 0]
+        self._last_request_id[error_code] = request_id
+        return suppressed
+    
+    def _resolve(self, error_code: str) -> ErrorDetails:
+        """Look up an error configuration, falling back to INTERNAL_ERROR."""
+        return self._error_configs.get(error_code) or self._error_configs["INTERNAL_ERROR"]
     
     def log_error(self, 
                   error_code: str, 
                   exception: Optional[Exception] = None,
                   request: Optional[Request] = None,
                   context: Optional[Dict[str, Any]] = None,
-                  user_data: Optional[Dict[str, Any]] = None) -> str:
+                  user_data: Optional[Dict[str, Any]] = None,
+                  error_config: Optional[ErrorDetails] = None) -> str:
         """
         Log error with structured information.
         
@@ -153,32 +394,56 @@ class ErrorHandler:
             request: FastAPI request object
             context: Additional context information
             user_data: User-related data (will be sanitized)
+            error_config: Configuration for error_code, if already looked up
             
         Returns:
-            Unique request ID for tracking
+            Request ID for tracking; a suppressed repeat gets the ID of the
+            logged record it was counted against
         """
-        request_id = f"{int(time.time() * 1000)}-{id(request) if request else 0}"
+        request_id = uuid4().hex
         
-        error_config = self.error_configs.get(error_code, self.error_configs["INTERNAL_ERROR"])
+        error_config = error_config or self._resolve(error_code)
+        
+        # Nothing below is needed if this severity is filtered out anyway
+        level = _SEVERITY_TO_LEVEL[error_config.severity]
+        if not logger.isEnabledFor(level):
+            return request_id
+        
+        # Repeats of a recent error, or a code over its rate, are counted
+        # but not written, so an outage can't flood the log. They get the ID of
+        # the record they were folded into, so it can still be found in the log.
+        now = time.monotonic()
+        dedup_key = (
+            error_code,
+            request.url.path if request else None,
+            type(exception).__name__ if exception else None
+        )
+        logged_request_id = self._suppressed_as(error_code, dedup_key, now)
+        if logged_request_id is not None:
+            return logged_request_id
+        suppressed = self._record_logged(error_code, dedup_key, now, request_id)
         
         # Build log context
         log_context = {
             "request_id": request_id,
             "error_code": error_code,
-            "error_category": error_config.category.value,
-            "error_severity": error_config.severity.value,
+            "error_category": error_config.category_str,
+            "error_severity": error_config.severity_str,
             "retryable": error_config.retryable,
             "timestamp": time.time()
         }
+        if suppressed:
+            # Errors dropped since the last record for this error
+            log_context["suppressed_count"] = suppressed
         
         # Add request information
         if request:
             log_context.update({
                 "method": request.method,
                 "path": str(request.url.path),
-                "query_params": dict(request.query_params),
-                "client_ip": self._get_client_ip(request),
-                "user_agent": request.headers.get("user-agent")
+                # Raw query string; parsing it into a dict is left to whoever reads the log
+                "query_params": request.url.query,
+                **self._get_client_info(request)
             })
         
         # Add context information
@@ -193,21 +458,15 @@ class ErrorHandler:
             log_context["user_data"] = sanitized_user_data
         
         # Log based on severity
-        if error_config.severity == ErrorSeverity.CRITICAL:
-            logger.critical(error_config.message, extra=log_context, exc_info=exception)
-        elif error_config.severity == ErrorSeverity.HIGH:
-            logger.error(error_config.message, extra=log_context, exc_info=exception)
-        elif error_config.severity == ErrorSeverity.MEDIUM:
-            logger.warning(error_config.message, extra=log_context, exc_info=exception)
-        else:
-            logger.info(error_config.message, extra=log_context, exc_info=exception)
+        logger.log(level, error_config.message, extra=log_context, exc_info=exception)
         
         return request_id
     
     def create_error_response(self, 
                              error_code: str,
                              request_id: str,
-                             details: Optional[Dict[str, Any]] = None) -> ErrorResponse:
+                             details: Optional[Dict[str, Any]] = None,
+                             error_config: Optional[ErrorDetails] = None) -> ErrorResponse:
         """
         Create structured error response.
         
@@ -215,26 +474,37 @@ class ErrorHandler:
             error_code: Predefined error code
             request_id: Request identifier
             details: Additional error details for user
+            error_config: Configuration for error_code, if already looked up
             
         Returns:
             Structured error response
         """
-        error_config = self.error_configs.get(error_code, self.error_configs["INTERNAL_ERROR"])
+        error_config = error_config or self._resolve(error_code)
         
-        response = ErrorResponse(
-            error=error_code,
-            message=error_config.user_message,
-            timestamp=time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
-            request_id=request_id
-        )
+        # The message and retry delay come from a registered config and the
+        # timestamp is generated here; only the caller's values need checking
+        # before the model is built without validation
+        if request_id is not None and not isinstance(request_id, str):
+            raise TypeError(f"request_id must be a string, not {type(request_id).__name__}")
+        if details is not None and not isinstance(details, dict):
+            raise TypeError(f"details must be a dict, not {type(details).__name__}")
         
-        if error_config.retry_after:
-            response.retry_after = error_config.retry_after
-        
-        if details:
-            response.details = details
-        
-        return response
+        return ErrorResponse.model_construct(**self._build_error_dict(error_code, request_id, details, error_config))
+    
+    def _build_error_dict(self,
+                          error_code: str,
+                          request_id: str,
+                          details: Optional[Dict[str, Any]],
+                          error_config: ErrorDetails) -> Dict[str, Any]:
+        """Build the error response body as a plain dict with ErrorResponse's fields."""
+        return {
+            "error": error_code,
+            "message": error_config.user_message,
+            "details": details or None,
+            "timestamp": _iso_now(),
+            "request_id": request_id,
+            "retry_after": error_config.retry_after or None
+        }
     
     def handle_exception(self, 
                         error_code: str,
@@ -255,70 +525,76 @@ class ErrorHandler:
         Returns:
             JSON error response
         """
+        # Resolve the configuration once for logging, the body and the status
+        error_config = self._resolve(error_code)
+        
         # Log the error
         request_id = self.log_error(
             error_code=error_code,
             exception=exception,
             request=request,
-            context=context
-        )
-        
-        # Create structured response
-        error_response = self.create_error_response(
-            error_code=error_code,
-            request_id=request_id,
-            details=details
+            context=context,
+            error_config=error_config
         )
         
-        # Get HTTP status code
-        error_config = self.error_configs.get(error_code, self.error_configs["INTERNAL_ERROR"])
-        
-        # Create JSON response
-        response = JSONResponse(
+        # Create JSON response; the body skips the ErrorResponse model round-trip
+        # and is encoded with orjson
+        response = _OrjsonJSONResponse(
             status_code=error_config.http_status,
-            content=error_response.dict()
+            content=self._build_error_dict(error_code, request_id, details, error_config)
         )
         
         # Add retry headers if applicable
-        if error_config.retry_after:
-            response.headers["Retry-After"] = str(error_config.retry_after)
+        if error_config.retry_after_str:
+            response.headers["Retry-After"] = error_config.retry_after_str
         
         return response
     
-    def _get_client_ip(self, request: Request) -> str:
-        """Extract client IP from request."""
+    def _get_client_info(self, request: Request) -> Dict[str, Optional[str]]:
+        """Extract client IP and user agent from request in one pass over the headers."""
+        # ASGI header names are already lowercase; like Headers.get, the
+        # first occurrence of each header wins
+        forwarded_for = real_ip = user_agent = None
+        for name, value in request.headers.raw:
+            if name == b"x-forwarded-for":
+                if forwarded_for is None:
+                    forwarded_for = value
+            elif name == b"x-real-ip":
+                if real_ip is None:
+                    real_ip = value
+            elif name == b"user-agent":
+                if user_agent is None:
+                    user_agent = value
+        
         # Check various headers for real IP (proxy setups)
-        forwarded_for = request.headers.get("x-forwarded-for")
         if forwarded_for:
-            return forwarded_for.split(",")[0].strip()
-        
-        real_ip = request.headers.get("x-real-ip")
-        if real_ip:
-            return real_ip
+            # Only the first (originating) address is needed
+            end = forwarded_for.find(b",")
+            client_ip = (forwarded_for[:end] if end >= 0 else forwarded_for).strip().decode("latin-1")
+        elif real_ip:
+            client_ip = real_ip.decode("latin-1")
+        else:
+            client_ip = request.client.host if request.client else "unknown"
         
-        return request.client.host if request.client else "unknown"
+        return {
+            "client_ip": client_ip,
+            "user_agent": user_agent.decode("latin-1") if user_agent is not None else None
+        }
     
     def _sanitize_context(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Sanitize context data to remove sensitive information."""
-        sensitive_keys = {
-            'password', 'token', 'secret', 'key', 'auth', 'credential',
-            'api_key', 'access_token', 'refresh_token', 'session_id'
-        }
-        
         sanitized = {}
         for key, value in context.items():
-            key_lower = key.lower()
-            if any(sensitive in key_lower for sensitive in sensitive_keys):
+            if _is_sensitive_key(key):
                 sanitized[key] = "[REDACTED]"
             elif isinstance(value, (str, int, float, bool)):
                 sanitized[key] = value
             elif isinstance(value, (list, dict)):
-                # Truncate large objects
-                str_value = str(value)
-                if len(str_value) > 500:
-                    sanitized[key] = f"{str_value[:500]}... [TRUNCATED]"
-                else:
+                # Bound large or nested objects without stringifying them in full
+                if _loggable_as_is(value):
                     sanitized[key] = value
+                else:
+                    sanitized[key] = _context_repr.repr(value)
             else:
                 sanitized[key] = str(type(value))
         
@@ -326,26 +602,19 @@ class ErrorHandler:
     
     def _sanitize_user_data(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
         """Sanitize user data for logging."""
-        # Only include safe fields
-        safe_fields = {
-            'user_id', 'username', 'email_hash', 'role', 'session_duration',
-            'last_login', 'preferences', 'settings', 'location', 'timezone'
-        }
-        
         sanitized = {}
         for key, value in user_data.items():
-            if key in safe_fields:
+            if key in self._SAFE_FIELDS:
                 sanitized[key] = value
             elif 'email' in key.lower() and isinstance(value, str):
                 # Hash email for privacy
-                import hashlib
-                sanitized[f"{key}_hash"] = hashlib.md5(value.encode()).hexdigest()[:8]
+                sanitized[f"{key}_hash"] = blake2b(value.encode(), digest_size=4).hexdigest()
         
         return sanitized
     
     def add_error_config(self, error_code: str, error_details: ErrorDetails) -> None:
         """Add custom error configuration."""
-        self.error_configs[error_code] = error_details
+        self._error_configs[error_code] = error_details
     
     def get_error_info(self, error_code: str) -> Optional[ErrorDetails]:
         """Get error configuration by code."""
@@ -432,10 +701,8 @@ async def handle_internal_error(request: Request,
     """Handle internal/unexpected errors."""
     error_handler = get_error_handler()
     
-    context = {
-        "exception_type": type(exception).__name__,
-        "traceback": traceback.format_exc()
-    }
+    # The traceback is formatted from exc_info by the log writer thread
+    context = {"exception_type": type(exception).__name__}
     if operation:
         context["operation"] = operation
     
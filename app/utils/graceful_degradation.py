@@ -9,6 +9,7 @@ even when some components are unavailable.
 import asyncio
 import logging
 import time
+from collections import Counter
 from typing import List, Dict, Any, Optional, Callable, Union, Tuple
 from dataclasses import dataclass
 from enum import Enum
@@ -47,11 +48,22 @@ class DegradationConfig:
 class CircuitBreaker:
     """Circuit breaker pattern for external service calls."""
     
-    def __init__(self, failure_threshold: int = 5, timeout: int = 60):
+    def __init__(self, failure_threshold: int = 5, timeout: int = 60, max_timeout: Optional[float] = None):
+        """
+        Args:
+            failure_threshold: Consecutive failures before the circuit opens
+            timeout: Seconds to stay open before allowing a probe request
+            max_timeout: If set, the open period doubles each time a probe
+                         fails, up to this many seconds
+        """
         self.failure_threshold = failure_threshold
+        self.base_timeout = timeout
         self.timeout = timeout
+        self.max_timeout = max_timeout
         self.failure_count = 0
         self.last_failure_time = 0
+        self.probe_started = 0
+        self.trip_count = 0  # Times the circuit has opened
         self.state = "closed"  # closed, open, half-open
     
     def can_execute(self) -> bool:
@@ -61,6 +73,14 @@ class CircuitBreaker:
         if self.state == "open":
             if current_time - self.last_failure_time > self.timeout:
                 self.state = "half-open"
+                self.probe_started = current_time
+                return True
+            return False
+        
+        if self.state == "half-open":
+            # Only one probe at a time; allow another if the last one never reported back
+            if current_time - self.probe_started > self.timeout:
+                self.probe_started = current_time
                 return True
             return False
         
@@ -69,6 +89,7 @@ class CircuitBreaker:
     def record_success(self):
         """Record successful request."""
         self.failure_count = 0
+        self.timeout = self.base_timeout
         self.state = "closed"
     
     def record_failure(self):
@@ -76,9 +97,18 @@ class CircuitBreaker:
         self.failure_count += 1
         self.last_failure_time = time.time()
         
-        if self.failure_count >= self.failure_threshold:
-            self.state = "open"
-            logger.warning(f"Circuit breaker opened after {self.failure_count} failures")
+        if self.state == "half-open":
+            # Probe failed: back off for longer before the next one
+            if self.max_timeout:
+                self.timeout = min(self.max_timeout, self.timeout * 2)
+            self._open()
+        elif self.state == "closed" and self.failure_count >= self.failure_threshold:
+            self._open()
+    
+    def _open(self):
+        self.state = "open"
+        self.trip_count += 1
+        logger.warning(f"Circuit breaker opened after {self.failure_count} failures (retry in {self.timeout}s)")
 
 class GracefulDegradationManager:
     """
@@ -119,7 +149,7 @@ class GracefulDegradationManager:
         Returns:
             ServiceResult with success/failure information
         """
-        start_time = time.time()
+        start_time = time.perf_counter()  # Latency clock; not wall time
         timeout = timeout_seconds or self.config.max_wait_time_seconds
         
         # Check circuit breaker
@@ -133,11 +163,13 @@ class GracefulDegradationManager:
             logger.debug(f"Executing primary function for {service_name}")
             
             if asyncio.iscoroutinefunction(primary_func):
-                result = await asyncio.wait_for(primary_func(), timeout=timeout)
+                # Runs in the current task rather than a wait_for wrapper task
+                async with asyncio.timeout(timeout):
+                    result = await primary_func()
             else:
                 result = primary_func()
             
-            response_time = (time.time() - start_time) * 1000
+            response_time = (time.perf_counter() - start_time) * 1000
             
             # Record success
             circuit_breaker.record_success()
@@ -159,7 +191,7 @@ class GracefulDegradationManager:
             )
         
         except asyncio.TimeoutError:
-            response_time = (time.time() - start_time) * 1000
+            response_time = (time.perf_counter() - start_time) * 1000
             circuit_breaker.record_failure()
             
             logger.warning(f"Primary function timed out for {service_name} after {timeout}s")
@@ -172,7 +204,6 @@ class GracefulDegradationManager:
             )
         
         except Exception as e:
-            response_time = (time.time() - start_time) * 1000
             circuit_breaker.record_failure()
             
             logger.warning(f"Primary function failed for {service_name}: {str(e)}")
@@ -185,7 +216,7 @@ class GracefulDegradationManager:
                 success=False,
                 data=None,
                 error=str(e),
-                response_time_ms=response_time
+                response_time_ms=(time.perf_counter() - start_time) * 1000
             )
     
     async def _try_fallback(self, 
@@ -206,7 +237,7 @@ class GracefulDegradationManager:
                 else:
                     result = fallback_func()
                 
-                response_time = (time.time() - start_time) * 1000
+                response_time = (time.perf_counter() - start_time) * 1000
                 self.service_status[service_name] = ServiceStatus.DEGRADED
                 
                 logger.info(f"Fallback function succeeded for {service_name}")
@@ -229,7 +260,7 @@ class GracefulDegradationManager:
                 # Check if cache is not too old (1 hour max)
                 cache_age = time.time() - cached_result['timestamp']
                 if cache_age < 3600:  # 1 hour
-                    response_time = (time.time() - start_time) * 1000
+                    response_time = (time.perf_counter() - start_time) * 1000
                     self.service_status[service_name] = ServiceStatus.DEGRADED
                     
                     logger.info(f"Using cached fallback for {service_name} (age: {cache_age:.0f}s)")
@@ -243,7 +274,7 @@ class GracefulDegradationManager:
                     )
         
         # All fallbacks failed
-        response_time = (time.time() - start_time) * 1000
+        response_time = (time.perf_counter() - start_time) * 1000
         self.service_status[service_name] = ServiceStatus.UNAVAILABLE
         
         return ServiceResult(
@@ -272,25 +303,27 @@ class GracefulDegradationManager:
         fallback_calls = fallback_calls or {}
         
         # Execute all service calls concurrently
-        tasks = {}
-        for service_name, func in service_calls.items():
-            fallback_func = fallback_calls.get(service_name)
-            task = self.execute_with_degradation(
-                service_name, func, fallback_func, cached_fallback=True
-            )
-            tasks[service_name] = asyncio.create_task(task)
+        service_names = list(service_calls)
+        outcomes = await asyncio.gather(
+            *(
+                self.execute_with_degradation(
+                    service_name, service_calls[service_name], fallback_calls.get(service_name),
+                    cached_fallback=True
+                )
+                for service_name in service_names
+            ),
+            return_exceptions=True
+        )
         
-        # Wait for all tasks to complete
         results = {}
-        for service_name, task in tasks.items():
-            try:
-                results[service_name] = await task
-            except Exception as e:
-                results[service_name] = ServiceResult(
+        for service_name, outcome in zip(service_names, outcomes):
+            if isinstance(outcome, Exception):
+                outcome = ServiceResult(
                     success=False,
                     data=None,
-                    error=str(e)
+                    error=str(outcome)
                 )
+            results[service_name] = outcome
         
         # Check success threshold
         successful_services = len([r for r in results.values() if r.success])
@@ -311,11 +344,9 @@ class GracefulDegradationManager:
     
     def get_service_status_summary(self) -> Dict[str, Any]:
         """Get summary of service statuses."""
-        status_counts = {}
-        for status in ServiceStatus:
-            status_counts[status.value] = len([
-                s for s in self.service_status.values() if s == status
-            ])
+        # One pass over the services; statuses with no services still report 0
+        counts = Counter(self.service_status.values())
+        status_counts = {status.value: counts[status] for status in ServiceStatus}
         
         circuit_breaker_status = {}
         for service_name, cb in self.circuit_breakers.items():
@@ -8,7 +8,7 @@ the accuracy of finding relevant products from retailer search results.
 import re
 import logging
 from difflib import SequenceMatcher
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, FrozenSet
 from dataclasses import dataclass
 
 from ..models import ProductResult
@@ -27,9 +27,26 @@ class MatchScore:
     keyword_match_bonus: float
     confidence: str  # "high", "medium", "low"
 
+@dataclass(frozen=True, slots=True)
+class MatchTerms:
+    """
+    Features of one string that every scoring component reads.
+    
+    Built once per string with ProductMatcher.prepare(), so a query scored
+    against many candidates is normalized and tokenized only once.
+    """
+    lower: str
+    normalized: str
+    keywords: FrozenSet[str]
+    sizes: Tuple[str, ...]  # From extract_size_info, used for compatibility checks
+    size_tokens: Tuple[str, ...]  # Compact sizes like "2l" or "500ml", used for bonuses
+
 class ProductMatcher:
     """
     Advanced product matcher with configurable thresholds and scoring.
+    
+    Instances hold only configuration that is never mutated after __init__,
+    so a shared matcher is safe to call from worker threads.
     """
     
     def __init__(self, 
@@ -140,91 +157,98 @@ class ProductMatcher:
         
         return keywords
     
+    def prepare(self, text: str) -> MatchTerms:
+        """
+        Compute the features scoring needs from a query or product name.
+        
+        Args:
+            text: Query or product name
+            
+        Returns:
+            MatchTerms to pass to the scoring helpers
+        """
+        text = text or ""
+        lower = text.lower()
+        return MatchTerms(
+            lower=lower,
+            normalized=self.normalize_product_name(text),
+            keywords=frozenset(self.extract_keywords(text)),
+            sizes=tuple(self.extract_size_info(text)),
+            size_tokens=tuple(re.findall(r'\d+(?:\.\d+)?(?:ml|l|g|kg)', lower))
+        )
+    
     def calculate_basic_similarity(self, query: str, product_name: str) -> float:
         """Calculate basic string similarity using SequenceMatcher."""
         if not query or not product_name:
             return 0.0
-        
-        # Normalize both strings
-        norm_query = self.normalize_product_name(query)
-        norm_product = self.normalize_product_name(product_name)
-        
-        if not norm_query or not norm_product:
-            return 0.0
-        
-        # Calculate similarity
-        similarity = SequenceMatcher(None, norm_query, norm_product).ratio()
-        
-        return similarity
+        return self._basic_similarity(self.prepare(query), self.prepare(product_name))
     
     def calculate_keyword_similarity(self, query: str, product_name: str) -> float:
         """Calculate similarity based on keyword matching."""
-        query_keywords = set(self.extract_keywords(query))
-        product_keywords = set(self.extract_keywords(product_name))
+        return self._keyword_similarity(self.prepare(query), self.prepare(product_name))
+    
+    def calculate_exact_match_bonus(self, query: str, product_name: str) -> float:
+        """Calculate bonus for exact word matches."""
+        return self._exact_match_bonus(self.prepare(query), self.prepare(product_name))
+    
+    def calculate_brand_match_bonus(self, query: str, product_name: str) -> float:
+        """Calculate bonus for brand name matches."""
+        return self._brand_match_bonus(self.prepare(query), self.prepare(product_name))
+    
+    def calculate_size_match_bonus(self, query: str, product_name: str) -> float:
+        """Calculate bonus for size/quantity matches."""
+        return self._size_match_bonus(self.prepare(query), self.prepare(product_name))
+    
+    def calculate_keyword_count_bonus(self, query: str, product_name: str) -> float:
+        """Calculate bonus based on number of matching keywords."""
+        return self._keyword_count_bonus(self.prepare(query), self.prepare(product_name))
+    
+    def _basic_similarity(self, query: MatchTerms, product: MatchTerms) -> float:
+        if not query.normalized or not product.normalized:
+            return 0.0
         
-        if not query_keywords or not product_keywords:
+        return SequenceMatcher(None, query.normalized, product.normalized).ratio()
+    
+    def _keyword_similarity(self, query: MatchTerms, product: MatchTerms) -> float:
+        if not query.keywords or not product.keywords:
             return 0.0
         
         # Calculate Jaccard similarity (intersection over union)
-        intersection = len(query_keywords.intersection(product_keywords))
-        union = len(query_keywords.union(product_keywords))
-        
-        if union == 0:
-            return 0.0
+        intersection = len(query.keywords & product.keywords)
+        union = len(query.keywords | product.keywords)
         
         return intersection / union
     
-    def calculate_exact_match_bonus(self, query: str, product_name: str) -> float:
-        """Calculate bonus for exact word matches."""
-        query_words = set(self.extract_keywords(query))
-        product_words = set(self.extract_keywords(product_name))
-        
-        if not query_words:
+    def _exact_match_bonus(self, query: MatchTerms, product: MatchTerms) -> float:
+        if not query.keywords:
             return 0.0
         
-        exact_matches = query_words.intersection(product_words)
-        match_ratio = len(exact_matches) / len(query_words)
+        match_ratio = len(query.keywords & product.keywords) / len(query.keywords)
         
         return match_ratio * self.exact_match_bonus
     
-    def calculate_brand_match_bonus(self, query: str, product_name: str) -> float:
-        """Calculate bonus for brand name matches."""
-        query_lower = query.lower()
-        product_lower = product_name.lower()
-        
+    def _brand_match_bonus(self, query: MatchTerms, product: MatchTerms) -> float:
         for brand in self.common_brands:
-            if brand in query_lower and brand in product_lower:
+            if brand in query.lower and brand in product.lower:
                 return self.brand_match_bonus
         
         return 0.0
     
-    def calculate_size_match_bonus(self, query: str, product_name: str) -> float:
-        """Calculate bonus for size/quantity matches."""
-        query_lower = query.lower()
-        product_lower = product_name.lower()
-        
+    def _size_match_bonus(self, query: MatchTerms, product: MatchTerms) -> float:
         bonus = 0.0
         for size_keyword in self.size_keywords:
-            if size_keyword in query_lower and size_keyword in product_lower:
+            if size_keyword in query.lower and size_keyword in product.lower:
                 bonus += self.size_match_bonus * 0.5  # Partial bonus per match
         
-        # Extract specific size numbers (e.g., "2L", "500ml")
-        query_sizes = re.findall(r'\d+(?:\.\d+)?(?:ml|l|g|kg)', query_lower)
-        product_sizes = re.findall(r'\d+(?:\.\d+)?(?:ml|l|g|kg)', product_lower)
-        
-        for q_size in query_sizes:
-            if q_size in product_sizes:
+        # Specific size numbers (e.g., "2L", "500ml")
+        for q_size in query.size_tokens:
+            if q_size in product.size_tokens:
                 bonus += self.size_match_bonus
         
         return min(bonus, self.size_match_bonus)  # Cap the bonus
     
-    def calculate_keyword_count_bonus(self, query: str, product_name: str) -> float:
-        """Calculate bonus based on number of matching keywords."""
-        query_keywords = set(self.extract_keywords(query))
-        product_keywords = set(self.extract_keywords(product_name))
-        
-        matching_keywords = query_keywords.intersection(product_keywords)
-        bonus = len(matching_keywords) * self.keyword_match_bonus
+    def _keyword_count_bonus(self, query: MatchTerms, product: MatchTerms) -> float:
+        bonus = len(query.keywords & product.keywords) * self.keyword_match_bonus
         
         return min(bonus, self.keyword_match_bonus * 3)  # Cap bonus at 3 keywords
     
@@ -260,8 +284,11 @@ class ProductMatcher:
         Validate that product sizes are compatible to prevent mixing different sizes.
         Returns True if sizes are compatible or if no size information is available.
         """
-        query_sizes = self.extract_size_info(query)
-        product_sizes = self.extract_size_info(product_name)
+        return self._sizes_compatible(self.prepare(query), self.prepare(product_name))
+    
+    def _sizes_compatible(self, query: MatchTerms, product: MatchTerms) -> bool:
+        query_sizes = query.sizes
+        product_sizes = product.sizes
         
         # If no size info in either, allow the match
         if not query_sizes and not product_sizes:
@@ -286,7 +313,7 @@ class ProductMatcher:
                     return True
         
         # Sizes are specified but don't match - be conservative and reject
-        logger.debug(f"Size mismatch: query='{query_sizes}' vs product='{product_sizes}'")
+        logger.debug("Size mismatch: query='%s' vs product='%s'", query_sizes, product_sizes)
         return False
     
     def calculate_match_score(self, query: str, product_name: str) -> MatchScore:
@@ -303,21 +330,24 @@ class ProductMatcher:
         if not query or not product_name:
             return MatchScore(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, "low")
         
+        return self._score(self.prepare(query), self.prepare(product_name))
+    
+    def _score(self, query: MatchTerms, product: MatchTerms) -> MatchScore:
         # First check size compatibility to prevent mixing different sizes
-        if not self.validate_size_compatibility(query, product_name):
-            logger.debug(f"Rejecting match due to size incompatibility: '{query}' vs '{product_name}'")
+        if not self._sizes_compatible(query, product):
+            logger.debug("Rejecting match due to size incompatibility: '%s' vs '%s'", query.lower, product.lower)
             return MatchScore(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, "low")
         
         # Calculate base similarity (weighted at 60%)
-        basic_similarity = self.calculate_basic_similarity(query, product_name)
-        keyword_similarity = self.calculate_keyword_similarity(query, product_name)
+        basic_similarity = self._basic_similarity(query, product)
+        keyword_similarity = self._keyword_similarity(query, product)
         base_score = (basic_similarity * 0.6) + (keyword_similarity * 0.4)
         
         # Calculate bonuses
-        exact_match_bonus = self.calculate_exact_match_bonus(query, product_name)
-        brand_match_bonus = self.calculate_brand_match_bonus(query, product_name)
-        size_match_bonus = self.calculate_size_match_bonus(query, product_name)
-        keyword_match_bonus = self.calculate_keyword_count_bonus(query, product_name)
+        exact_match_bonus = self._exact_match_bonus(query, product)
+        brand_match_bonus = self._brand_match_bonus(query, product)
+        size_match_bonus = self._size_match_bonus(query, product)
+        keyword_match_bonus = self._keyword_count_bonus(query, product)
         
         # Total score
         total_score = base_score + exact_match_bonus + brand_match_bonus + size_match_bonus + keyword_match_bonus
@@ -358,39 +388,41 @@ class ProductMatcher:
         best_product = None
         best_score = None
         best_score_value = 0.0
+        query_terms = self.prepare(query)  # Shared by every candidate
         
         for product in products:
             if not product.name:
                 continue
             
-            match_score = self.calculate_match_score(query, product.name)
+            match_score = self._score(query_terms, self.prepare(product.name))
             
             if match_score.total_score > best_score_value and match_score.total_score >= self.min_similarity:
                 best_product = product
                 best_score = match_score
                 best_score_value = match_score.total_score
         
-        # Log the matching result
-        if best_product and best_score:
-            logger.debug(
-                "Best product match found",
-                extra={
-                    "query": query,
-                    "product_name": best_product.name,
-                    "score": best_score.total_score,
-                    "confidence": best_score.confidence,
-                    "retailer": best_product.retailer
-                }
-            )
-        else:
-            logger.debug(
-                "No suitable product match found",
-                extra={
-                    "query": query,
-                    "candidates_count": len(products),
-                    "min_similarity": self.min_similarity
-                }
-            )
+        # Log the matching result; the extra dicts are only built when debug is on
+        if logger.isEnabledFor(logging.DEBUG):
+            if best_product and best_score:
+                logger.debug(
+                    "Best product match found",
+                    extra={
+                        "query": query,
+                        "product_name": best_product.name,
+                        "score": best_score.total_score,
+                        "confidence": best_score.confidence,
+                        "retailer": best_product.retailer
+                    }
+                )
+            else:
+                logger.debug(
+                    "No suitable product match found",
+                    extra={
+                        "query": query,
+                        "candidates_count": len(products),
+                        "min_similarity": self.min_similarity
+                    }
+                )
         
         return best_product, best_score
     
@@ -409,12 +441,13 @@ class ProductMatcher:
             return []
         
         scored_products = []
+        query_terms = self.prepare(query)  # Shared by every candidate
         
         for product in products:
             if not product.name:
                 continue
             
-            match_score = self.calculate_match_score(query, product.name)
+            match_score = self._score(query_terms, self.prepare(product.name))
             
             if match_score.total_score >= self.min_similarity:
                 scored_products.append((product, match_score))
@@ -453,7 +486,7 @@ class ProductMatcher:
             matches.append(match_obj)
         
         logger.debug(
-            f"Found {len(matches)} matches for query '{query}' (max_results={max_results})",
+            "Found %s matches for query '%s' (max_results=%s)", len(matches), query, max_results,
             extra={
                 "query": query,
                 "matches_count": len(matches),
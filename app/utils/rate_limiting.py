@@ -275,6 +275,46 @@ class RateLimiter:
             return len(clients_to_remove)
 
 
+
+class AsyncTokenBucket:
+    """
+    Token bucket for pacing outbound calls made from asyncio code.
+    
+    Allows max_rate acquisitions per time_period (with bursts up to max_rate)
+    shared across every coroutine using the same instance. Use as
+    ``async with limiter:`` around the call being paced.
+    """
+    
+    def __init__(self, max_rate: float, time_period: float = 1.0):
+        self.max_rate = max_rate  # May be adjusted at runtime
+        self.time_period = time_period
+        self._tokens = float(max_rate)
+        self._last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    def _refill(self) -> None:
+        current_time = time.monotonic()
+        elapsed = current_time - self._last_refill
+        self._tokens = min(self.max_rate, self._tokens + elapsed * self.max_rate / self.time_period)
+        self._last_refill = current_time
+    
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        # Waiters queue on the lock, so tokens are handed out in arrival order
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1.0:
+                await asyncio.sleep((1.0 - self._tokens) * self.time_period / self.max_rate)
+                self._refill()
+            self._tokens -= 1.0
+    
+    async def __aenter__(self) -> "AsyncTokenBucket":
+        await self.acquire()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        return None
+
 # Global rate limiter instance
 _rate_limiter = RateLimiter()
 
@@ -226,6 +226,48 @@ class TestAlternativesDatabase:
         assert results[0]['rank_position'] == 1
         assert results[1]['rank_position'] == 2
     
+    def test_shorter_alternatives_list_drops_old_ranks(self):
+        """Test that re-logging fewer alternatives removes the ranks no longer present."""
+        log_alternative_products('test query', 'woolworths', [
+            {'name': 'Product A', 'price': 1.00},
+            {'name': 'Product B', 'price': 2.00},
+            {'name': 'Product C', 'price': 3.00}
+        ])
+        log_alternative_products('test query', 'woolworths', [
+            {'name': 'Product D', 'price': 4.00}
+        ])
+        
+        results = get_alternative_products('test query', 'woolworths')
+        assert [(r['rank_position'], r['product_name'], r['price']) for r in results] == [(1, 'product d', 4.00)]
+    
+    def test_upgrade_removes_repeated_ranks(self):
+        """Test that upgrading an old database keeps only the newest row per rank."""
+        with get_db_connection() as conn:
+            conn.execute("DROP INDEX idx_alternatives_query_retailer_recent")
+            conn.executemany("""
+                INSERT INTO alternative_products 
+                (search_query, retailer, product_name, price, rank_position, date_recorded)
+                VALUES ('old query', 'coles', ?, ?, 1, date('now'))
+            """, [('older product', 1.00), ('newer product', 2.00)])
+            conn.execute("PRAGMA user_version = 1")
+            conn.commit()
+        
+        init_database()
+        
+        results = get_alternative_products('old query', 'coles')
+        assert [r['product_name'] for r in results] == ['newer product']
+    
+    def test_alternatives_read_in_index_order(self):
+        """Test that stored alternatives are read via an index without a sort step."""
+        import app.utils.database as db_module
+        with get_db_connection() as conn:
+            for retailer_filter, params in [("", ('q', '-30 days')), ("AND retailer = ?", ('q', '-30 days', 'coles'))]:
+                query = db_module._SQL_ALTERNATIVES_JSON.format(retailer_filter=retailer_filter)
+                plan = " ".join(row['detail'] for row in conn.execute("EXPLAIN QUERY PLAN " + query, params))
+                
+                assert "USING INDEX" in plan
+                assert "TEMP B-TREE" not in plan
+    
     def test_clear_all_data_includes_alternatives(self):
         """Test that clearing all data removes alternatives too."""
         # Add some alternatives
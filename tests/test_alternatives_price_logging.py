@@ -12,8 +12,15 @@ import sys
 sys.path.append('.')
 from app.utils.database import (
     log_price_data, 
+    log_price_data_bulk,
     log_alternative_products,
+    get_latest_price,
+    get_all_tracked_products,
+    iter_tracked_products,
     get_database_stats,
+    delete_product_history,
+    add_to_favorites,
+    get_favorites,
     init_database,
     get_db_connection
 )
@@ -202,6 +209,189 @@ class TestAlternativesPriceLogging:
             assert row['price'] == 5.50
             assert bool(row['on_sale']) is True
 
+    
+    def test_bulk_logging_matches_single_row_logging(self):
+        """Test that bulk logging writes the same rows as per-product logging."""
+        rows = [
+            {'product_name': 'Bulk Milk 2L', 'retailer': 'woolworths', 'price': 3.10, 'was_price': 3.50, 'on_sale': True, 'url': 'https://woolworths.com/1'},
+            {'product_name': 'Bulk Bread', 'retailer': 'woolworths', 'price': 2.00},
+            {'product_name': 'Bulk Milk 2L', 'retailer': 'woolworths', 'price': 3.00, 'on_sale': False},  # Same day duplicate
+            {'product_name': '', 'retailer': 'woolworths', 'price': 1.00}  # Missing name, skipped
+        ]
+        
+        assert log_price_data_bulk(rows) == 3
+        
+        stats = get_database_stats()
+        assert stats['price_history']['total_records'] == 2
+        
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT price, on_sale FROM price_history WHERE product_name = 'bulk milk 2l'")
+            row = cursor.fetchone()
+            
+            # Later rows in the batch replace earlier ones for the same day
+            assert row['price'] == 3.00
+            assert bool(row['on_sale']) is False
+        
+        assert log_price_data_bulk([]) == 0
+    
+    def test_bulk_rows_can_carry_their_own_date(self):
+        """Test that a row's date_recorded overrides the batch date."""
+        rows = [
+            {'product_name': 'Dated Milk', 'retailer': 'coles', 'price': 3.00, 'date_recorded': date(2024, 1, 1)},
+            {'product_name': 'Dated Milk', 'retailer': 'coles', 'price': 3.20},
+        ]
+        
+        assert log_price_data_bulk(rows, date_recorded=date(2024, 1, 2)) == 2
+        
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT date_recorded, price FROM price_history ORDER BY date_recorded")
+            assert [tuple(row) for row in cursor.fetchall()] == [('2024-01-01', 3.00), ('2024-01-02', 3.20)]
+    
+    def test_delete_product_history_reports_deleted_rows(self):
+        """Test that deleting a product reports how many rows went, or that none matched."""
+        log_price_data_bulk([
+            {'product_name': 'Gone Milk', 'retailer': 'coles', 'price': 3.00, 'date_recorded': date(2024, 1, 1)},
+            {'product_name': 'Gone Milk', 'retailer': 'coles', 'price': 3.10, 'date_recorded': date(2024, 1, 2)},
+            {'product_name': 'Gone Milk', 'retailer': 'woolworths', 'price': 3.20},
+        ])
+        
+        result = delete_product_history('Gone Milk', 'coles')
+        assert result['success'] is True
+        assert result['records_deleted'] == 2
+        assert get_database_stats()['price_history']['total_records'] == 1
+        
+        result = delete_product_history('Gone Milk', 'coles')
+        assert result['success'] is False
+        assert result['records_deleted'] == 0
+    
+    def test_add_to_favorites_ignores_duplicates(self):
+        """Test that a favorite is only added once per product and retailer."""
+        assert add_to_favorites('Fave Milk', 'coles') is True
+        assert add_to_favorites('Fave Milk', 'coles') is False
+        assert add_to_favorites('Fave Milk', 'woolworths') is True
+        
+        assert sorted(f['retailer'] for f in get_favorites()) == ['coles', 'woolworths']
+    
+    def test_latest_price_ignores_stale_rows(self):
+        """Test that carried-forward prices never become the source of another fallback."""
+        log_price_data('Stale Milk', 'woolworths', 3.20, on_sale=True, date_recorded=date(2024, 1, 1))
+        log_price_data('Stale Milk', 'woolworths', 3.20, on_sale=True, date_recorded=date(2024, 1, 2), stale=True)
+        
+        latest = get_latest_price('Stale Milk', 'woolworths')
+        assert latest['price'] == 3.20
+        assert latest['on_sale'] is True
+        assert latest['date_recorded'] == '2024-01-01'
+        
+        assert get_latest_price('Unknown Product', 'woolworths') is None
+
+    def test_iter_tracked_products_pages_through_every_product(self):
+        """Test that keyset pages cover the same products as the full listing."""
+        for name in ('Eggs', 'Apples', 'Milk', 'Bread'):
+            log_price_data(name, 'woolworths', 1.00)
+        log_price_data('Milk', 'coles', 1.10)
+        log_price_data('Milk', 'coles', 1.20, date_recorded=date(2024, 1, 1))
+        
+        pages = list(iter_tracked_products(page_size=2))
+        
+        assert [len(page) for page in pages] == [2, 2, 1]
+        keys = [(p['product_name'], p['retailer']) for page in pages for p in page]
+        assert keys == [('apples', 'woolworths'), ('bread', 'woolworths'), ('eggs', 'woolworths'),
+                        ('milk', 'coles'), ('milk', 'woolworths')]
+        assert sorted(keys) == sorted((p['product_name'], p['retailer']) for p in get_all_tracked_products())
+        assert pages[1][1]['record_count'] == 2
+        
+        # An exact multiple of the page size ends without an empty page
+        assert [len(page) for page in iter_tracked_products(page_size=5)] == [5]
+
+    def test_connections_use_wal_journaling(self):
+        """Test that connections are opened in WAL mode with relaxed syncing."""
+        with get_db_connection() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+            assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+
+    def test_mmap_only_for_large_databases(self):
+        """Test that memory-mapped I/O is enabled once the database passes the size threshold."""
+        import app.utils.database as db_module
+        with get_db_connection() as conn:
+            assert conn.execute("PRAGMA mmap_size").fetchone()[0] == 0
+        
+        with patch.object(db_module, '_database_size', return_value=db_module.SQLITE_MMAP_MIN_DB_SIZE):
+            conn = db_module._new_connection()
+        try:
+            assert conn.execute("PRAGMA mmap_size").fetchone()[0] == db_module.SQLITE_MMAP_SIZE
+        finally:
+            conn.close()
+
+    def test_connections_are_pooled(self):
+        """Test that a released connection is reused and left without open work."""
+        with get_db_connection() as conn:
+            first = conn
+            conn.execute("INSERT INTO favorites (product_name, retailer) VALUES ('uncommitted', 'woolworths')")
+        
+        with get_db_connection() as conn:
+            assert conn is first
+            assert not conn.in_transaction
+            assert conn.execute("SELECT COUNT(*) FROM favorites").fetchone()[0] == 0
+    
+    def test_pool_follows_db_path(self):
+        """Test that pointing DB_PATH at another file stops pooled connections being reused."""
+        import app.utils.database as db_module
+        with get_db_connection() as conn:
+            first = conn
+        
+        other_db = tempfile.NamedTemporaryFile(delete=False)
+        other_db.close()
+        try:
+            db_module.DB_PATH = other_db.name
+            with get_db_connection() as conn:
+                assert conn is not first
+                assert conn.execute("PRAGMA database_list").fetchone()['file'] == os.path.realpath(other_db.name)
+        finally:
+            db_module.DB_PATH = self.temp_db.name
+            os.unlink(other_db.name)
+
+
+    def test_schema_version_skips_repeat_initialization(self):
+        """Test that init_database records the schema version and then does nothing."""
+        import app.utils.database as db_module
+        with get_db_connection() as conn:
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == db_module.SCHEMA_VERSION
+        
+            conn.execute("DROP INDEX idx_alternatives_product_name")
+            conn.commit()
+        
+        init_database()
+        
+        # An up-to-date database is left alone, so the dropped index stays dropped
+        with get_db_connection() as conn:
+            indexes = {row['name'] for row in conn.execute("PRAGMA index_list(alternative_products)")}
+        assert 'idx_alternatives_product_name' not in indexes
+
+    def test_stale_column_added_to_old_databases(self):
+        """Test that a pre-versioning price_history table gains the stale column."""
+        with get_db_connection() as conn:
+            conn.execute("DROP TABLE price_history")
+            conn.execute("""
+                CREATE TABLE price_history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    product_name TEXT NOT NULL,
+                    retailer TEXT NOT NULL,
+                    price REAL,
+                    date_recorded DATE NOT NULL
+                )
+            """)
+            conn.execute("PRAGMA user_version = 0")
+            conn.commit()
+        
+        init_database()
+        
+        with get_db_connection() as conn:
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(price_history)")}
+        assert 'stale' in columns
+
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
\ No newline at end of file
@@ -0,0 +1,109 @@
+"""
+Tests for the in-memory admin session store.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import app.utils.auth as auth
+from app.utils.auth import (
+    authenticate_admin,
+    validate_admin_session,
+    logout_admin,
+    cleanup_expired_sessions,
+    get_active_sessions_count,
+    ADMIN_USERNAME,
+    ADMIN_PASSWORD,
+)
+
+
+@pytest.fixture(autouse=True)
+def memory_sessions(monkeypatch):
+    """Force memory storage and start each test with an empty session store."""
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    monkeypatch.setattr(auth, "_active_sessions", {})
+    monkeypatch.setattr(auth, "_sessions_view", {})
+
+
+def _expire(token):
+    """Backdate a session so it is past SESSION_TIMEOUT."""
+    auth._active_sessions[token]['expires_at'] = time.monotonic() - 1
+
+
+class TestAdminSessions:
+    """Test admin session lifecycle."""
+    
+    def test_login_validate_logout(self):
+        """Test the basic session lifecycle."""
+        token = authenticate_admin(ADMIN_USERNAME, ADMIN_PASSWORD)
+        assert token is not None
+        assert validate_admin_session(token) is True
+        
+        assert logout_admin(token) is True
+        assert validate_admin_session(token) is False
+        assert logout_admin(token) is False
+    
+    def test_bad_credentials(self):
+        """Test that wrong credentials don't create a session."""
+        assert authenticate_admin(ADMIN_USERNAME, "wrong") is None
+        assert get_active_sessions_count() == 0
+    
+    def test_expired_session_rejected(self):
+        """Test that an expired session is rejected and removed."""
+        token = authenticate_admin(ADMIN_USERNAME, ADMIN_PASSWORD)
+        _expire(token)
+        
+        assert validate_admin_session(token) is False
+        assert token not in auth._active_sessions
+        assert token not in auth._sessions_view
+    
+    def test_validate_slides_expiry(self):
+        """Test that a successful validation pushes the deadline forward."""
+        token = authenticate_admin(ADMIN_USERNAME, ADMIN_PASSWORD)
+        auth._active_sessions[token]['expires_at'] = time.monotonic() + 5
+        
+        assert validate_admin_session(token) is True
+        assert auth._active_sessions[token]['expires_at'] > time.monotonic() + 60
+    
+    def test_cleanup_removes_only_expired(self):
+        """Test that cleanup removes expired sessions and keeps live ones."""
+        live = authenticate_admin(ADMIN_USERNAME, ADMIN_PASSWORD)
+        stale = authenticate_admin(ADMIN_USERNAME, ADMIN_PASSWORD)
+        _expire(stale)
+        
+        cleanup_expired_sessions()
+        
+        assert get_active_sessions_count() == 1
+        assert validate_admin_session(live) is True
+    
+    def test_cleanup_bulk_expiry(self):
+        """Test that a mostly-expired store is rebuilt with only live sessions."""
+        live = authenticate_admin(ADMIN_USERNAME, ADMIN_PASSWORD)
+        for _ in range(5):
+            _expire(authenticate_admin(ADMIN_USERNAME, ADMIN_PASSWORD))
+        
+        cleanup_expired_sessions()
+        
+        assert list(auth._active_sessions) == [live]
+    
+    def test_concurrent_cleanup_and_login(self):
+        """Test that sweeping while other threads log in/out never raises."""
+        stop = threading.Event()
+        
+        def churn():
+            while not stop.is_set():
+                token = authenticate_admin(ADMIN_USERNAME, ADMIN_PASSWORD)
+                validate_admin_session(token)
+                logout_admin(token)
+        
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(churn) for _ in range(3)]
+            for _ in range(200):
+                cleanup_expired_sessions()
+            stop.set()
+            for future in futures:
+                future.result()
+        
+        assert get_active_sessions_count() == 0
@@ -7,7 +7,7 @@ from concurrent.futures import ThreadPoolExecutor
 from typing import List
 import pytest
 
-from app.utils.cache import TTLCache, get_cache, clear_cache
+from app.utils.cache import TTLCache, get_cache, clear_cache, NEGATIVE_RESULT
 
 
 class TestTTLCache:
@@ -83,6 +83,20 @@ class TestTTLCache:
         result = cache.get("woolworths", "milk", "2000")
         assert result is None
     
+    def test_negative_caching(self):
+        """Test that known misses are cached with their own short TTL."""
+        cache = TTLCache(default_ttl_seconds=60)
+        
+        cache.put_negative("woolworths", "unobtainium", "2000", ttl_seconds=1)
+        
+        # Known miss is distinguishable from a plain cache miss
+        assert cache.get("woolworths", "unobtainium", "2000") is NEGATIVE_RESULT
+        assert cache.get("woolworths", "milk", "2000") is None
+        
+        # Negative entry expires independently of the default TTL
+        time.sleep(1.5)
+        assert cache.get("woolworths", "unobtainium", "2000") is None
+    
     def test_lru_eviction(self):
         """Test LRU eviction when cache exceeds max size."""
         cache = TTLCache(max_size=3, default_ttl_seconds=60)
@@ -129,13 +143,15 @@ class TestTTLCache:
     
     def test_cache_statistics(self):
         """Test cache statistics reporting."""
-        cache = TTLCache(max_size=100, default_ttl_seconds=60)
+        cache = TTLCache(max_size=2, default_ttl_seconds=60)
         
         # Empty cache stats
         stats = cache.stats()
         assert stats["size"] == 0
-        assert stats["max_size"] == 100
-        assert stats["expired_items"] == 0
+        assert stats["max_size"] == 2
+        assert stats["inserts"] == 0
+        assert stats["evictions"] == 0
+        assert stats["expired_evictions"] == 0
         assert stats["default_ttl_seconds"] == 60
         
         # Add some items
@@ -144,14 +160,20 @@ class TestTTLCache:
         
         stats = cache.stats()
         assert stats["size"] == 2
-        assert stats["expired_items"] == 0
+        assert stats["inserts"] == 2
         
-        # Add expired item with negative TTL to ensure immediate expiration
+        # Overflowing max_size counts as an LRU eviction
+        cache.put("woolworths", "item3", "2000", "data3")
+        stats = cache.stats()
+        assert stats["size"] == 2
+        assert stats["evictions"] == 1
+        
+        # Expired item is counted once it is dropped on access
         cache.put("woolworths", "expired", "2000", "expired_data", ttl_seconds=-1)
+        assert cache.get("woolworths", "expired", "2000") is None
         
         stats = cache.stats()
-        assert stats["size"] == 3
-        assert stats["expired_items"] == 1
+        assert stats["expired_evictions"] == 1
     
     def test_cache_clear(self):
         """Test cache clearing functionality."""
@@ -280,6 +302,11 @@ class TestCacheIntegration:
         
         assert cache.get("woolworths", "milk", "2000") == "woolworths_data"
         assert cache.get("woolworths", "bread", "2000") == "bread_data"
+        
+        # Retailers without a numeric id still get their own keys
+        cache.put("test_retailer", "milk", "2000", "test_data")
+        assert cache.get("test_retailer", "milk", "2000") == "test_data"
+        assert cache.get("woolworths", "milk", "2000") == "woolworths_data"
 
 
 class TestCacheEdgeCases:
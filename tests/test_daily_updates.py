@@ -0,0 +1,651 @@
+"""
+Tests for the daily price updater.
+"""
+import asyncio
+import time
+import pytest
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from app.utils.daily_updates import DailyPriceUpdater, PriceRow, BatchStats, retry_async, _extract_search_term, _missing_cache
+
+
+_real_sleep = asyncio.sleep
+
+
+async def _no_sleep(delay, *args, **kwargs):
+    """Stand-in for the updater's politeness delays; still yields to the loop."""
+    await _real_sleep(0)
+
+
+def _tracked(count):
+    return [{'product_name': f'product {i}', 'retailer': 'woolworths'} for i in range(count)]
+
+
+class TestConcurrentUpdates:
+    """Test concurrent per-product processing."""
+
+    @pytest.fixture
+    def updater(self):
+        """Updater with API delays stubbed out and no price history to fall back on."""
+        _missing_cache.clear()
+        with patch('app.utils.daily_updates.asyncio.sleep', _no_sleep), \
+             patch('app.utils.daily_updates.get_latest_price', return_value=None):
+            yield DailyPriceUpdater()
+
+    @pytest.mark.asyncio
+    async def test_products_fetched_concurrently(self, updater):
+        """Test that in-flight requests overlap but stay within max_concurrency."""
+        updater.max_concurrency = 3
+        in_flight = 0
+        peak = 0
+
+        async def fake_price(product_name, retailer):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await _real_sleep(0.01)
+            in_flight -= 1
+            return PriceRow(product_name, retailer, 1.0)
+
+        with patch.object(updater, '_get_current_price_data', side_effect=fake_price), \
+             patch('app.utils.daily_updates.iter_tracked_products', return_value=[_tracked(10)]), \
+             patch('app.utils.daily_updates.log_price_data_bulk', side_effect=len) as bulk:
+            result = await updater.update_all_products(batch_size=10)
+
+        assert result['success'] is True
+        assert result['stats']['successful_updates'] == 10
+        assert result['stats']['new_records'] == 10
+        assert peak == 3
+        # The whole batch is written with one bulk call
+        bulk.assert_called_once()
+        assert len(bulk.call_args.args[0]) == 10
+
+    @pytest.mark.asyncio
+    async def test_progress_reports_are_coalesced(self, updater):
+        """Test that a burst of completions is reported once up front and once at the end."""
+        reports = []
+
+        async def fake_price(product_name, retailer):
+            return PriceRow(product_name, retailer, 1.0)
+
+        with patch.object(updater, '_get_current_price_data', side_effect=fake_price), \
+             patch('app.utils.daily_updates.iter_tracked_products', return_value=[_tracked(10)]), \
+             patch('app.utils.daily_updates.log_price_data_bulk', side_effect=len):
+            await updater.update_all_products(batch_size=10, progress_callback=lambda *args: reports.append(args))
+
+        assert [report[0] for report in reports] == [1, 10]
+
+    @pytest.mark.asyncio
+    async def test_products_split_into_batches(self, updater):
+        """Test that products are written batch by batch and max_batches is honoured."""
+        async def fake_price(product_name, retailer):
+            return PriceRow(product_name, retailer, 1.0)
+
+        with patch.object(updater, '_get_current_price_data', side_effect=fake_price), \
+             patch('app.utils.daily_updates.iter_tracked_products', return_value=[_tracked(10)]), \
+             patch('app.utils.daily_updates.log_price_data_bulk', side_effect=len) as bulk:
+            result = await updater.update_all_products(batch_size=4)
+            assert [len(call.args[0]) for call in bulk.call_args_list] == [4, 4, 2]
+            assert result['stats']['products_processed'] == 10
+
+            bulk.reset_mock()
+            result = await updater.update_all_products(batch_size=4, max_batches=2)
+            assert [len(call.args[0]) for call in bulk.call_args_list] == [4, 4]
+            assert result['stats']['batches_processed'] == 2
+
+    @pytest.mark.asyncio
+    async def test_next_batch_fetches_while_previous_batch_writes(self, updater):
+        """Test that batch writes overlap with fetching the following batch."""
+        events = []
+
+        async def fake_price(product_name, retailer):
+            events.append(('fetch', product_name))
+            return PriceRow(product_name, retailer, 1.0)
+
+        def slow_bulk(rows):
+            events.append(('write_start', len(rows)))
+            time.sleep(0.05)
+            events.append(('write_end', len(rows)))
+            return len(rows)
+
+        with patch.object(updater, '_get_current_price_data', side_effect=fake_price), \
+             patch('app.utils.daily_updates.iter_tracked_products', return_value=[_tracked(4)]), \
+             patch('app.utils.daily_updates.log_price_data_bulk', side_effect=slow_bulk):
+            result = await updater.update_all_products(batch_size=2)
+
+        # Without pipelining the next fetch would only start after the write ended
+        assert events.index(('fetch', 'product 2')) < events.index(('write_end', 2))
+        assert result['stats']['successful_updates'] == 4
+
+    @pytest.mark.asyncio
+    async def test_duplicate_products_searched_once(self, updater):
+        """Test that repeated (name, retailer) rows only trigger one search."""
+        tracked = _tracked(3) + _tracked(2) + [{'product_name': 'product 0', 'retailer': 'coles'}]
+
+        async def fake_price(product_name, retailer):
+            return PriceRow(product_name, retailer, 1.0)
+
+        with patch.object(updater, '_get_current_price_data', side_effect=fake_price) as fetch, \
+             patch('app.utils.daily_updates.iter_tracked_products', return_value=[tracked]), \
+             patch('app.utils.daily_updates.log_price_data_bulk', side_effect=len):
+            result = await updater.update_all_products(batch_size=10)
+
+        assert fetch.call_count == 4
+        assert result['stats']['total_products_in_db'] == 6
+        assert result['stats']['duplicates_skipped'] == 2
+        assert result['stats']['api_calls'] == 4
+
+    @pytest.mark.asyncio
+    async def test_products_sharing_a_search_term_are_batched_together(self, updater):
+        """Test that products are ordered by retailer and search term before batching."""
+        tracked = [
+            {'product_name': 'full cream milk 2l', 'retailer': 'woolworths'},
+            {'product_name': 'white bread 700g', 'retailer': 'woolworths'},
+            {'product_name': 'full cream milk 3l', 'retailer': 'woolworths'},
+            {'product_name': 'white bread 650g', 'retailer': 'woolworths'},
+        ]
+        batches = []
+
+        async def fake_fetch(lanes, progress, batch_products, *args, **kwargs):
+            batches.append([p.name for p in batch_products])
+            return BatchStats(), []
+
+        with patch.object(updater, '_fetch_batch', side_effect=fake_fetch), \
+             patch('app.utils.daily_updates.iter_tracked_products', return_value=[tracked]), \
+             patch('app.utils.daily_updates.log_price_data_bulk', side_effect=len):
+            await updater.update_all_products(batch_size=2)
+
+        assert batches == [
+            ['full cream milk 2l', 'full cream milk 3l'],
+            ['white bread 700g', 'white bread 650g'],
+        ]
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_write_counts_as_failures(self, updater):
+        """Test that a batch whose bulk write keeps failing is reported as failed."""
+        async def fake_price(product_name, retailer):
+            return PriceRow(product_name, retailer, 1.0)
+
+        with patch.object(updater, '_get_current_price_data', side_effect=fake_price), \
+             patch('app.utils.daily_updates.iter_tracked_products', return_value=[_tracked(4)]), \
+             patch('app.utils.daily_updates.log_price_data_bulk', return_value=0) as bulk:
+            result = await updater.update_all_products(batch_size=4)
+
+        assert bulk.call_count == 3
+        assert result['stats']['successful_updates'] == 0
+        assert result['stats']['failed_updates'] == 4
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_breaker_skips_products(self, updater):
+        """Test that consecutive API failures open the breaker and later products are skipped."""
+        updater.circuit_breaker_threshold = 3
+        updater.max_concurrency = 1
+
+        async def no_price(product_name, retailer):
+            return None
+
+        with patch.object(updater, '_get_current_price_data', side_effect=no_price) as fetch, \
+             patch('app.utils.daily_updates.iter_tracked_products', return_value=[_tracked(10)]), \
+             patch('app.utils.daily_updates.log_price_data_bulk', side_effect=len):
+            result = await updater.update_all_products(batch_size=10)
+
+        assert fetch.call_count == 3
+        assert result['stats']['circuit_breaker_triggered'] is True
+        assert result['stats']['products_processed'] == 10
+        assert result['stats']['failed_updates'] == 10
+        assert result['stats']['skipped_updates'] == 7
+
+    @pytest.mark.asyncio
+    async def test_worker_error_does_not_abort_batch(self, updater):
+        """Test that an unexpected error in one product's worker only fails that product."""
+        async def fake_price(product_name, retailer):
+            if product_name == 'product 1':
+                return None
+            return PriceRow(product_name, retailer, 1.0)
+
+        bad_history = {'price': 1.0, 'was_price': None, 'on_sale': False, 'url': None, 'date_recorded': 'not a date'}
+
+        with patch.object(updater, '_get_current_price_data', side_effect=fake_price), \
+             patch('app.utils.daily_updates.iter_tracked_products', return_value=[_tracked(4)]), \
+             patch('app.utils.daily_updates.get_latest_price', return_value=bad_history), \
+             patch('app.utils.daily_updates.log_price_data_bulk', side_effect=len):
+            result = await updater.update_all_products(batch_size=4)
+
+        assert result['success'] is True
+        assert result['stats']['successful_updates'] == 3
+        assert result['stats']['failed_updates'] == 1
+
+    @pytest.mark.asyncio
+    async def test_failing_retailer_does_not_trip_others(self, updater):
+        """Test that each retailer runs in its own lane with its own breaker."""
+        updater.circuit_breaker_threshold = 2
+        updater.max_concurrency = 1
+        tracked = [{'product_name': f'product {i}', 'retailer': 'coles'} for i in range(4)] + _tracked(4)
+
+        async def fake_price(product_name, retailer):
+            if retailer == 'coles':
+                return None
+            return PriceRow(product_name, retailer, 1.0)
+
+        with patch.object(updater, '_get_current_price_data', side_effect=fake_price), \
+             patch('app.utils.daily_updates.iter_tracked_products', return_value=[tracked]), \
+             patch('app.utils.daily_updates.log_price_data_bulk', side_effect=len):
+            result = await updater.update_all_products(batch_size=10)
+
+        assert result['stats']['circuit_breaker_triggered'] is True
+        assert result['stats']['successful_updates'] == 4
+        assert result['stats']['skipped_updates'] == 2
+
+    @pytest.mark.asyncio
+    async def test_smart_update_writes_in_background(self, updater):
+        """Test that smart updates hand rows to the bulk writer and wait for the outcome."""
+        async def fake_price(product_name, retailer):
+            return PriceRow(product_name, retailer, 2.5)
+
+        with patch.object(updater, '_get_current_price_data', side_effect=fake_price), \
+             patch('app.utils.daily_updates.get_products_missing_todays_price', return_value=_tracked(4)), \
+             patch('app.utils.daily_updates.log_price_data', return_value=True) as single, \
+             patch('app.utils.daily_updates.log_price_data_bulk', side_effect=len) as bulk:
+            result = await updater.smart_daily_update()
+
+        single.assert_not_called()
+        assert sum(len(call.args[0]) for call in bulk.call_args_list) == 4
+        assert result['stats']['successful_updates'] == 4
+        assert result['stats']['products_processed'] == 4
+
+    @pytest.mark.asyncio
+    async def test_smart_update_counts_db_failures(self, updater):
+        """Test that failed database writes are reported as failed updates."""
+        async def fake_price(product_name, retailer):
+            return PriceRow(product_name, retailer, 2.5)
+
+        with patch.object(updater, '_get_current_price_data', side_effect=fake_price), \
+             patch('app.utils.daily_updates.get_products_missing_todays_price', return_value=_tracked(4)), \
+             patch('app.utils.daily_updates.log_price_data_bulk', return_value=0):
+            result = await updater.smart_daily_update()
+
+        assert result['stats']['successful_updates'] == 0
+        assert result['stats']['failed_updates'] == 4
+        assert result['stats']['products_processed'] == 4
+
+    @pytest.mark.asyncio
+    async def test_aclose_drains_queued_writes(self, updater):
+        """Test that closing the updater waits for rows still queued for writing."""
+        with patch('app.utils.daily_updates.log_price_data_bulk', side_effect=len) as bulk:
+            written = await updater._enqueue_price(PriceRow('milk', 'woolworths', 3.1))
+            await updater.aclose()
+
+        assert written.result() is True
+        bulk.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_partial_write_resolved_per_row(self, updater):
+        """Test rows the bulk write skipped are reported as failed, the rest as stored."""
+        def store_complete_rows(records):
+            return sum(1 for record in records if record['product_name'] and record['retailer'])
+
+        with patch('app.utils.daily_updates.log_price_data_bulk', side_effect=store_complete_rows):
+            stored = await updater._enqueue_price(PriceRow('milk', 'woolworths', 3.1))
+            skipped = await updater._enqueue_price(PriceRow('bread', '', 2.5))
+            await updater.aclose()
+
+        assert stored.result() is True
+        assert skipped.result() is False
+
+    @pytest.mark.asyncio
+    async def test_unexplained_short_write_reported_as_failed(self, updater):
+        """Test a stored count that doesn't match the storable rows fails the whole group."""
+        with patch('app.utils.daily_updates.log_price_data_bulk', return_value=1):
+            first = await updater._enqueue_price(PriceRow('milk', 'woolworths', 3.1))
+            second = await updater._enqueue_price(PriceRow('bread', 'woolworths', 2.5))
+            await updater.aclose()
+
+        assert first.result() is False
+        assert second.result() is False
+
+    @pytest.mark.asyncio
+    async def test_failed_fetch_falls_back_to_recent_price(self, updater):
+        """Test that a recent live price is carried forward, flagged stale, when the API fails."""
+        last_prices = {
+            'product 0': {'price': 4.5, 'was_price': None, 'on_sale': False, 'url': None,
+                          'date_recorded': (date.today() - timedelta(days=1)).isoformat()},
+            'product 1': {'price': 1.0, 'was_price': None, 'on_sale': False, 'url': None,
+                          'date_recorded': (date.today() - timedelta(days=8)).isoformat()},
+        }
+
+        async def no_price(product_name, retailer):
+            return None
+
+        with patch.object(updater, '_get_current_price_data', side_effect=no_price), \
+             patch('app.utils.daily_updates.iter_tracked_products', return_value=[_tracked(3)]), \
+             patch('app.utils.daily_updates.get_latest_price', side_effect=lambda name, retailer: last_prices.get(name)), \
+             patch('app.utils.daily_updates.log_price_data_bulk', side_effect=len) as bulk:
+            result = await updater.update_all_products(batch_size=10)
+
+        rows = bulk.call_args.args[0]
+        assert [(row['product_name'], row['price'], row['stale']) for row in rows] == [('product 0', 4.5, True)]
+        assert result['stats']['stale_records'] == 1
+        assert result['stats']['successful_updates'] == 1
+        assert result['stats']['failed_updates'] == 2
+
+    @pytest.mark.asyncio
+    async def test_stale_fallbacks_do_not_count_as_fetched(self, updater):
+        """Test a batch answered mostly from stale prices still gets the longest cooldown."""
+        yesterday = {'price': 4.5, 'was_price': None, 'on_sale': False, 'url': None,
+                     'date_recorded': (date.today() - timedelta(days=1)).isoformat()}
+        delays = []
+
+        async def record_sleep(delay, *args, **kwargs):
+            delays.append(delay)
+            await _real_sleep(0)
+
+        async def mostly_down(product_name, retailer):
+            return PriceRow(product_name, retailer, 1.0) if product_name == 'product 0' else None
+
+        with patch('app.utils.daily_updates.asyncio.sleep', record_sleep), \
+             patch.object(updater, '_get_current_price_data', side_effect=mostly_down), \
+             patch('app.utils.daily_updates.iter_tracked_products', return_value=[_tracked(10)]), \
+             patch('app.utils.daily_updates.get_latest_price', return_value=yesterday), \
+             patch('app.utils.daily_updates.log_price_data_bulk', side_effect=len):
+            result = await updater.update_all_products(batch_size=5)
+
+        assert result['stats']['stale_records'] >= 4
+        assert 15.0 in delays
+        assert 5.0 not in delays
+
+
+class TestMissingProductsCache:
+    """Test reuse of the smart update's missing-products query."""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        _missing_cache.clear()
+        yield
+        _missing_cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_repeated_smart_updates_reuse_query(self):
+        """Test that a rerun within the TTL skips the query and the products already updated."""
+        updater = DailyPriceUpdater()
+
+        async def fake_price(product_name, retailer):
+            if product_name == 'product 0':
+                return None
+            return PriceRow(product_name, retailer, 1.0)
+
+        with patch('app.utils.daily_updates.asyncio.sleep', _no_sleep), \
+             patch('app.utils.daily_updates.get_latest_price', return_value=None), \
+             patch.object(updater, '_get_current_price_data', side_effect=fake_price) as fetch, \
+             patch('app.utils.daily_updates.get_products_missing_todays_price', return_value=_tracked(3)) as query, \
+             patch('app.utils.daily_updates.log_price_data_bulk', side_effect=len):
+            await updater.smart_daily_update()
+            fetch.reset_mock()
+            result = await updater.smart_daily_update()
+
+        query.assert_called_once()
+        # Only the product that failed the first time is retried
+        assert [call.args[0] for call in fetch.call_args_list] == ['product 0']
+        assert result['stats']['total_products_missing'] == 1
+
+
+class TestBatchStats:
+    """Test the slotted result containers."""
+
+    def test_merge_adds_counters(self):
+        """Test that merging a batch accumulates every counter."""
+        totals = BatchStats(successful=2, failed=1)
+        totals.merge(BatchStats(successful=3, new_records=3, skipped=1, stale=2))
+
+        assert totals == BatchStats(successful=5, failed=1, new_records=3, skipped=1, stale=2)
+
+    def test_price_row_has_no_instance_dict(self):
+        """Test that PriceRow uses slots rather than a per-instance dict."""
+        row = PriceRow('milk', 'woolworths', 3.1)
+
+        assert not hasattr(row, '__dict__')
+        assert row.on_sale is False and row.stale is False
+
+
+class TestSearchCache:
+    """Test the per-run search result cache."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_search_terms_hit_cache(self):
+        """Test that names reducing to the same search term share one search."""
+        updater = DailyPriceUpdater()
+
+        with patch.object(updater.woolworths, 'search', return_value=[]) as search:
+            await updater._get_current_price_data("woolworths full cream milk 2l", "woolworths")
+            await updater._get_current_price_data("full cream milk 2l dummy", "woolworths")
+            await updater._get_current_price_data("skim milk 2l", "woolworths")
+
+        assert search.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_searches_are_coalesced(self):
+        """Test that workers asking for the same term at once share one request."""
+        updater = DailyPriceUpdater()
+        calls = 0
+
+        async def slow_search(term, postcode):
+            nonlocal calls
+            calls += 1
+            await _real_sleep(0.01)
+            return ["result"]
+
+        with patch.object(updater.woolworths, 'search', side_effect=slow_search):
+            results = await asyncio.gather(*(
+                updater._search("woolworths", updater.woolworths, "milk", "2000") for _ in range(5)
+            ))
+
+        assert calls == 1
+        assert results == [["result"]] * 5
+        assert updater._inflight_searches == {}
+
+    @pytest.mark.asyncio
+    async def test_failed_search_is_not_cached(self):
+        """Test that a failing search reaches every waiter and is retried next time."""
+        updater = DailyPriceUpdater()
+
+        with patch.object(updater.woolworths, 'search', side_effect=RuntimeError("boom")):
+            results = await asyncio.gather(
+                updater._search("woolworths", updater.woolworths, "milk", "2000"),
+                updater._search("woolworths", updater.woolworths, "milk", "2000"),
+                return_exceptions=True,
+            )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert updater._search_cache == {}
+        assert updater._inflight_searches == {}
+
+    @pytest.mark.asyncio
+    async def test_cache_is_bounded(self):
+        """Test that the least recently used entry is evicted at capacity."""
+        updater = DailyPriceUpdater()
+
+        with patch('app.utils.daily_updates.SEARCH_CACHE_MAX_SIZE', 2), \
+             patch.object(updater.woolworths, 'search', return_value=[]):
+            for term in ("milk", "bread", "eggs"):
+                await updater._search("woolworths", updater.woolworths, term, "2000")
+
+        assert list(updater._search_cache) == [("woolworths", "bread", "2000"), ("woolworths", "eggs", "2000")]
+
+
+class TestAdaptiveTimeout:
+    """Test the p95-based per-product timeout."""
+
+    @pytest.mark.asyncio
+    async def test_only_real_searches_sampled(self):
+        """Test cache hits and coalesced waits don't add latency samples."""
+        updater = DailyPriceUpdater()
+
+        async def slow_search(term, postcode):
+            await _real_sleep(0.01)
+            return ["result"]
+
+        with patch.object(updater.woolworths, 'search', side_effect=slow_search):
+            await asyncio.gather(*(
+                updater._search("woolworths", updater.woolworths, "milk", "2000") for _ in range(5)
+            ))
+            await updater._search("woolworths", updater.woolworths, "milk", "2000")
+
+        assert len(updater._latencies) == 1
+        assert updater._latencies[0] >= 0.01
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_wait_not_timed(self):
+        """Test time spent waiting for a token-bucket slot doesn't count towards the timeout."""
+        updater = DailyPriceUpdater()
+
+        class SlowLimiter:
+            async def __aenter__(self):
+                await _real_sleep(0.05)
+
+            async def __aexit__(self, *exc_info):
+                return False
+
+        updater._limiters["woolworths"] = SlowLimiter()
+        with patch.object(updater, '_current_timeout', return_value=0.02), \
+             patch.object(updater.woolworths, 'search', return_value=["result"]):
+            assert await updater._search("woolworths", updater.woolworths, "milk", "2000") == ["result"]
+
+    @pytest.mark.asyncio
+    async def test_slow_search_reported_as_timeout(self):
+        """Test a retailer request over the timeout marks the product as timed out."""
+        updater = DailyPriceUpdater()
+
+        async def slow_search(term, postcode):
+            await _real_sleep(1)
+
+        with patch.object(updater, '_current_timeout', return_value=0.01), \
+             patch.object(updater.woolworths, 'search', side_effect=slow_search):
+            result = await updater._process_one(
+                updater._new_circuit_breaker(5), ("full cream milk 2l", "woolworths"), 1, 1
+            )
+
+        assert result == {"product_name": "full cream milk 2l", "status": "timeout"}
+        assert len(updater._latencies) == 0
+
+    def test_default_until_enough_samples(self):
+        """Test the default timeout is used before 20 latencies are recorded."""
+        updater = DailyPriceUpdater()
+        updater._latencies.extend([0.3] * 19)
+
+        assert updater._current_timeout() == 10.0
+
+    def test_tracks_p95_latency(self):
+        """Test the timeout follows 1.5x the p95 latency within its bounds."""
+        updater = DailyPriceUpdater()
+
+        updater._latencies.extend([1.0] * 95 + [4.0] * 5)
+        assert updater._current_timeout() == pytest.approx(6.0, abs=0.5)
+
+        updater._latencies.clear()
+        updater._latencies.extend([0.1] * 50)
+        assert updater._current_timeout() == 2.0
+
+        updater._latencies.clear()
+        updater._latencies.extend([60.0] * 50)
+        assert updater._current_timeout() == 30.0
+
+
+class TestRetryAsync:
+    """Test the backoff + jitter retry helper."""
+
+    @pytest.mark.asyncio
+    async def test_retries_until_truthy(self):
+        """Test that falsy results and retryable errors are retried with growing delays."""
+        results = iter([False, ValueError("locked"), True])
+        delays = []
+
+        async def attempt():
+            result = next(results)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        async def record_sleep(delay):
+            delays.append(delay)
+
+        with patch('app.utils.daily_updates.asyncio.sleep', record_sleep):
+            result = await retry_async(attempt, tries=3, base=0.25, jitter=0.5)
+
+        assert result is True
+        assert len(delays) == 2
+        assert 0.25 <= delays[0] <= 0.375
+        assert 0.5 <= delays[1] <= 0.75
+
+    @pytest.mark.asyncio
+    async def test_unretryable_error_fails_fast(self):
+        """Test that exceptions outside retry_on are raised on the first attempt."""
+        calls = 0
+
+        async def attempt():
+            nonlocal calls
+            calls += 1
+            raise TypeError("bad row")
+
+        with pytest.raises(TypeError):
+            await retry_async(attempt, tries=3, retry_on=(ValueError,))
+
+        assert calls == 1
+
+    @pytest.mark.asyncio
+    async def test_returns_last_result_when_exhausted(self):
+        """Test that a falsy result is returned once all attempts are used."""
+        async def attempt():
+            return False
+
+        with patch('app.utils.daily_updates.asyncio.sleep', _no_sleep):
+            assert await retry_async(attempt, tries=2) is False
+
+
+class TestExtractSearchTerm:
+    """Test search term extraction from stored product names."""
+
+    @pytest.mark.parametrize("product_name,expected", [
+        ("woolworths full cream milk 3l dummy", "full cream milk"),
+        ("cc's corn chips taco 175g", "corn chips taco"),
+        ("Coca Cola No Sugar 1.25L", "no sugar"),
+        ("bananas 1 kg", "bananas kg"),
+        ("woolworths 2l", "2l"),
+        ("wonderwhite bread 700g", "wonderwhite bread"),
+    ])
+    def test_extracts_search_term(self, product_name, expected):
+        """Test brand prefixes, sizes and standalone numbers are dropped."""
+        assert _extract_search_term(product_name) == expected
+
+    def test_repeated_names_are_memoized(self):
+        """Test that a repeated product name is served from the cache."""
+        _extract_search_term.cache_clear()
+        _extract_search_term("kettle sea salt chips 175g")
+        _extract_search_term("kettle sea salt chips 175g")
+
+        assert _extract_search_term.cache_info().hits == 1
+
+    @pytest.mark.asyncio
+    async def test_full_run_derives_each_term_once(self):
+        """Test update_all_products precomputes terms that the fetches then reuse."""
+        updater = DailyPriceUpdater()
+        tracked = [{'product_name': f'woolworths item {i} 2l', 'retailer': 'woolworths'} for i in range(3)]
+
+        async def fake_price(product_name, retailer):
+            updater._extract_search_term(product_name)
+            return None
+
+        with patch('app.utils.daily_updates._extract_search_term', wraps=_extract_search_term) as extract, \
+             patch('app.utils.daily_updates.asyncio.sleep', _no_sleep), \
+             patch('app.utils.daily_updates.get_latest_price', return_value=None), \
+             patch.object(updater, '_get_current_price_data', side_effect=fake_price), \
+             patch('app.utils.daily_updates.iter_tracked_products', return_value=[tracked]), \
+             patch('app.utils.daily_updates.log_price_data_bulk', side_effect=len):
+            await updater.update_all_products(batch_size=10)
+
+        assert extract.call_count == 3
+        assert updater._search_terms['woolworths item 1 2l'] == 'item'
+
+    def test_method_delegates_to_module_function(self):
+        """Test the updater method returns the same term."""
+        updater = DailyPriceUpdater()
+        assert updater._extract_search_term("pepsi max 10 pack") == "max pack"
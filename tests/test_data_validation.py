@@ -0,0 +1,187 @@
+"""
+Tests for scraped product data validation.
+"""
+
+import logging
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from app.models import ProductResult
+from app.utils.data_validation import ProductDataValidator, validate_scraped_products
+
+
+@pytest.fixture
+def validator():
+    return ProductDataValidator()
+
+
+def _issue_types(issues):
+    return [issue.issue_type for issue in issues]
+
+
+class TestValidateProductName:
+    """Test product name validation."""
+    
+    def test_clean_grocery_name(self, validator):
+        """Test a normal product name has no issues."""
+        assert validator.validate_product_name("Woolworths Full Cream Milk 2L") == []
+    
+    def test_suspicious_patterns(self, validator):
+        """Test HTML, script and placeholder content is flagged."""
+        issues = validator.validate_product_name("<b>Milk</b> javascript:alert")
+        messages = [issue.message for issue in issues if issue.issue_type == "suspicious_content"]
+        
+        assert any("<[^>]+>" in message for message in messages)
+        assert any("javascript:" in message for message in messages)
+        assert "suspicious_content" in _issue_types(validator.validate_product_name("SAMPLE bread"))
+    
+    def test_overlapping_patterns_each_reported(self, validator):
+        """Test a tag is reported both as HTML and as unusual characters."""
+        issues = validator.validate_product_name("<b>Milk</b>")
+        
+        assert _issue_types(issues).count("suspicious_content") == 2
+    
+    def test_plain_names_skip_the_regex(self, validator):
+        """Test only names that could hold suspicious content reach the pattern scan."""
+        validator._any_suspicious = MagicMock(wraps=validator._any_suspicious)
+        
+        validator.validate_product_name("Woolworths Full Cream Milk 2L")
+        validator._any_suspicious.search.assert_not_called()
+        
+        for name in ("Milk: 2L", "Crème Fraîche", "Test Kitchen Bread"):
+            validator.validate_product_name(name)
+        assert validator._any_suspicious.search.call_count == 3
+    
+    def test_non_grocery_name(self, validator):
+        """Test names without grocery terms are flagged as unlikely products."""
+        assert "unlikely_product" in _issue_types(validator.validate_product_name("Garden Hose 20m"))
+    
+    def test_grocery_terms_match_inside_words(self, validator):
+        """Test keywords are found as substrings, in any case."""
+        assert validator.validate_product_name("Strawberry MILKSHAKE") == []
+        assert validator.validate_product_name("Sparkling Mineral Water") == []
+
+    
+    def test_repeated_words(self, validator):
+        """Test a meaningful word appearing three or more times is flagged."""
+        issues = validator.validate_product_name("Milk Milk Milk Bread")
+        
+        assert [issue.message for issue in issues] == ["Repeated words detected: ['milk']"]
+        # Short words and words seen only twice are ignored
+        assert validator.validate_product_name("a a a Milk Milk 2L") == []
+
+
+class TestValidatePrice:
+    """Test price validation."""
+    
+    def test_valid_prices(self, validator):
+        """Test whole-cent prices pass, including float sums."""
+        assert validator.validate_price(3.5) == []
+        assert validator.validate_price(0.1 + 0.2) == []
+        assert validator.validate_price(4, was_price=5.99) == []
+    
+    def test_too_many_decimal_places(self, validator):
+        """Test fractional-cent prices are flagged."""
+        assert _issue_types(validator.validate_price(2.675)) == ["invalid_precision"]
+    
+    def test_non_finite_prices(self, validator):
+        """Test NaN and infinity are reported as invalid rather than raising."""
+        assert "invalid_format" in _issue_types(validator.validate_price(float("nan")))
+        assert "invalid_format" in _issue_types(validator.validate_price(float("inf")))
+
+
+class TestValidateUrl:
+    """Test product URL validation."""
+    
+    def test_valid_and_invalid_urls(self, validator):
+        """Test URL format and retailer domain checks."""
+        assert validator.validate_url("https://www.woolworths.com.au/shop/productdetails/1", "woolworths") == []
+        assert _issue_types(validator.validate_url("not a url", "woolworths")) == ["invalid_format"]
+        assert _issue_types(validator.validate_url("https://www.coles.com.au/p/1", "woolworths")) == ["mismatched_retailer"]
+
+
+class TestValidatePromoData:
+    """Test promotional data validation."""
+    
+    def test_html_in_promo_text(self, validator):
+        """Test HTML in promo text is flagged."""
+        issues = validator.validate_promo_data("<span>Half price</span>", True, 2.0, 4.0)
+        assert _issue_types(issues) == ["contains_html"]
+
+
+class TestValidateBatch:
+    """Test pass/fail batch validation."""
+    
+    PRODUCTS = [
+        ProductResult(name="Woolworths Full Cream Milk 2L", price=3.10, retailer="woolworths",
+                      url="https://www.woolworths.com.au/shop/productdetails/1"),
+        ProductResult(name="  White Bread 700g ", price=2.50, was=3.00, promoFlag=True, retailer="coles",
+                      url=" https://www.coles.com.au/p/2 "),
+        ProductResult(name="Garden Hose 20m", price=25.0, retailer="woolworths", url="not a url"),
+        ProductResult(name="Cheese Block 500g", price=-1.0, retailer="coles"),
+        ProductResult(name="<b>Milk</b>", price=float("nan"), retailer="woolworths"),
+    ]
+    
+    @pytest.mark.parametrize("min_quality_score", [0.0, 0.6, 0.8, 1.0])
+    def test_matches_validate_product(self, validator, min_quality_score):
+        """Test batch verdicts and cleaned output agree with per-product validation."""
+        expected = []
+        for product in self.PRODUCTS:
+            result = validator.validate_product(product)
+            passed = result.is_valid and result.quality_score >= min_quality_score
+            expected.append(result.validated_product if passed else None)
+        
+        assert validator.validate_batch(self.PRODUCTS, min_quality_score) == expected
+    
+    def test_stops_checking_after_an_error(self, validator):
+        """Test later fields are not validated once a product has an error."""
+        with patch.object(validator, 'validate_url', wraps=validator.validate_url) as validate_url:
+            assert validator.validate_batch([self.PRODUCTS[4]]) == [None]
+        
+        validate_url.assert_not_called()
+
+
+class TestValidateScrapedProducts:
+    """Test filtering of scraped products."""
+    
+    def test_products_with_errors_are_warned_about(self, caplog):
+        """Test each product rejected for an error logs a warning, low-quality ones don't."""
+        products = TestValidateBatch.PRODUCTS
+        
+        with caplog.at_level(logging.DEBUG, logger="app.utils.data_validation"):
+            validated = validate_scraped_products(products, min_quality_score=0.8)
+        
+        warned = [r.getMessage() for r in caplog.records if r.levelno == logging.WARNING]
+        assert validated[0] == products[0]
+        assert warned == [
+            f"Product validation failed: {product.name}"
+            for product, result in zip(products, map(ProductDataValidator().validate_product, products))
+            if not result.is_valid
+        ]
+        assert len(warned) >= 2
+
+
+class TestCleanProductData:
+    """Test product cleanup after validation."""
+    
+    def test_clean_product_returned_as_is(self, validator):
+        """Test an already clean product is not copied."""
+        product = TestValidateBatch.PRODUCTS[0]
+        
+        assert validator._clean_product_data(product) is product
+    
+    def test_whitespace_and_empty_fields_cleaned(self, validator):
+        """Test names and URLs are stripped, empty promo text dropped, other fields kept."""
+        product = ProductResult(name="  White Bread 700g ", price=2.50, promoText="", retailer="coles",
+                                url=" https://www.coles.com.au/p/2 ", stockcode="2")
+        
+        cleaned = validator._clean_product_data(product)
+        
+        assert cleaned is not product
+        assert cleaned.name == "White Bread 700g"
+        assert cleaned.url == "https://www.coles.com.au/p/2"
+        assert cleaned.promoText is None
+        assert cleaned.price == 2.50
+        assert cleaned.stockcode == "2"
+        assert product.name == "  White Bread 700g "
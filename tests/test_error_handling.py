@@ -0,0 +1,376 @@
+"""
+Tests for structured error handling and error logging.
+"""
+
+import asyncio
+import json
+import logging
+import queue
+
+import pytest
+from fastapi.responses import JSONResponse
+from starlette.requests import Request
+
+from app.utils import error_handling
+from app.utils.error_handling import ErrorHandler, ErrorResponse
+
+
+class _ListHandler(logging.Handler):
+    """Collect emitted records in a list."""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def _request(headers=(), query_string=b""):
+    """Build a bare GET request for the search endpoint."""
+    return Request({
+        "type": "http", "method": "GET", "path": "/search", "query_string": query_string,
+        "headers": [(name.encode(), value.encode()) for name, value in headers],
+        "client": ("10.0.0.1", 1234), "server": ("testserver", 80), "scheme": "http",
+    })
+
+
+def _flush_error_log():
+    """Wait for the background writer to drain every queued record."""
+    error_handling._log_listener.stop()
+    error_handling._log_listener.start()
+
+
+@pytest.fixture
+def captured():
+    """Capture records that error logging hands to upstream handlers."""
+    handler = _ListHandler()
+    root = logging.getLogger()
+    previous_level = root.level
+    root.addHandler(handler)
+    root.setLevel(logging.DEBUG)
+    try:
+        yield handler.records
+    finally:
+        root.removeHandler(handler)
+        root.setLevel(previous_level)
+
+
+class TestErrorLogQueue:
+    """Test error records are written off the calling thread."""
+
+    def test_records_reach_upstream_handlers(self, captured):
+        """Test logged errors are delivered to the application's handlers."""
+        try:
+            raise ValueError("boom")
+        except ValueError as e:
+            request_id = ErrorHandler().log_error("INTERNAL_ERROR", exception=e)
+
+        _flush_error_log()
+
+        [record] = [r for r in captured if r.name == error_handling.logger.name]
+        assert record.levelno == logging.CRITICAL
+        assert record.request_id == request_id
+        assert record.exc_info[0] is ValueError
+
+    def test_request_ids_unique(self):
+        """Test each logged error gets its own hex request ID, even for the same request."""
+        handler = ErrorHandler()
+        request = _request()
+
+        ids = {handler.log_error("PRODUCT_NOT_FOUND", request=request) for _ in range(100)}
+
+        assert len(ids) == 100
+        assert all(len(request_id) == 32 and int(request_id, 16) >= 0 for request_id in ids)
+
+    def test_bursts_written_in_order(self, captured):
+        """Test a burst larger than one batch is written completely and in order."""
+        error_handling._log_listener.stop()
+        for i in range(error_handling.LOG_BATCH_SIZE * 2 + 1):
+            error_handling.logger.warning("burst %d", i)
+        error_handling._log_listener.start()
+        _flush_error_log()
+
+        messages = [r.getMessage() for r in captured if r.name == error_handling.logger.name]
+        assert messages == [f"burst {i}" for i in range(error_handling.LOG_BATCH_SIZE * 2 + 1)]
+
+    def test_filtered_severity_skips_logging(self, captured):
+        """Test errors below the logger's level return an ID without building a record."""
+        handler = ErrorHandler()
+        handler._sanitize_context = None
+
+        error_handling.logger.setLevel(logging.WARNING)
+        try:
+            request_id = handler.log_error("PRODUCT_NOT_FOUND", request=_request(), context={"query": "milk"})
+            handler.log_error("DATABASE_CONNECTION")
+        finally:
+            error_handling.logger.setLevel(logging.NOTSET)
+        _flush_error_log()
+
+        assert len(request_id) == 32
+        assert [r.error_code for r in captured if r.name == error_handling.logger.name] == ["DATABASE_CONNECTION"]
+        assert handler.suppressed_count == 0
+
+    def test_full_queue_drops_records(self):
+        """Test records beyond the queue bound are counted and dropped, not blocked on."""
+        handler = error_handling._ErrorLogQueueHandler(queue.Queue(maxsize=1))
+        record = logging.makeLogRecord({"msg": "error"})
+
+        handler.handle(record)
+        handler.handle(record)
+
+        assert handler.queue.qsize() == 1
+        assert handler.dropped == 1
+
+
+class TestErrorConfigs:
+    """Test error configuration lookup."""
+
+    def test_configs_are_read_only(self):
+        """Test configurations can only be registered through add_error_config."""
+        handler = ErrorHandler()
+        custom = handler.get_error_info("INTERNAL_ERROR")
+
+        with pytest.raises(TypeError):
+            handler.error_configs["CUSTOM"] = custom
+        handler.add_error_config("CUSTOM", custom)
+
+        assert handler.error_configs["CUSTOM"] is custom
+
+    def test_logged_names_are_plain_strings(self):
+        """Test category and severity are logged as their plain string values."""
+        config = ErrorHandler().error_configs["NETWORK_TIMEOUT"]
+
+        assert type(config.category_str) is str and config.category_str == "network"
+        assert type(config.severity_str) is str and config.severity_str == "medium"
+        assert config.category_str is config.category.value
+
+    def test_unknown_code_resolves_to_internal_error(self):
+        """Test unknown codes fall back to the internal error configuration."""
+        handler = ErrorHandler()
+
+        assert handler._resolve("NO_SUCH_CODE") is handler.error_configs["INTERNAL_ERROR"]
+
+
+class TestErrorTimestamp:
+    """Test error response timestamps."""
+
+    def test_formatted_once_per_second(self, monkeypatch):
+        """Test the timestamp string is reused within a second and refreshed after."""
+        monkeypatch.setattr(error_handling, "_timestamp_cache", [0, ""])
+        monkeypatch.setattr(error_handling.time, "time", lambda: 86400.25)
+        first = error_handling._iso_now()
+        monkeypatch.setattr(error_handling.time, "time", lambda: 86400.75)
+
+        assert first == "1970-01-02T00:00:00Z"
+        assert error_handling._iso_now() is first
+
+        monkeypatch.setattr(error_handling.time, "time", lambda: 86401.0)
+        assert error_handling._iso_now() == "1970-01-02T00:00:01Z"
+
+
+class TestSanitizeUserData:
+    """Test user data sanitization for logs."""
+
+    def test_emails_hashed_and_unsafe_fields_dropped(self):
+        """Test emails become short stable hashes and unknown fields are removed."""
+        handler = ErrorHandler()
+
+        sanitized = handler._sanitize_user_data({
+            "user_id": 7, "email": "shopper@example.com", "address": "1 Main St"
+        })
+
+        assert sanitized["user_id"] == 7
+        assert len(sanitized["email_hash"]) == 8
+        assert sanitized["email_hash"] == handler._sanitize_user_data({"email": "shopper@example.com"})["email_hash"]
+        assert "email" not in sanitized and "address" not in sanitized
+
+
+class TestSanitizeContext:
+    """Test context sanitization for logs."""
+
+    def test_sensitive_keys_redacted(self):
+        """Test keys naming credentials are redacted in any case, others kept."""
+        sanitized = ErrorHandler()._sanitize_context({
+            "API_Key": "abc", "refresh_token": "def", "SessionID": 1, "session_id": 2,
+            "user_password": "x", "query": "milk", "page": 2,
+        })
+
+        assert sanitized == {
+            "API_Key": "[REDACTED]", "refresh_token": "[REDACTED]", "SessionID": 1,
+            "session_id": "[REDACTED]", "user_password": "[REDACTED]", "query": "milk", "page": 2,
+        }
+
+    def test_large_collections_truncated(self):
+        """Test long lists and dicts are logged as a bounded repr, short ones as-is."""
+        sanitized = ErrorHandler()._sanitize_context({
+            "products": list(range(100000)), "prices": {"milk": 3.1},
+        })
+
+        assert sanitized["prices"] == {"milk": 3.1}
+        assert sanitized["products"] == "[0, 1, 2, 3, 4, 5, 6, 7, 8, 9, ...]"
+
+    def test_small_collections_of_large_values_truncated(self):
+        """Test a few huge strings or deep nesting are bounded too, not just long collections."""
+        sanitized = ErrorHandler()._sanitize_context({
+            "pages": ["x" * 1_000_000] * 3,
+            "tree": {"a": {"b": {"c": {"d": {"e": {"f": {"g": 1}}}}}}},
+            "names": {"milk": None, "bread": "White 700g"},
+        })
+
+        assert len(sanitized["pages"]) < 2000
+        assert "..." in sanitized["pages"]
+        assert "..." in sanitized["tree"]
+        assert sanitized["names"] == {"milk": None, "bread": "White 700g"}
+
+
+class TestHandleInternalError:
+    """Test the internal error helper."""
+
+    def test_traceback_left_to_exc_info(self, captured):
+        """Test the traceback is carried by exc_info rather than copied into the context."""
+        try:
+            raise RuntimeError("db down")
+        except RuntimeError as e:
+            response = asyncio.run(error_handling.handle_internal_error(_request(), e, "search"))
+
+        _flush_error_log()
+
+        assert response.status_code == 500
+        [record] = [r for r in captured if r.name == error_handling.logger.name]
+        assert record.context == {"exception_type": "RuntimeError", "operation": "search"}
+        assert record.path == "/search"
+        assert record.query_params == ""
+        assert record.exc_info[0] is RuntimeError
+
+
+class TestErrorResponseBody:
+    """Test error response bodies."""
+
+    def test_body_matches_error_response_model(self):
+        """Test handle_exception's body has the same shape as the ErrorResponse model."""
+        handler = ErrorHandler()
+
+        response = handler.handle_exception("RATE_LIMIT_EXCEEDED", request=_request(), details={"limit": 10})
+        body = json.loads(response.body)
+
+        assert response.headers["content-type"] == "application/json"
+        assert response.headers["retry-after"] == "60"
+        assert list(body) == list(ErrorResponse.model_fields)
+        assert body == ErrorResponse(**body).model_dump()
+        assert body["retry_after"] == 60 and body["details"] == {"limit": 10}
+        assert handler.create_error_response("PRODUCT_NOT_FOUND", "abc").model_dump(mode="json") == {
+            **body, "error": "PRODUCT_NOT_FOUND", "message": handler.error_configs["PRODUCT_NOT_FOUND"].user_message,
+            "details": None, "request_id": "abc", "retry_after": None,
+        }
+
+    def test_caller_values_checked(self):
+        """Test create_error_response rejects details and request IDs of the wrong type."""
+        handler = ErrorHandler()
+
+        with pytest.raises(TypeError):
+            handler.create_error_response("PRODUCT_NOT_FOUND", "abc", details=["not", "a", "dict"])
+        with pytest.raises(TypeError):
+            handler.create_error_response("PRODUCT_NOT_FOUND", 123)
+
+    def test_encoded_without_deprecated_response_class(self, recwarn):
+        """Test error responses are plain JSONResponses and raise no deprecation warnings."""
+        response = ErrorHandler().handle_exception("PRODUCT_NOT_FOUND", details={1: "one"})
+
+        assert isinstance(response, JSONResponse)
+        assert json.loads(response.body)["details"] == {"1": "one"}
+        assert not [w for w in recwarn if issubclass(w.category, DeprecationWarning)]
+
+    def test_retry_after_header_only_when_retryable(self):
+        """Test the Retry-After header is set from the config's retry delay."""
+        handler = ErrorHandler()
+
+        assert handler.handle_exception("NETWORK_TIMEOUT").headers["retry-after"] == "30"
+        assert "retry-after" not in handler.handle_exception("PRODUCT_NOT_FOUND").headers
+
+
+class TestRequestDetails:
+    """Test request details recorded with logged errors."""
+
+    def test_forwarded_for_preferred(self):
+        """Test the first forwarded address wins over x-real-ip and the socket peer."""
+        request = _request([
+            ("user-agent", "curl/8.0"), ("x-real-ip", "192.0.2.9"),
+            ("x-forwarded-for", " 203.0.113.5 , 10.0.0.2"), ("x-forwarded-for", "198.51.100.1"),
+        ])
+
+        assert ErrorHandler()._get_client_info(request) == {"client_ip": "203.0.113.5", "user_agent": "curl/8.0"}
+
+    def test_fallbacks(self):
+        """Test x-real-ip, then the socket peer, are used without a forwarded header."""
+        handler = ErrorHandler()
+
+        assert handler._get_client_info(_request([("x-real-ip", "192.0.2.9")])) == {
+            "client_ip": "192.0.2.9", "user_agent": None
+        }
+        assert handler._get_client_info(_request())["client_ip"] == "10.0.0.1"
+
+    def test_single_forwarded_address(self):
+        """Test a forwarded header without a proxy chain is used whole, trimmed."""
+        request = _request([("x-forwarded-for", " 203.0.113.5 ")])
+
+        assert ErrorHandler()._get_client_info(request)["client_ip"] == "203.0.113.5"
+
+    def test_query_string_logged_raw(self, captured):
+        """Test the request's query string is logged as-is."""
+        ErrorHandler().log_error("PRODUCT_NOT_FOUND", request=_request(query_string=b"q=milk&postcode=2000"))
+
+        _flush_error_log()
+
+        [record] = [r for r in captured if r.name == error_handling.logger.name]
+        assert record.query_params == "q=milk&postcode=2000"
+
+
+class TestErrorLogSuppression:
+    """Test repeated errors are suppressed during error storms."""
+
+    def _logged(self, captured):
+        _flush_error_log()
+        return [r for r in captured if r.name == error_handling.logger.name]
+
+    def test_repeats_within_window_suppressed(self, captured, monkeypatch):
+        """Test an identical error is logged once per dedup window."""
+        now = [100.0]
+        monkeypatch.setattr(error_handling.time, "monotonic", lambda: now[0])
+        handler = ErrorHandler()
+
+        ids = [handler.log_error("PRODUCT_NOT_FOUND", request=_request()) for _ in range(3)]
+        handler.log_error("PRODUCT_NOT_FOUND", request=_request(), exception=KeyError("milk"))
+        now[0] += error_handling.LOG_DEDUP_WINDOW
+        handler.log_error("PRODUCT_NOT_FOUND", request=_request())
+
+        logged = self._logged(captured)
+        assert len(logged) == 3
+        assert handler.suppressed_count == 2
+        # Suppressed repeats point at the record that was written for them
+        assert ids == [logged[0].request_id] * 3
+        # and are reported by the next record written for the same error
+        assert not hasattr(logged[0], "suppressed_count")
+        assert logged[2].suppressed_count == 2
+
+    def test_rate_limited_per_error_code(self, captured, monkeypatch):
+        """Test distinct errors beyond the per-code rate are dropped until the bucket refills."""
+        now = [100.0]
+        monkeypatch.setattr(error_handling.time, "monotonic", lambda: now[0])
+        monkeypatch.setattr(error_handling, "LOG_RATE_LIMIT", 2)
+        handler = ErrorHandler()
+
+        ids = [
+            handler.log_error("NETWORK_TIMEOUT", exception=exception_type())
+            for exception_type in (ValueError, KeyError, TypeError, OSError)
+        ]
+        handler.log_error("PRODUCT_NOT_FOUND")
+        now[0] += 0.5
+        handler.log_error("NETWORK_TIMEOUT", exception=TimeoutError())
+
+        logged = self._logged(captured)
+        assert [r.error_code for r in logged] == ["NETWORK_TIMEOUT"] * 2 + ["PRODUCT_NOT_FOUND", "NETWORK_TIMEOUT"]
+        assert handler.suppressed_count == 2
+        assert ids == [logged[0].request_id, logged[1].request_id, logged[1].request_id, logged[1].request_id]
+        assert not hasattr(logged[2], "suppressed_count")
+        assert logged[3].suppressed_count == 2
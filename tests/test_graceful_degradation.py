@@ -0,0 +1,189 @@
+"""
+Tests for graceful degradation utilities.
+"""
+import asyncio
+
+import pytest
+from unittest.mock import patch
+
+from app.utils.graceful_degradation import CircuitBreaker, GracefulDegradationManager, ServiceStatus
+
+
+class TestCircuitBreaker:
+    """Test circuit breaker state transitions."""
+
+    def test_opens_after_threshold(self):
+        """Test that the breaker opens once the failure threshold is reached."""
+        breaker = CircuitBreaker(failure_threshold=2, timeout=60)
+
+        breaker.record_failure()
+        assert breaker.can_execute() is True
+
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert breaker.can_execute() is False
+        assert breaker.trip_count == 1
+
+    def test_half_open_allows_single_probe(self):
+        """Test that only one probe is let through after the timeout."""
+        breaker = CircuitBreaker(failure_threshold=1, timeout=10)
+
+        with patch('app.utils.graceful_degradation.time.time', return_value=100.0):
+            breaker.record_failure()
+
+        with patch('app.utils.graceful_degradation.time.time', return_value=111.0):
+            assert breaker.can_execute() is True
+            assert breaker.state == "half-open"
+            assert breaker.can_execute() is False
+
+        breaker.record_success()
+        assert breaker.state == "closed"
+        assert breaker.can_execute() is True
+
+    def test_failed_probe_doubles_timeout(self):
+        """Test exponential back-off between probes, capped at max_timeout."""
+        breaker = CircuitBreaker(failure_threshold=1, timeout=10, max_timeout=25)
+        now = 100.0
+
+        with patch('app.utils.graceful_degradation.time.time', side_effect=lambda: now):
+            breaker.record_failure()
+            for expected_timeout in (20, 25, 25):
+                now += breaker.timeout + 1
+                assert breaker.can_execute() is True
+                breaker.record_failure()
+                assert breaker.state == "open"
+                assert breaker.timeout == expected_timeout
+
+        breaker.record_success()
+        assert breaker.timeout == 10
+
+    def test_timeout_fixed_without_max_timeout(self):
+        """Test that the open period stays constant by default."""
+        breaker = CircuitBreaker(failure_threshold=1, timeout=10)
+        now = 100.0
+
+        with patch('app.utils.graceful_degradation.time.time', side_effect=lambda: now):
+            breaker.record_failure()
+            now += 11
+            assert breaker.can_execute() is True
+            breaker.record_failure()
+
+        assert breaker.timeout == 10
+
+
+class TestExecuteWithDegradation:
+    """Test single service calls through the degradation manager."""
+
+    @pytest.mark.asyncio
+    async def test_primary_runs_in_calling_task(self):
+        """Test coroutine calls are awaited directly, without a wrapper task."""
+        manager = GracefulDegradationManager()
+        caller = asyncio.current_task()
+
+        async def primary():
+            return asyncio.current_task() is caller
+
+        result = await manager.execute_with_degradation("woolworths_search", primary)
+
+        assert result.success is True
+        assert result.data is True
+
+    @pytest.mark.asyncio
+    async def test_slow_primary_times_out(self):
+        """Test a primary call over the timeout fails and counts against the breaker."""
+        manager = GracefulDegradationManager()
+
+        async def primary():
+            await asyncio.sleep(1)
+
+        result = await manager.execute_with_degradation("coles_search", primary, timeout_seconds=0.01)
+
+        assert result.success is False
+        assert result.error == "Timeout after 0.01s"
+        assert manager.get_circuit_breaker("coles_search").failure_count == 1
+
+    @pytest.mark.asyncio
+    async def test_response_time_ignores_wall_clock_changes(self):
+        """Test latency is measured on the monotonic clock, not wall time."""
+        manager = GracefulDegradationManager()
+
+        def primary():
+            return ["milk"]
+
+        with patch('app.utils.graceful_degradation.time.time', side_effect=[1000.0, 10.0, 10.0]):
+            result = await manager.execute_with_degradation("woolworths_search", primary)
+
+        assert result.success is True
+        assert 0 <= result.response_time_ms < 1000
+
+
+class TestExecuteMultipleWithDegradation:
+    """Test concurrent service calls through the degradation manager."""
+
+    @pytest.mark.asyncio
+    async def test_calls_run_concurrently(self):
+        """Test every service is called at once and results are keyed by service."""
+        manager = GracefulDegradationManager()
+        started = []
+        both_started = asyncio.Event()
+
+        def search(name, fail=False):
+            async def call():
+                started.append(name)
+                if len(started) == 2:
+                    both_started.set()
+                await both_started.wait()
+                if fail:
+                    raise ConnectionError(f"{name} down")
+                return [name]
+            return call
+
+        results = await asyncio.wait_for(manager.execute_multiple_with_degradation({
+            "woolworths": search("woolworths"),
+            "coles": search("coles", fail=True),
+        }), timeout=1)
+
+        assert list(results) == ["woolworths", "coles"]
+        assert results["woolworths"].data == ["woolworths"]
+        assert results["coles"].success is False
+        assert results["coles"].error == "coles down"
+
+    @pytest.mark.asyncio
+    async def test_unexpected_error_becomes_failed_result(self):
+        """Test an exception escaping one service's handling doesn't lose the others."""
+        manager = GracefulDegradationManager()
+        original = manager.execute_with_degradation
+
+        async def execute(service_name, *args, **kwargs):
+            if service_name == "coles":
+                raise RuntimeError("breaker state corrupted")
+            return await original(service_name, *args, **kwargs)
+
+        with patch.object(manager, "execute_with_degradation", side_effect=execute):
+            results = await manager.execute_multiple_with_degradation({
+                "woolworths": lambda: ["milk"],
+                "coles": lambda: ["bread"],
+            })
+
+        assert results["woolworths"].data == ["milk"]
+        assert results["coles"].success is False
+        assert results["coles"].error == "breaker state corrupted"
+
+
+class TestServiceStatusSummary:
+    """Test the monitoring summary."""
+
+    def test_counts_every_status(self):
+        """Test services are counted per status, including statuses with none."""
+        manager = GracefulDegradationManager()
+        manager.service_status.update({
+            "woolworths_search": ServiceStatus.AVAILABLE,
+            "coles_search": ServiceStatus.DEGRADED,
+            "iga_search": ServiceStatus.AVAILABLE,
+        })
+
+        summary = manager.get_service_status_summary()
+
+        assert summary["service_status_counts"] == {"available": 2, "degraded": 1, "unavailable": 0}
+        assert summary["individual_services"] == manager.service_status
+        assert summary["individual_services"] is not manager.service_status
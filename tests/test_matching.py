@@ -186,6 +186,29 @@ class TestProductMatcher:
         for i in range(len(ranked) - 1):
             assert ranked[i][1].total_score >= ranked[i+1][1].total_score
     
+    def test_query_prepared_once_per_search(self):
+        """Test that find_best_match tokenizes the query once, not per candidate."""
+        matcher = ProductMatcher()
+        products = [
+            ProductResult(name="Milk Full Cream 2L", retailer="woolworths"),
+            ProductResult(name="Milk 2L Light", retailer="coles"),
+            ProductResult(name="White Bread 680g", retailer="woolworths"),
+        ]
+        prepared = []
+        original_prepare = matcher.prepare
+        
+        def counting_prepare(text):
+            prepared.append(text)
+            return original_prepare(text)
+        
+        matcher.prepare = counting_prepare
+        best_product, match_score = matcher.find_best_match("milk 2L", products)
+        
+        assert prepared.count("milk 2L") == 1
+        assert len(prepared) == 1 + len(products)
+        # Scores are unchanged from scoring each pair on its own
+        assert match_score == ProductMatcher().calculate_match_score("milk 2L", best_product.name)
+    
     def test_matcher_with_no_products(self):
         """Test matcher behavior with empty product list."""
         matcher = ProductMatcher()
@@ -0,0 +1,36 @@
+"""
+Tests for rate limiting utilities.
+"""
+import asyncio
+import time
+import pytest
+
+from app.utils.rate_limiting import AsyncTokenBucket
+
+
+class TestAsyncTokenBucket:
+    """Test the outbound token bucket limiter."""
+
+    @pytest.mark.asyncio
+    async def test_burst_up_to_max_rate(self):
+        """Test that a full bucket allows max_rate calls without waiting."""
+        limiter = AsyncTokenBucket(max_rate=5, time_period=1.0)
+
+        start = time.monotonic()
+        for _ in range(5):
+            async with limiter:
+                pass
+
+        assert time.monotonic() - start < 0.05
+
+    @pytest.mark.asyncio
+    async def test_paces_calls_beyond_burst(self):
+        """Test that concurrent callers share one budget once the bucket is empty."""
+        limiter = AsyncTokenBucket(max_rate=20, time_period=1.0)
+
+        start = time.monotonic()
+        await asyncio.gather(*(limiter.acquire() for _ in range(25)))
+        elapsed = time.monotonic() - start
+
+        # 20 from the initial burst, then 5 more at 20/s
+        assert 0.2 <= elapsed < 0.5
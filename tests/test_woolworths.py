@@ -1,6 +1,9 @@
 import pytest
 import respx
 import httpx
+from unittest.mock import AsyncMock, patch
+
+from app.adapters.base import BACKOFF_JITTER, MAX_RETRY_AFTER, retry_after_seconds
 from app.adapters.woolworths import WoolworthsAdapter
 
 
@@ -171,6 +174,24 @@ class TestWoolworthsAdapter:
         
         assert results == []
     
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_search_reuses_injected_client(self):
+        """Test that a shared client passed to the adapter is used and left open."""
+        route = respx.get("https://www.woolworths.com.au/apis/ui/Search/products").mock(
+            return_value=httpx.Response(200, json={"Products": []})
+        )
+        
+        async with httpx.AsyncClient() as client:
+            adapter = WoolworthsAdapter(client=client)
+            await adapter.search("shared client query", "2000")
+            
+            async with adapter._client_context() as used:
+                assert used is client
+            
+            assert route.called
+            assert not client.is_closed
+    
     @pytest.mark.asyncio
     @respx.mock
     async def test_search_api_error(self):
@@ -189,4 +210,67 @@ class TestWoolworthsAdapter:
         adapter = WoolworthsAdapter()
         results = await adapter.search("milk 2L", "2000")
         
-        assert results == []
\ No newline at end of file
+        assert results == []
+
+class TestRetryAfter:
+    """Test that throttling responses are backed off as the server asks."""
+    
+    URL = "https://www.woolworths.com.au/apis/ui/Search/products"
+    
+    def test_parses_seconds_and_http_dates(self):
+        """Test both Retry-After forms, plus missing and malformed values."""
+        assert retry_after_seconds(httpx.Response(429, headers={"Retry-After": "7"})) == 7.0
+        assert retry_after_seconds(httpx.Response(429, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+        assert retry_after_seconds(httpx.Response(429, headers={"Retry-After": "soon"})) is None
+        assert retry_after_seconds(httpx.Response(429)) is None
+    
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_retry_waits_for_retry_after(self):
+        """Test a 429 is retried after the server's delay rather than the 1s backoff."""
+        respx.get(self.URL).mock(side_effect=[
+            httpx.Response(429, headers={"Retry-After": "5"}),
+            httpx.Response(200, json={"Products": []}),
+        ])
+        adapter = WoolworthsAdapter()
+        
+        with patch('app.adapters.base.asyncio.sleep', new_callable=AsyncMock) as sleep:
+            async with httpx.AsyncClient() as client:
+                data = await adapter._retry_request(client, self.URL, {}, "milk", "2000")
+        
+        assert data == {"Products": []}
+        sleep.assert_awaited_once()
+        assert 5.0 <= sleep.await_args.args[0] <= 5.0 * (1 + BACKOFF_JITTER)
+    
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_retry_after_is_jittered(self):
+        """Test workers throttled by the same Retry-After don't all retry at once."""
+        respx.get(self.URL).mock(side_effect=[
+            httpx.Response(429, headers={"Retry-After": "5"}),
+            httpx.Response(200, json={}),
+        ])
+        adapter = WoolworthsAdapter()
+        
+        with patch('app.adapters.base.asyncio.sleep', new_callable=AsyncMock) as sleep, \
+             patch('app.adapters.base.random.random', return_value=0.5):
+            async with httpx.AsyncClient() as client:
+                await adapter._retry_request(client, self.URL, {}, "milk", "2000")
+        
+        sleep.assert_awaited_once_with(pytest.approx(5.0 * (1 + 0.5 * BACKOFF_JITTER)))
+    
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_retry_after_is_capped(self):
+        """Test an excessive Retry-After is clamped to MAX_RETRY_AFTER."""
+        respx.get(self.URL).mock(side_effect=[
+            httpx.Response(503, headers={"Retry-After": "3600"}),
+            httpx.Response(200, json={}),
+        ])
+        adapter = WoolworthsAdapter()
+        
+        with patch('app.adapters.base.asyncio.sleep', new_callable=AsyncMock) as sleep:
+            async with httpx.AsyncClient() as client:
+                await adapter._retry_request(client, self.URL, {}, "milk", "2000")
+        
+        sleep.assert_awaited_once_with(MAX_RETRY_AFTER)